@@ -0,0 +1,124 @@
+"""
+export_merge_benchmark.py
+
+This script compares the previous pure Python merge path of MplCanvas.create_export_data
+with the vectorized NumPy merge engine (pisoworks.plot_export.merge_line_data).
+
+Synthetic history traces with different X arrays (different sample counts and time offsets)
+are merged by both implementations. The script verifies that both produce identical
+results and prints the runtime of each path.
+
+Usage:
+    python benchmarks/export_merge_benchmark.py [--lines N] [--samples N ...]
+    python -m benchmarks.export_merge_benchmark [--lines N] [--samples N ...]
+
+Example output:
+    lines   samples     python [s]    numpy [s]   speedup
+        4    100000          0.561        0.056      10.0
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Allows running the script directly from a checkout without installing the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pisoworks.plot_export import merge_line_data
+
+
+def create_line_data(line_count: int, samples: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Creates synthetic line data with different X arrays for each line.
+
+    Args:
+        line_count (int): The number of lines to create.
+        samples (int): The number of samples of the first line.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: The X and Y data of each line.
+    """
+    rng = np.random.default_rng(0)
+    line_data = []
+    for i in range(line_count):
+        count = samples - i * (samples // (4 * line_count))
+        x = np.arange(count) * 0.05 + i * 0.025     # different sample offsets per line
+        y = np.sin(x / 10) + rng.normal(0, 0.01, count)
+        line_data.append((x, y))
+    return line_data
+
+
+def merge_python(line_data: list[tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """
+    The previous merge path of create_export_data - a Python set union, a dict index
+    and a per sample loop, followed by a pandas forward fill.
+    """
+    all_x_values = set()
+    for x, _ in line_data:
+        all_x_values.update(x)
+    full_x = np.array(sorted(all_x_values))
+
+    x_to_index = {x_val: idx for idx, x_val in enumerate(full_x)}
+    data = {"x": full_x}
+
+    for i, (line_x, line_y) in enumerate(line_data, start=1):
+        y_full = np.full_like(full_x, fill_value=np.nan, dtype=float)
+        for lx, ly in zip(line_x, line_y):
+            idx = x_to_index.get(lx)
+            if idx is not None:
+                y_full[idx] = ly
+        data[f"y{i}"] = y_full
+
+    df = pd.DataFrame(data)
+    df.loc[:, df.columns != "x"] = df.loc[:, df.columns != "x"].ffill()
+    return df
+
+
+def merge_numpy(line_data: list[tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """
+    The vectorized merge path based on merge_line_data.
+    """
+    full_x, y_columns = merge_line_data(line_data)
+    data = {"x": full_x}
+    for i, y in enumerate(y_columns, start=1):
+        data[f"y{i}"] = y
+    return pd.DataFrame(data)
+
+
+def measure(func, *args) -> tuple[float, pd.DataFrame]:
+    """
+    Returns the runtime in seconds and the result of the given function call.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the export merge paths of MplCanvas.")
+    parser.add_argument("--lines", type=int, default=4, help="number of lines to merge")
+    parser.add_argument("--samples", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="number of samples per line")
+    parser.add_argument("--skip-python", action="store_true", help="only measure the NumPy path")
+    args = parser.parse_args()
+
+    print(f"{'lines':>5} {'samples':>9} {'python [s]':>14} {'numpy [s]':>12} {'speedup':>9}")
+    for samples in args.samples:
+        line_data = create_line_data(args.lines, samples)
+        numpy_time, numpy_df = measure(merge_numpy, line_data)
+
+        if args.skip_python:
+            print(f"{args.lines:>5} {samples:>9} {'-':>14} {numpy_time:>12.3f} {'-':>9}")
+            continue
+
+        python_time, python_df = measure(merge_python, line_data)
+        pd.testing.assert_frame_equal(python_df, numpy_df)
+        print(f"{args.lines:>5} {samples:>9} {python_time:>14.3f} {numpy_time:>12.3f} {python_time / numpy_time:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from PySide6.QtWidgets import QFrame, QComboBox, QCheckBox
+from PySide6.QtWidgets import QFrame, QComboBox, QCheckBox, QSpinBox, QDoubleSpinBox, QLabel
 from PySide6.QtGui import QAction, QPalette
 
 from nv200.data_recorder import DataRecorder, DataRecorderSource
@@ -11,6 +11,9 @@ from pisoworks.style_manager import style_manager
 class DataRecorderWidget(QFrame):
 
     DEFAULT_RECORDING_DURATION_MS : int = 120  # Default recording duration in milliseconds
+    DEFAULT_HISTORY_DEPTH : int = 20  # Default number of history traces in "Keep History" mode
+    DEFAULT_FRAME_RATE : float = 5.0  # Default maximum number of captures per second in continuous acquisition mode
+    DEFAULT_SCOPE_WINDOW_MS : int = 2000  # Default time window of the scope mode in milliseconds
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -19,21 +22,81 @@ class DataRecorderWidget(QFrame):
         ui.setupUi(self)
         self.recsrc_combo_boxes = [self.ui.recsrc1ComboBox, self.ui.recsrc2ComboBox]
         ui.mplWidget.setStyleSheet("") # clear designer stylesheet
-        self.canvas = ui.mplWidget.canvas # forward the canvas object
         self.mpl_widget = ui.mplWidget
 
         ui.mplWidget.show_export_action()
         ui.mplWidget.add_toolbar_separator()
         self.clear_plot_action = a = QAction("Clear Plot", parent=self, icon=get_icon("delete", size=24, fill=False, color=QPalette.ColorRole.WindowText))
         ui.mplWidget.add_toolbar_action(a)
+        self.recordings_action = a = QAction("Recordings", parent=self, icon=get_icon("folder_open", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        a.setToolTip("Browse and replay the stored recordings")
+        ui.mplWidget.add_toolbar_action(a)
 
         cb = self.history_checkbox = QCheckBox("Keep History", self)
         cb.setObjectName("historyCheckBox")
         cb.setProperty("toggleSwitch", True)
         cb.setStyleSheet("QCheckBox#historyCheckBox { margin-left: 10px; }")
-        ui.mplWidget.toolbar.addWidget(cb)
+        ui.mplWidget.add_toolbar_widget(cb)
         cb.setChecked(False)
 
+        sb = self.history_depth_spinbox = QSpinBox(self)
+        sb.setRange(1, 1000)
+        sb.setPrefix("Depth: ")
+        sb.setToolTip("Maximum number of history traces")
+        sb.setValue(self.DEFAULT_HISTORY_DEPTH)
+        sb.setEnabled(False)
+        sb.valueChanged.connect(lambda depth: self.canvas.set_history_depth(depth))
+        cb.toggled.connect(sb.setEnabled)
+        ui.mplWidget.add_toolbar_widget(sb)
+        self.canvas.set_history_depth(sb.value())
+
+        # The plot backend may be switched at runtime - the new canvas needs the history depth
+        ui.mplWidget.backend_changed.connect(lambda backend: self.canvas.set_history_depth(sb.value()))
+
+        ui.mplWidget.add_toolbar_separator()
+        self.continuous_action = a = QAction("Continuous Acquisition", parent=self, icon=get_icon("autorenew", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        a.setCheckable(True)
+        a.setToolTip("Re-arm the data recorder immediately after each readout and plot the captures continuously")
+        ui.mplWidget.add_toolbar_action(a)
+
+        sb = self.frame_rate_spinbox = QDoubleSpinBox(self)
+        sb.setRange(0.1, 50.0)
+        sb.setDecimals(1)
+        sb.setSingleStep(1.0)
+        sb.setSuffix(" fps")
+        sb.setToolTip("Maximum number of captures per second in continuous acquisition mode")
+        sb.setValue(self.DEFAULT_FRAME_RATE)
+        ui.mplWidget.add_toolbar_widget(sb)
+
+        cb = self.scope_checkbox = QCheckBox("Scope", self)
+        cb.setObjectName("scopeCheckBox")
+        cb.setProperty("toggleSwitch", True)
+        cb.setStyleSheet("QCheckBox#scopeCheckBox { margin-left: 10px; }")
+        cb.setToolTip("Append the captures of the continuous acquisition mode to a rolling time window")
+        ui.mplWidget.add_toolbar_widget(cb)
+
+        sb = self.scope_window_spinbox = QSpinBox(self)
+        sb.setRange(100, 60000)
+        sb.setSingleStep(500)
+        sb.setPrefix("Window: ")
+        sb.setSuffix(" ms")
+        sb.setToolTip("Time window of the scope mode")
+        sb.setValue(self.DEFAULT_SCOPE_WINDOW_MS)
+        sb.setEnabled(False)
+        cb.toggled.connect(sb.setEnabled)
+        ui.mplWidget.add_toolbar_widget(sb)
+
+        cb = self.store_continuous_checkbox = QCheckBox("Store Captures", self)
+        cb.setObjectName("storeContinuousCheckBox")
+        cb.setProperty("toggleSwitch", True)
+        cb.setStyleSheet("QCheckBox#storeContinuousCheckBox { margin-left: 10px; }")
+        cb.setToolTip("Store the captures of the continuous acquisition mode in the recording store")
+        ui.mplWidget.add_toolbar_widget(cb)
+
+        self.acquisition_stats_label = QLabel(self)
+        self.acquisition_stats_label.setStyleSheet("QLabel { margin-left: 10px; }")
+        ui.mplWidget.add_toolbar_widget(self.acquisition_stats_label)
+
         ui.recDurationSpinBox.valueChanged.connect(self.update_sampling_period)
         ui.recDurationSpinBox.setValue(self.DEFAULT_RECORDING_DURATION_MS)
         self.init_recording_source_combobox(ui.recsrc1ComboBox, DataRecorderSource.PIEZO_VOLTAGE)
@@ -42,6 +105,14 @@ class DataRecorderWidget(QFrame):
 
         style_manager.style.dark_mode_changed.connect(self.set_dark_mode)
 
+
+    @property
+    def canvas(self):
+        """
+        Returns the canvas of the plot widget (forwards the canvas object).
+        """
+        return self.ui.mplWidget.canvas
+
     
     def init_recording_source_combobox(self, cb : QComboBox, default_value : DataRecorderSource):
         """
@@ -100,9 +171,43 @@ class DataRecorderWidget(QFrame):
         set_combobox_index_by_value(self.recsrc_combo_boxes[channel], source)
 
 
+    def frame_rate(self) -> float:
+        """
+        Returns the configured maximum number of captures per second of the continuous acquisition mode.
+        """
+        return self.frame_rate_spinbox.value()
+
+
+    def scope_window_ms(self) -> int:
+        """
+        Returns the time window of the scope mode in milliseconds.
+        """
+        return self.scope_window_spinbox.value()
+
+
+    def set_acquisition_statistics(self, captures_per_second: float, dead_time_ms: float):
+        """
+        Shows the statistics of the continuous acquisition mode in the toolbar.
+
+        Args:
+            captures_per_second (float): The achieved number of captures per second.
+            dead_time_ms (float): The time between the end of a capture and the start of the next one.
+        """
+        self.acquisition_stats_label.setText(f"{captures_per_second:.1f} captures/s, dead time {dead_time_ms:.0f} ms")
+
+
+    def clear_acquisition_statistics(self):
+        """
+        Clears the statistics of the continuous acquisition mode.
+        """
+        self.acquisition_stats_label.clear()
+
+
     def set_dark_mode(self, dark_mode: bool):
         """
         Updates the UI if dark mode is enabled or disabled.
         """
         self.clear_plot_action.setIcon(get_icon("delete", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        self.recordings_action.setIcon(get_icon("folder_open", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        self.continuous_action.setIcon(get_icon("autorenew", size=24, fill=False, color=QPalette.ColorRole.WindowText))
 
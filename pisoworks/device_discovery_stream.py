@@ -0,0 +1,221 @@
+"""
+Streaming device discovery and the cache of the last discovered devices.
+
+nv200.device_discovery.discover_devices returns the detected devices only after all interfaces
+have been scanned and the device info of all devices has been read. The Ethernet discovery waits
+for the responses of the network devices with a timeout, so the USB devices, which are found
+quickly, are shown only after this timeout. discover_devices_streaming scans the interfaces
+concurrently and reports each device as soon as its device info has been read. Devices that
+are in use by an open session (see device_session) are not connected to, because this would
+interfere with the open connection.
+
+The discovery cache stores the devices found by the last discovery in the application settings,
+so that the last known devices can be shown immediately at the next start while a new
+discovery confirms them.
+"""
+import asyncio
+import json
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Type
+
+import serial.tools.list_ports
+
+from nv200.device_base import PiezoDeviceBase
+from nv200.device_factory import create_device_from_id
+from nv200.shared_types import DetectedDevice, DiscoverFlags, TransportType
+from nv200.telnet_protocol import TelnetProtocol
+from nv200.transport_factory import transport_from_detected_device
+
+from pisoworks.settings_manager import SettingsContext
+
+
+def scanned_transports(flags: DiscoverFlags) -> set[TransportType]:
+    """
+    Returns the transport types that are scanned with the given discovery flags.
+    """
+    transports = set()
+    if flags & DiscoverFlags.DETECT_SERIAL:
+        transports.add(TransportType.SERIAL)
+    if flags & DiscoverFlags.DETECT_ETHERNET:
+        transports.add(TransportType.TELNET)
+    return transports
+
+
+def device_key(device: DetectedDevice) -> str:
+    """
+    Returns the key that identifies a detected device across discoveries - the MAC address
+    of network devices or the transport and the serial port.
+    """
+    return device.mac or f"{device.transport.value}:{device.identifier}"
+
+
+async def _read_device_info(detected_device: DetectedDevice, flags: DiscoverFlags) -> DetectedDevice | None:
+    """
+    Reads the device type and the device info of a detected device - the same as the
+    discovery of the device library does. Returns None if the device does not respond.
+    """
+    protocol = transport_from_detected_device(detected_device)
+    try:
+        await protocol.connect(auto_adjust_comm_params=bool(flags & DiscoverFlags.ADJUST_COMM_PARAMS))
+        dev = PiezoDeviceBase(protocol)
+        detected_device.device_id = await dev.get_device_type()
+        dev = create_device_from_id(detected_device.device_id, protocol)
+        await dev.enrich_device_info(detected_device)
+        return detected_device
+    except Exception as e:
+        print(f"Reading device info from {detected_device.identifier} failed: {e}")
+        return None
+    finally:
+        try:
+            await protocol.close()
+        except Exception:
+            pass
+
+
+async def _discover_serial_devices(flags: DiscoverFlags) -> List[DetectedDevice]:
+    """
+    Returns the serial ports that may connect to a device (FTDI USB serial converters), like
+    the serial discovery of the device library. The device type is read together with the
+    device info, so each port is opened only once.
+    """
+    ports = serial.tools.list_ports.comports()
+    return [DetectedDevice(transport=TransportType.SERIAL, identifier=p.device) for p in ports if p.manufacturer == "FTDI"]
+
+
+async def discover_devices_streaming(
+    on_found: Callable[[DetectedDevice], None],
+    flags: DiscoverFlags = DiscoverFlags.ALL_INTERFACES,
+    device_class: Optional[Type[PiezoDeviceBase]] = None,
+    exclude_keys: Collection[str] = (),
+) -> List[DetectedDevice]:
+    """
+    Discovers devices on the serial and the Ethernet interfaces concurrently and reports each
+    device as soon as it has been detected and its device info has been read.
+
+    Args:
+        on_found (Callable[[DetectedDevice], None]): Called for each discovered device.
+        flags (DiscoverFlags): The interfaces to scan and whether to read the device info.
+        device_class (Optional[Type[PiezoDeviceBase]]): If given, only devices of this class are
+            reported. This implies DiscoverFlags.READ_DEVICE_INFO.
+        exclude_keys (Collection[str]): The keys (see device_key) of devices that must not be
+            connected to, e.g. devices with an open session. They are not reported.
+
+    Returns:
+        List[DetectedDevice]: All discovered devices in the order in which they have been reported.
+
+    Raises:
+        Exception: The error of a failed interface scan, if no device has been found on the other interface.
+    """
+    if device_class:
+        flags |= DiscoverFlags.READ_DEVICE_INFO
+    found : List[DetectedDevice] = []
+
+    def report(device: DetectedDevice | None):
+        if device is None or (device_class and device.device_id != device_class.DEVICE_ID):
+            return
+        found.append(device)
+        on_found(device)
+
+    async def read_and_report(device: DetectedDevice):
+        report(await _read_device_info(device, flags))
+
+    async def scan(discover, read_device_info: bool):
+        devices = [d for d in await discover(flags) if device_key(d) not in exclude_keys]
+        if read_device_info:
+            await asyncio.gather(*(read_and_report(d) for d in devices))
+        else:
+            for device in devices:
+                report(device)
+
+    scans = []
+    if flags & DiscoverFlags.DETECT_SERIAL:
+        # The device type of serial devices is always read
+        scans.append(scan(_discover_serial_devices, True))
+    if flags & DiscoverFlags.DETECT_ETHERNET:
+        scans.append(scan(TelnetProtocol.discover_devices, bool(flags & DiscoverFlags.READ_DEVICE_INFO)))
+    results = await asyncio.gather(*scans, return_exceptions=True)
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    for error in errors:
+        print(f"Device discovery failed: {error}")
+    if errors and not found:
+        raise errors[0]
+    return found
+
+
+class DiscoveryCache:
+    """
+    Stores the devices found by the last discovery per device class in the application settings.
+    """
+    SETTINGS_KEY = "DiscoveryCache/devices"
+
+    def __init__(self):
+        self._entries : Dict[str, List[dict]] | None = None
+
+
+    @staticmethod
+    def _class_key(device_class: Optional[Type[PiezoDeviceBase]]) -> str:
+        return device_class.DEVICE_ID if device_class else "*"
+
+
+    @staticmethod
+    def _to_dict(device: DetectedDevice) -> dict:
+        return {
+            "transport": device.transport.value,
+            "identifier": device.identifier,
+            "mac": device.mac,
+            "device_id": device.device_id,
+            "device_info": {str(k): str(v) for k, v in device.device_info.items()},
+        }
+
+
+    @staticmethod
+    def _from_dict(entry: dict) -> DetectedDevice:
+        return DetectedDevice(
+            transport=TransportType(entry["transport"]),
+            identifier=entry["identifier"],
+            mac=entry.get("mac"),
+            device_id=entry.get("device_id"),
+            device_info=dict(entry.get("device_info", {})),
+        )
+
+
+    def _load(self) -> Dict[str, List[dict]]:
+        if self._entries is None:
+            self._entries = {}
+            with SettingsContext() as settings:
+                try:
+                    self._entries = dict(json.loads(settings.value(self.SETTINGS_KEY, "{}", type=str)))
+                except (ValueError, TypeError) as e:
+                    print(f"Ignoring invalid discovery cache: {e}")
+        return self._entries
+
+
+    def get(self, device_class: Optional[Type[PiezoDeviceBase]]) -> List[DetectedDevice]:
+        """
+        Returns the last known devices of the given device class.
+        """
+        devices = []
+        for entry in self._load().get(self._class_key(device_class), []):
+            try:
+                devices.append(self._from_dict(entry))
+            except (KeyError, ValueError) as e:
+                print(f"Ignoring invalid discovery cache entry {entry}: {e}")
+        return devices
+
+
+    def update(self, device_class: Optional[Type[PiezoDeviceBase]], devices: Iterable[DetectedDevice],
+               transports: set[TransportType]):
+        """
+        Replaces the cached devices of the scanned transports with the given devices. Cached
+        devices of other transports are kept.
+        """
+        key = self._class_key(device_class)
+        kept = [d for d in self.get(device_class) if d.transport not in transports]
+        entries = self._load()
+        entries[key] = [self._to_dict(d) for d in kept + list(devices)]
+        with SettingsContext() as settings:
+            settings.setValue(self.SETTINGS_KEY, json.dumps(entries))
+
+
+# Global cache shared by all device search widgets
+discovery_cache = DiscoveryCache()
@@ -7,8 +7,10 @@ from pisoworks.ui_device_search_widget import Ui_DeviceSearchWidget
 from pisoworks.ui_helpers import get_icon, get_icon_for_menu, safe_asyncslot
 
 from nv200.device_base import PiezoDeviceBase
-from nv200.device_discovery import discover_devices, DiscoverFlags, DetectedDevice
-from nv200.connection_utils import connect_to_detected_device
+from nv200.device_discovery import DiscoverFlags, DetectedDevice
+from nv200.shared_types import TransportType
+from pisoworks.device_discovery_stream import discover_devices_streaming, discovery_cache, device_key, scanned_transports
+from pisoworks.device_session import DeviceHandle, DeviceSession, session_manager
 
 class DeviceSearchWidget(QWidget):
     def __init__(self, parent=None):
@@ -19,22 +21,47 @@ class DeviceSearchWidget(QWidget):
         self._devices: list[DetectedDevice] = []
 
         self._current_device: PiezoDeviceBase = None
+        self._device_handle: DeviceHandle | None = None
         self._search_start_cb: Callable[[], Awaitable[None]] = None
         self._search_complete_cb: Callable[[list[DetectedDevice], Exception | None], Awaitable[None]] = None
         self._connect_cb: Callable[[DetectedDevice, Exception | None], Awaitable[None]] = None
         self._disconnect_cb: Callable[[], Awaitable[None]] = None
+        self._search_task: asyncio.Task | None = None
 
         self._init_search_ui()
 
     def set_device_class(self, device_class: Type[PiezoDeviceBase]) -> None:
+        """
+        Sets the class of the devices to search for. The devices of this class that are open
+        in other views and the last known devices are shown immediately and a search in the
+        background confirms them.
+        """
         self._device_class = device_class
 
         if self._device_class is not None:
-            QTimer.singleShot(0, safe_asyncslot(self._search_serial_devices))
+            open_devices = [s.detected_device for s in session_manager.sessions(device_class)]
+            cached = discovery_cache.get(device_class)
+            if open_devices or cached:
+                self.ui.devicesComboBox.clear()
+                for device in open_devices:
+                    self._add_or_update_device_item(device)
+                for device in cached:
+                    if self._find_device_item(device) < 0:
+                        self._add_or_update_device_item(device, confirmed=False)
+            QTimer.singleShot(0, safe_asyncslot(self._search_last_known_devices))
 
     def get_devices(self) -> list[DetectedDevice]:
         return self._devices
 
+    @property
+    def session(self) -> DeviceSession | None:
+        """
+        Returns the shared session of the connected device or None if no device is connected.
+        """
+        if self._device_handle is None or self._device_handle.released:
+            return None
+        return self._device_handle.session
+
     def set_on_search_start_callback(self, callback: Callable[[], Awaitable[None]]) -> None:
         self._search_start_cb = callback
 
@@ -96,6 +123,16 @@ class DeviceSearchWidget(QWidget):
         
         await self._connect_device(device)
 
+    async def _search_last_known_devices(self) -> None:
+        """
+        Searches the serial devices and, if the last known devices include network
+        devices, the Ethernet devices.
+        """
+        flags = DiscoverFlags.DETECT_SERIAL
+        if any(d.transport == TransportType.TELNET for d in discovery_cache.get(self._device_class)):
+            flags |= DiscoverFlags.DETECT_ETHERNET
+        await self._search_devices(self._device_class, flags)
+
     async def _search_all_devices(self) -> None:
         """
         Initiates a search for all available devices.
@@ -114,40 +151,117 @@ class DeviceSearchWidget(QWidget):
         """
         await self._search_devices(self._device_class, DiscoverFlags.DETECT_ETHERNET)
 
+    def _find_device_item(self, device: DetectedDevice) -> int:
+        """
+        Returns the index of the combo box item of the given device or -1.
+        """
+        combo = self.ui.devicesComboBox
+        key = device_key(device)
+        for index in range(combo.count()):
+            data = combo.itemData(index)
+            if data is not None and device_key(data) == key:
+                return index
+        return -1
+
+    def _add_or_update_device_item(self, device: DetectedDevice, confirmed: bool = True) -> None:
+        """
+        Adds the given device to the devices combo box or updates its item. Devices that
+        are not confirmed by the current search are marked as last seen.
+        """
+        combo = self.ui.devicesComboBox
+        # Remove the "No devices found." placeholder
+        placeholder = combo.findData(None)
+        if placeholder >= 0:
+            combo.removeItem(placeholder)
+
+        text = f"{device}" if confirmed else f"{device} (last seen)"
+        index = self._find_device_item(device)
+        if index < 0:
+            combo.addItem(text, device)
+        else:
+            combo.setItemText(index, text)
+            combo.setItemData(index, device)
+            if index == combo.currentIndex():
+                self._on_device_selected(index)
+
     async def _search_devices(self, device: Type[PiezoDeviceBase], discover_flags: DiscoverFlags) -> None:
         """
         Asynchronously searches for available devices and updates the UI accordingly.
+        Serial and Ethernet devices are searched concurrently and each device is added to
+        the devices combo box as soon as it is found. Listed devices of the searched interfaces
+        stay in the list as last seen devices until the search has confirmed or removed them.
         """
         ui = self.ui
+        combo = ui.devicesComboBox
         ui.searchDevicesButton.setEnabled(False)
-        ui.connectionButton.setEnabled(False)
         QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self._search_task = asyncio.current_task()
 
         error = None
+        completed = False
         
         if self._search_start_cb:
             await self._search_start_cb()
 
         self._devices = []
+        transports = scanned_transports(discover_flags)
+        listed = [combo.itemData(i) for i in range(combo.count())]
+        combo.clear()
+        for listed_device in listed:
+            if listed_device is not None and listed_device.transport in transports:
+                self._add_or_update_device_item(listed_device, confirmed=False)
+        confirmed : set[str] = set()
+
+        def on_found(found_device: DetectedDevice):
+            confirmed.add(device_key(found_device))
+            self._add_or_update_device_item(found_device)
+
+        # Devices that are open in a view are not connected to by the search
+        open_devices = [s.detected_device for s in session_manager.sessions(device)
+                        if s.detected_device.transport in transports]
+        for open_device in open_devices:
+            on_found(open_device)
        
         try:
-            self._devices = await discover_devices(flags=discover_flags, device_class=device)    
+            found = await discover_devices_streaming(on_found, flags=discover_flags, device_class=device,
+                                                     exclude_keys=session_manager.keys_in_use())
+            self._devices = open_devices + found
+            completed = True
         except Exception as e:
             error = e
         finally:
+            self._search_task = None
             QApplication.restoreOverrideCursor()
             self.ui.searchDevicesButton.setEnabled(True)
-            self.ui.devicesComboBox.clear()
-            
-            if self._devices:
-                for device in self._devices:
-                    self.ui.devicesComboBox.addItem(f"{device}", device)
-            else:
-                self.ui.devicesComboBox.addItem("No devices found.", None)
+
+            # Remove the last seen devices that have not been found again
+            for index in reversed(range(combo.count())):
+                data = combo.itemData(index)
+                if data is not None and device_key(data) not in confirmed:
+                    combo.removeItem(index)
+            if combo.count() == 0:
+                combo.addItem("No devices found.", None)
+
+            if completed:
+                discovery_cache.update(device, self._devices, transports)
             
             if self._search_complete_cb:
                 await self._search_complete_cb(self._devices, error)
 
+    async def _cancel_search(self) -> None:
+        """
+        Cancels a running device search - e.g. before connecting to a device, because the
+        search may access the same serial port.
+        """
+        task = self._search_task
+        if task is None or task.done() or task is asyncio.current_task():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     async def _disconnect_device(self, update_ui: bool = True) -> None:
         """
         Disconnects from the currently connected device and updates the UI.
@@ -155,8 +269,10 @@ class DeviceSearchWidget(QWidget):
         if update_ui:
             self.ui.connectionButton.setEnabled(False)
         
-        if self._current_device:
-            await self._current_device.close()
+        if self._device_handle:
+            # The connection is closed when the last view releases the device
+            await self._device_handle.release()
+            self._device_handle = None
         
         if update_ui and self._disconnect_cb:
             await self._disconnect_cb()
@@ -175,10 +291,12 @@ class DeviceSearchWidget(QWidget):
         error = None
 
         try:
+            await self._cancel_search()
             await self._disconnect_device()
 
             self.ui.connectionButton.setEnabled(False)
-            self._current_device = await connect_to_detected_device(device)
+            self._device_handle = await session_manager.acquire(device)
+            self._current_device = self._device_handle.device
             self.ui.connectionButton.setText("Disconnect")
         except Exception as e:
             self.ui.connectionButton.setText("Connect")
@@ -0,0 +1,203 @@
+"""
+Shared device connections for the device views.
+
+Each device view (NV200 or SpiBox dock) has its own device search widget. Without sharing,
+two views could not use the same device and every view opened its own connection. The
+session manager owns one connection (session) per device identity and hands out reference
+counted handles to the views:
+
+- The first view that connects to a device opens the session. Further views that connect
+  to the same device get a handle to the same device object. The connection is closed when
+  the last handle is released.
+- All views send their commands through the one device object, so they are serialized by the
+  lock of the device, which queues the waiting commands in FIFO order. Sequences of commands
+  that must not be interleaved with the commands of other views run with DeviceSession.execute.
+- Cached parameter state (see parameter_cache) is keyed by the device, so it is shared by
+  all views of a session. It is invalidated when the session is opened or closed.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Type, TypeVar
+
+from nv200.device_base import PiezoDeviceBase
+from nv200.shared_types import DetectedDevice
+from nv200.connection_utils import connect_to_detected_device
+
+from pisoworks.device_discovery_stream import device_key
+from pisoworks.parameter_cache import parameter_cache
+from pisoworks.waveform_upload_cache import device_cache_key
+
+
+T = TypeVar("T")
+
+
+class DeviceSession:
+    """
+    An open connection to a device that is shared by one or more views.
+
+    Attributes:
+        key (str): The identity of the device - see device_discovery_stream.device_key.
+        detected_device (DetectedDevice): The discovery information the session has been opened with.
+        device (PiezoDeviceBase): The connected device.
+        ref_count (int): The number of handles that have not been released.
+    """
+    def __init__(self, key: str, detected_device: DetectedDevice, device: PiezoDeviceBase):
+        self.key = key
+        self.detected_device = detected_device
+        self.device = device
+        self.ref_count = 0
+        self._queued = 0
+
+
+    @property
+    def queued_operations(self) -> int:
+        """
+        Returns the number of operations started with execute() that are running or waiting.
+        """
+        return self._queued
+
+
+    async def execute(self, operation: Callable[[PiezoDeviceBase], Awaitable[T]]) -> T:
+        """
+        Runs a sequence of device commands without commands of other views in between.
+        The operation waits in the command queue of the device until all commands and
+        operations that have been queued before are finished.
+
+        Example:
+            >>> await session.execute(lambda dev: dev.pid.set_pid_gains(kp=1.0, ki=2.0))
+        """
+        self._queued += 1
+        try:
+            async with self.device.lock:
+                return await operation(self.device)
+        finally:
+            self._queued -= 1
+
+
+class DeviceHandle:
+    """
+    A reference to a shared device session. Each view releases its handle when it
+    disconnects - the session is closed with the last handle.
+    """
+    def __init__(self, manager: "DeviceSessionManager", session: DeviceSession):
+        self._manager = manager
+        self._session : DeviceSession | None = session
+
+
+    @property
+    def session(self) -> DeviceSession:
+        if self._session is None:
+            raise RuntimeError("Device handle has been released.")
+        return self._session
+
+
+    @property
+    def device(self) -> PiezoDeviceBase:
+        return self.session.device
+
+
+    @property
+    def released(self) -> bool:
+        return self._session is None
+
+
+    async def release(self):
+        """
+        Releases the handle. Calling this more than once has no effect.
+        """
+        session, self._session = self._session, None
+        if session is not None:
+            await self._manager.release(session)
+
+
+class DeviceSessionManager:
+    """
+    Owns the device sessions of the application, keyed by device identity.
+    """
+    def __init__(self):
+        self._sessions : Dict[str, DeviceSession] = {}
+        self._opening : Dict[str, asyncio.Future] = {}
+
+
+    def sessions(self, device_class: Optional[Type[PiezoDeviceBase]] = None) -> List[DeviceSession]:
+        """
+        Returns the open sessions - optionally only those of the given device class.
+        """
+        return [s for s in self._sessions.values() if device_class is None or isinstance(s.device, device_class)]
+
+
+    def find(self, detected_device: DetectedDevice) -> DeviceSession | None:
+        """
+        Returns the open session of the given device or None.
+        """
+        return self._sessions.get(device_key(detected_device))
+
+
+    def keys_in_use(self) -> set[str]:
+        """
+        Returns the identities of all devices with an open session. The device discovery must
+        not connect to these devices, because this would interfere with the open connection.
+        """
+        return set(self._sessions) | set(self._opening)
+
+
+    async def _open(self, key: str, detected_device: DetectedDevice) -> DeviceSession:
+        future = asyncio.get_running_loop().create_future()
+        self._opening[key] = future
+        try:
+            device = await connect_to_detected_device(detected_device)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved - it is raised here and in the waiting views
+            future.exception()
+            raise
+        else:
+            session = DeviceSession(key, detected_device, device)
+            self._sessions[key] = session
+            # The device may have been changed while it was not connected
+            parameter_cache.invalidate(device_cache_key(device))
+            future.set_result(session)
+            print(f"Device session opened: {key}")
+            return session
+        finally:
+            del self._opening[key]
+
+
+    async def acquire(self, detected_device: DetectedDevice) -> DeviceHandle:
+        """
+        Returns a handle to the session of the given device. The session is opened, if
+        no view uses the device yet.
+
+        Raises:
+            Exception: If the connection to the device fails.
+        """
+        key = device_key(detected_device)
+        session = self._sessions.get(key)
+        if session is None:
+            opening = self._opening.get(key)
+            if opening is not None:
+                session = await asyncio.shield(opening)
+            else:
+                session = await self._open(key, detected_device)
+        session.ref_count += 1
+        return DeviceHandle(self, session)
+
+
+    async def release(self, session: DeviceSession):
+        """
+        Releases one reference to the given session and closes the connection with the last one.
+        Use DeviceHandle.release instead of calling this directly.
+        """
+        session.ref_count -= 1
+        if session.ref_count > 0 or self._sessions.get(session.key) is not session:
+            return
+        del self._sessions[session.key]
+        parameter_cache.invalidate(device_cache_key(session.device))
+        print(f"Device session closed: {session.key}")
+        await session.device.close()
+
+
+# Global session manager shared by all device views
+session_manager = DeviceSessionManager()
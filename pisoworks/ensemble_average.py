@@ -0,0 +1,84 @@
+"""
+Streaming ensemble statistics for repeated measurements.
+"""
+from typing import Sequence, Union
+
+import numpy as np
+
+
+class EnsembleAverage:
+    """
+    Calculates the per sample mean and variance of repeated runs with Welford's online algorithm.
+
+    Each run is folded into the running statistics as soon as it has been recorded, so the
+    memory usage does not depend on the number of runs and the runs do not need to be stored.
+    All updates work in place on NumPy arrays.
+    """
+    def __init__(self):
+        self.count = 0
+        self._mean : np.ndarray | None = None
+        self._m2 : np.ndarray | None = None
+
+
+    def reset(self):
+        """
+        Discards all runs.
+        """
+        self.count = 0
+        self._mean = None
+        self._m2 = None
+
+
+    def add(self, values: Union[Sequence[float], np.ndarray]):
+        """
+        Adds a run to the ensemble.
+
+        Args:
+            values (Sequence[float] | np.ndarray): The samples of the run - all runs need the same length.
+
+        Raises:
+            ValueError: If the number of samples differs from the previous runs.
+        """
+        values = np.asarray(values, dtype=float)
+        if self._mean is None:
+            self._mean = np.zeros_like(values)
+            self._m2 = np.zeros_like(values)
+        elif values.shape != self._mean.shape:
+            raise ValueError(f"Run has {values.size} samples, expected {self._mean.size}")
+
+        self.count += 1
+        delta = values - self._mean
+        self._mean += delta / self.count
+        # delta * (values - new mean) - reuse the delta buffer to avoid another temporary array
+        delta *= values - self._mean
+        self._m2 += delta
+
+
+    @property
+    def mean(self) -> np.ndarray:
+        """
+        Returns the per sample mean of all runs.
+        """
+        if self._mean is None:
+            return np.empty(0)
+        return self._mean.copy()
+
+
+    @property
+    def variance(self) -> np.ndarray:
+        """
+        Returns the per sample (unbiased) variance of all runs - zero for less than two runs.
+        """
+        if self._m2 is None:
+            return np.empty(0)
+        if self.count < 2:
+            return np.zeros_like(self._m2)
+        return self._m2 / (self.count - 1)
+
+
+    @property
+    def std(self) -> np.ndarray:
+        """
+        Returns the per sample standard deviation of all runs.
+        """
+        return np.sqrt(self.variance)
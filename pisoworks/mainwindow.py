@@ -26,6 +26,7 @@ from pisoworks.action_manager import ActionManager, MenuID, action_manager
 from pisoworks.style_manager import StyleManager, style_manager
 from pisoworks.settings_manager import SettingsContext
 from pisoworks.about_dialog import AboutDialog
+from pisoworks.waveform_upload_cache import waveform_upload_cache
 import pisoworks.ui_helpers as ui_helpers
 
 
@@ -96,6 +97,13 @@ class MainWindow(QMainWindow):
         action_manager.register_menu(MenuID.VIEW, self.ui.menuView)
         action_manager.register_menu(MenuID.HELP, self.ui.menuHelp)
 
+        remember_waveforms_action = QAction("Remember Uploaded Waveforms", parent=self)
+        remember_waveforms_action.setToolTip("Keep the waveform upload cache across application restarts")
+        remember_waveforms_action.setCheckable(True)
+        remember_waveforms_action.setChecked(waveform_upload_cache.is_persistent())
+        remember_waveforms_action.toggled.connect(waveform_upload_cache.set_persistent)
+        action_manager.add_action_to_menu(MenuID.FILE, remember_waveforms_action)
+
         manual_action = QAction("Manual...", parent=self)
         manual_action.triggered.connect(self.show_manual)
         manual_action.setIcon(ui_helpers.get_icon_for_menu("book_2", size=24, fill=False))
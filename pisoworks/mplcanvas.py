@@ -1,4 +1,6 @@
 from typing import Sequence, Union
+from collections import OrderedDict, deque
+import weakref
 from matplotlib import lines
 import numpy as np
 import csv
@@ -7,15 +9,18 @@ from matplotlib.backends.backend_qtagg import FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
 from matplotlib.colors import to_rgba
 from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.ticker import MultipleLocator
-from PySide6.QtCore import QStandardPaths, QTimer
+from PySide6.QtCore import QTimer, Signal
 from PySide6.QtGui import QPalette, QColor, QAction
-from PySide6.QtWidgets import QVBoxLayout, QWidget, QFileDialog
+from PySide6.QtWidgets import QVBoxLayout, QWidget, QWidgetAction
 from nv200.data_recorder import DataRecorder
 from pisoworks.style_manager import style_manager
+from pisoworks.settings_manager import SettingsContext
 from pisoworks.ui_helpers import get_icon
+from pisoworks.plot_export import build_export_columns, export_line_data
 
 
 def mpl_color(color: QColor) -> tuple[float, float, float, float]:
@@ -30,6 +35,473 @@ def mpl_color(color: QColor) -> tuple[float, float, float, float]:
     )
 
 
+def decimate_minmax(x_data: np.ndarray, y_data: np.ndarray, x_min: float, x_max: float, columns: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces the given data to the minimum and maximum value per pixel column of the visible range.
+
+    Only the samples within x_min and x_max (plus one neighbour on each side, so that the line
+    reaches the plot border) are used. The visible samples are split into `columns` buckets and for
+    each bucket the minimum and the maximum sample are kept in their original order. So the
+    rendered line looks the same as the full resolution line, but it only has about two points
+    per horizontal pixel.
+
+    Args:
+        x_data (np.ndarray): The x values - they need to be sorted in ascending order.
+        y_data (np.ndarray): The y values.
+        x_min (float): The lower limit of the visible x range.
+        x_max (float): The upper limit of the visible x range.
+        columns (int): The number of pixel columns of the visible x range.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The decimated x and y values.
+    """
+    start = max(int(np.searchsorted(x_data, x_min, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x_data, x_max, side='right')) + 1, len(x_data))
+    x_visible = x_data[start:stop]
+    y_visible = y_data[start:stop]
+
+    count = len(x_visible)
+    columns = max(int(columns), 1)
+    if count <= 2 * columns:
+        return x_visible, y_visible
+
+    # Split the visible samples into buckets of equal size - the remainder is put into
+    # an additional last bucket
+    bucket_size = count // columns
+    full_count = bucket_size * columns
+    buckets = y_visible[:full_count].reshape(columns, bucket_size)
+    offsets = np.arange(columns) * bucket_size
+    indices = [offsets + np.argmin(buckets, axis=1), offsets + np.argmax(buckets, axis=1)]
+    if full_count < count:
+        rest = y_visible[full_count:]
+        indices.append(np.array([full_count + np.argmin(rest), full_count + np.argmax(rest)]))
+
+    # Always keep the first and the last sample to keep the x range of the line
+    indices.append(np.array([0, count - 1]))
+    indices = np.unique(np.concatenate(indices))
+    return x_visible[indices], y_visible[indices]
+
+
+def build_export_dataframe(x_label: str, line_labels: Sequence[str], line_data: Sequence[tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """
+    Builds the export DataFrame from the data of several lines - see build_export_columns()
+    for the column layout.
+
+    Args:
+        x_label (str): The name of the X column.
+        line_labels (Sequence[str]): The label of each line - used as column name.
+        line_data (Sequence[tuple[np.ndarray, np.ndarray]]): The X and Y data of each line.
+
+    Returns:
+        pd.DataFrame: The export data.
+    """
+    names, columns = build_export_columns(x_label, line_labels, line_data)
+    return pd.DataFrame(dict(zip(names, columns)))
+
+
+class RedrawScheduler:
+    """
+    Central redraw scheduler shared by all canvases.
+
+    Instead of redrawing a canvas immediately after each change, the canvas is marked dirty and
+    all dirty canvases are redrawn at most once per display frame. Several changes in a row
+    (e.g. clear_plot followed by add_line for each channel) result in a single redraw and the
+    layout pass (tight_layout) is only done, if one of the requests required it.
+    """
+    LINES = 1       # only the line artists changed - blit on top of the cached background
+    FULL = 2        # the figure changed - full redraw required
+    LAYOUT = 3      # the layout needs to be recalculated before the full redraw
+
+    def __init__(self, frame_rate: float = 60.0):
+        self._dirty : weakref.WeakKeyDictionary[MplCanvas, int] = weakref.WeakKeyDictionary()
+        self._timer : QTimer | None = None
+        self._frame_interval_ms = 16
+        self.set_frame_rate(frame_rate)
+        self.reset_statistics()
+
+
+    def set_frame_rate(self, frame_rate: float):
+        """
+        Sets the maximum number of redraws per second.
+        """
+        self._frame_interval_ms = max(int(1000 / frame_rate), 1)
+
+
+    def request(self, canvas: "MplCanvas", level: int):
+        """
+        Marks the given canvas dirty. The canvas is redrawn with the next frame.
+
+        Args:
+            canvas (MplCanvas): The canvas to redraw.
+            level (int): The required redraw level - LINES, FULL or LAYOUT. If the canvas is
+                already dirty, the highest requested level is used.
+        """
+        self.requested_count += 1
+        self._dirty[canvas] = max(level, self._dirty.get(canvas, 0))
+
+        # The timer is created lazily to ensure that it lives in the Qt main thread
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+        if not self._timer.isActive():
+            self._timer.start(self._frame_interval_ms)
+
+
+    def is_pending(self, canvas: "MplCanvas") -> bool:
+        """
+        Returns True, if the given canvas is waiting for a redraw.
+        """
+        return canvas in self._dirty
+
+
+    def flush(self):
+        """
+        Redraws all dirty canvases immediately.
+        """
+        dirty = list(self._dirty.items())
+        self._dirty.clear()
+        for canvas, level in dirty:
+            try:
+                canvas.redraw_now(level)
+            except RuntimeError as e:
+                # The underlying Qt widget has already been deleted
+                print(f"Skipping redraw of deleted canvas: {e}")
+                continue
+            self.draw_count += 1
+            if level == self.LAYOUT:
+                self.layout_count += 1
+
+
+    @property
+    def draws_saved(self) -> int:
+        """
+        Returns the number of redraws that have been saved by merging redraw requests.
+        """
+        return self.requested_count - self.draw_count - len(self._dirty)
+
+
+    def reset_statistics(self):
+        """
+        Resets the redraw counters.
+        """
+        self.requested_count = 0
+        self.draw_count = 0
+        self.layout_count = 0
+
+
+    def statistics(self) -> dict[str, int]:
+        """
+        Returns the redraw counters as a dictionary.
+        """
+        return {
+            "requested": self.requested_count,
+            "drawn": self.draw_count,
+            "layouts": self.layout_count,
+            "saved": self.draws_saved,
+        }
+
+
+redraw_scheduler = RedrawScheduler()
+
+
+class StreamingLine:
+    """
+    A live streaming line backed by a preallocated NumPy ring buffer.
+
+    New samples are appended in chunks with append(). The line shows a fixed rolling time
+    window, where the x axis is the time relative to the newest sample (-window_ms ... 0 ms).
+    Appending only writes into the ring buffer - the buffer is copied into the ordered
+    display array once per display frame, when the canvas redraws its lines. No arrays are
+    reallocated during streaming, and as long as the axes limits stay the same, the line is
+    updated via blitting.
+    """
+    def __init__(self, canvas: "MplCanvas", line: lines.Line2D, window_ms: float, sample_period_ms: float,
+                 y_range: tuple[float, float] | None = None):
+        self.canvas = canvas
+        self.line = line
+        self.sample_period_ms = sample_period_ms
+        self.y_range = y_range
+        self.capacity = max(int(round(window_ms / sample_period_ms)), 2)
+        self.total_samples = 0
+
+        self._ring = np.zeros(self.capacity)
+        self._write_index = 0
+        self._count = 0
+        self._dirty = False
+
+        # Ordered display arrays - the line only gets views of these arrays
+        self._x = (np.arange(self.capacity) - (self.capacity - 1)) * sample_period_ms
+        self._y = np.full(self.capacity, np.nan)
+        self.line.set_data(self._x[:0], self._y[:0])
+
+
+    def attach(self, canvas, line):
+        """
+        Moves the streaming line to another canvas and line artist, e.g. after the plot backend
+        has been switched. The samples in the ring buffer are kept, so the rolling window is
+        shown again on the new line with the next redraw.
+
+        Args:
+            canvas (MplCanvas | PainterCanvas): The canvas that renders the line.
+            line: The new line artist of the canvas.
+        """
+        self.canvas = canvas
+        self.line = line
+        self.line.set_data(self._x[:0], self._y[:0])
+        self._dirty = True
+        self.canvas.redraw_lines()
+
+
+    def append(self, samples: Union[Sequence[float], np.ndarray]):
+        """
+        Appends new samples to the ring buffer and schedules a redraw of the canvas lines.
+        If more samples than the capacity are given, only the newest samples are kept.
+
+        Args:
+            samples (Sequence[float] | np.ndarray): The new samples in chronological order.
+        """
+        samples = np.asarray(samples, dtype=float).ravel()
+        self.total_samples += len(samples)
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity:]
+
+        count = len(samples)
+        if count == 0:
+            return
+
+        start = self._write_index
+        first = min(count, self.capacity - start)
+        self._ring[start:start + first] = samples[:first]
+        self._ring[:count - first] = samples[first:]
+
+        self._write_index = (start + count) % self.capacity
+        self._count = min(self._count + count, self.capacity)
+        self._dirty = True
+        self.canvas.redraw_lines()
+
+
+    def clear(self):
+        """
+        Removes all samples from the ring buffer.
+        """
+        self._write_index = 0
+        self._count = 0
+        self._y.fill(np.nan)
+        self._dirty = True
+        self.canvas.redraw_lines()
+
+
+    def values(self) -> np.ndarray:
+        """
+        Returns a copy of the samples in the rolling window in chronological order.
+        """
+        self.sync()
+        return self._y[self.capacity - self._count:].copy()
+
+
+    def sync(self):
+        """
+        Copies the ring buffer into the ordered display arrays of the line. If no fixed y range
+        is given, the y limits are extended when the data leaves the current limits.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        # Oldest samples are from the write index to the end of the ring buffer
+        older = self.capacity - self._write_index
+        self._y[:older] = self._ring[self._write_index:]
+        self._y[older:] = self._ring[:self._write_index]
+
+        first = self.capacity - self._count
+        self.line.set_data(self._x[first:], self._y[first:])
+        self._update_ylim(self._y[first:])
+
+
+    def _update_ylim(self, values: np.ndarray):
+        """
+        Updates the y limits of the axes if required. Changing the limits causes a full redraw,
+        so the limits are only extended with some margin and never shrunk during streaming.
+        """
+        ax = self.line.axes
+        if ax is None or len(values) == 0:
+            return
+
+        if self.y_range is not None:
+            if ax.get_ylim() != tuple(self.y_range):
+                ax.set_ylim(*self.y_range)
+            return
+
+        y_min, y_max = np.nanmin(values), np.nanmax(values)
+        if not np.isfinite(y_min) or not np.isfinite(y_max):
+            return
+        low, high = ax.get_ylim()
+        if y_min < low or y_max > high:
+            margin = max((y_max - y_min) * 0.1, 1e-9)
+            ax.set_ylim(min(low, y_min - margin), max(high, y_max + margin))
+
+
+class HistoryCollection:
+    """
+    Bounded container for history traces (e.g. previous recordings in "Keep History" mode).
+
+    All history traces of one axes are rendered by a single LineCollection with a single
+    legend entry. The number of traces is limited by the history depth - the oldest trace is
+    dropped if a new one is pushed into a full history. Older traces are faded by age: the
+    alpha value of each trace is looked up in a precomputed alpha table, so fading does not
+    need any per line updates or redraws.
+
+    Like the lines of the canvas, the traces keep their full resolution data and are decimated
+    again for the visible x range when the axes are zoomed or panned (see decimate()).
+    """
+    def __init__(self, ax: Axes, depth: int = 20, fade: float = 0.5, min_alpha: float = 0.05, label: str = "History"):
+        self.ax = ax
+        self.label = label
+        self.fade = fade
+        self.min_alpha = min_alpha
+        # Traces (newest first): full resolution x and y, label, color, rendered segment and data limits
+        self._traces : deque[tuple[np.ndarray, np.ndarray, str, np.ndarray, np.ndarray, tuple | None]] = deque(maxlen=depth)
+        self._x_range : tuple[float, float] | None = None   # None renders the full range of each trace
+        self._columns = 1000
+        self._decimation_enabled = True
+        self._alpha_table = np.empty(0)
+        self.collection = LineCollection([], label=label)
+        ax.add_collection(self.collection, autolim=False)
+        self._update_alpha_table()
+
+
+    @property
+    def depth(self) -> int:
+        """
+        Returns the maximum number of history traces.
+        """
+        return self._traces.maxlen
+
+
+    def set_depth(self, depth: int):
+        """
+        Sets the maximum number of history traces - if the history contains more traces,
+        the oldest traces are dropped.
+        """
+        self._traces = deque(self._traces, maxlen=max(int(depth), 1))
+        self._update_alpha_table()
+        self.update_collection()
+
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+    def _update_alpha_table(self):
+        """
+        Precomputes the alpha value for each age - the newest trace has age 0.
+        """
+        ages = np.arange(self.depth)
+        self._alpha_table = np.maximum(self.fade ** (ages + 1), self.min_alpha)
+
+
+    def _segment(self, x_full: np.ndarray, y_full: np.ndarray) -> np.ndarray:
+        """
+        Returns the rendered segment of a trace - decimated for the current x range and
+        pixel columns, if the x values are sorted.
+        """
+        if self._decimation_enabled and len(x_full) > 1 and np.all(np.diff(x_full) >= 0):
+            x_min, x_max = self._x_range if self._x_range is not None else (x_full[0], x_full[-1])
+            x_full, y_full = decimate_minmax(x_full, y_full, x_min, x_max, self._columns)
+        return np.column_stack((x_full, y_full))
+
+
+    def push(self, x_data: np.ndarray, y_data: np.ndarray, label: str, rgba: Sequence[float], columns: int | None = None):
+        """
+        Adds a trace to the history. The full resolution data is kept for the export and
+        the decimation, a decimated version is used for rendering.
+
+        Args:
+            x_data (np.ndarray): The x values of the trace.
+            y_data (np.ndarray): The y values of the trace.
+            label (str): The label of the trace - used for the export.
+            rgba (Sequence[float]): The color of the trace. The alpha value is faded by age.
+            columns (int | None): The number of pixel columns used for the decimation - None keeps
+                the number of columns of the last decimation.
+        """
+        if columns is not None:
+            self._columns = max(int(columns), 1)
+        x_full = np.asarray(x_data, dtype=float)
+        y_full = np.asarray(y_data, dtype=float)
+        finite = np.isfinite(x_full) & np.isfinite(y_full)
+        limits = None
+        if finite.any():
+            x, y = x_full[finite], y_full[finite]
+            limits = (x.min(), x.max(), y.min(), y.max())
+        self._traces.appendleft((x_full, y_full, label, np.asarray(to_rgba(rgba)), self._segment(x_full, y_full), limits))
+        self.update_collection()
+
+
+    def decimate(self, x_range: tuple[float, float] | None, columns: int, enabled: bool = True):
+        """
+        Decimates all traces again from their full resolution data.
+
+        Args:
+            x_range (tuple[float, float] | None): The visible x range or None for the full range of each trace.
+            columns (int): The number of pixel columns of the visible x range.
+            enabled (bool): If False, the traces are rendered with their full resolution data.
+        """
+        self._x_range = x_range
+        self._columns = max(int(columns), 1)
+        self._decimation_enabled = enabled
+        self._traces = deque(((x, y, label, rgba, self._segment(x, y), limits) for x, y, label, rgba, _, limits in self._traces),
+                             maxlen=self._traces.maxlen)
+        self.collection.set_segments([trace[4] for trace in self._traces])
+
+
+    def data_limits(self) -> tuple[float, float, float, float] | None:
+        """
+        Returns the finite data limits (x_min, x_max, y_min, y_max) of all traces or None if
+        the history contains no finite data. The collection is not part of the data limits of
+        the axes, so the canvas adds these limits when it autoscales the axes.
+        """
+        trace_limits = [trace[5] for trace in self._traces if trace[5] is not None]
+        if not trace_limits:
+            return None
+        x_min, x_max, y_min, y_max = zip(*trace_limits)
+        return min(x_min), max(x_max), min(y_min), max(y_max)
+
+
+    def clear(self):
+        """
+        Removes all traces from the history.
+        """
+        self._traces.clear()
+        self.update_collection()
+
+
+    def traces(self) -> list[tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Returns the full resolution data and the label of all traces - newest first.
+        """
+        return [(x, y, label) for x, y, label, *_ in self._traces]
+
+
+    def colored_traces(self) -> list[tuple[np.ndarray, np.ndarray, str, tuple[float, float, float, float]]]:
+        """
+        Returns the full resolution data, the label and the unfaded color of all traces - newest first.
+        """
+        return [(x, y, label, tuple(rgba)) for x, y, label, rgba, *_ in self._traces]
+
+
+    def update_collection(self):
+        """
+        Passes the decimated traces and the faded colors to the LineCollection.
+        """
+        self.collection.set_segments([trace[4] for trace in self._traces])
+        if self._traces:
+            colors = np.array([trace[3] for trace in self._traces])
+            colors[:, 3] *= self._alpha_table[:len(self._traces)]
+            self.collection.set_colors(colors)
+        self.collection.set_label(f"{self.label} ({len(self._traces)})")
+
+
 class MplCanvas(FigureCanvas):
     '''
     Class to represent the FigureCanvas widget for integration of Matplotlib with Qt.
@@ -60,6 +532,32 @@ class MplCanvas(FigureCanvas):
         self._axes_timer.setSingleShot(True)
         self._axes_timer.timeout.connect(self.update_layout)
 
+        # Blitting support - the static background (axes, grid, ticks, legend) is cached
+        # after each full draw and only the line artists are redrawn on top of it.
+        self._blit_enabled : bool = self.supports_blit
+        self._background = None
+        self._background_key : tuple | None = None
+
+        # Level of detail - the full resolution data of each line is kept here and only a
+        # decimated version (about two points per horizontal pixel) is passed to the renderer.
+        self._full_line_data : weakref.WeakKeyDictionary[lines.Line2D, tuple[np.ndarray, np.ndarray]] = weakref.WeakKeyDictionary()
+        self._decimation_enabled : bool = True
+        self._decimation_suspended : bool = False
+
+        # Layout cache - maps the layout key to the subplot parameters computed by tight_layout
+        self._layout_cache : OrderedDict[tuple, dict[str, float]] = OrderedDict()
+        self.layout_cache_hits = 0
+        self.layout_cache_misses = 0
+
+        # History traces of each axes - see move_lines_to_history()
+        self._history : dict[Axes, HistoryCollection] = {}
+        self._history_depth = 20
+        self._bands : list[tuple] = []   # (artist, x, low, high, color, axis, alpha) - see bands()
+
+        # Live streaming lines backed by ring buffers
+        self._streaming_lines : list[StreamingLine] = []
+        self.ax1.callbacks.connect("xlim_changed", lambda event: self.on_xlim_changed())
+
         self.set_dark_mode(style_manager.style.is_current_theme_dark())
         self.apply_font_size(style_manager.base_font_size())
         style_manager.style.stylesheet_changed.connect(self.on_stylesheet_changed)
@@ -163,13 +661,374 @@ class MplCanvas(FigureCanvas):
         """
         Updates the layout of the figure to ensure proper spacing and alignment.
         This method is useful after adding or modifying elements in the figure.
+        The update is done by the redraw scheduler with the next display frame.
+        """
+        redraw_scheduler.request(self, RedrawScheduler.LAYOUT)
+
+
+    def redraw_now(self, level: int = RedrawScheduler.LAYOUT):
+        """
+        Redraws the canvas immediately with the given redraw level. This is called by the
+        redraw scheduler and normally should not be called directly.
+        """
+        self._sync_streaming_lines()
+        if level == RedrawScheduler.LAYOUT:
+            self._update_layout_now()
+        elif level == RedrawScheduler.FULL:
+            self.draw()
+        else:
+            self._redraw_lines_now()
+
+
+    def _update_layout_now(self):
+        """
+        Recalculates the layout of the figure and redraws the complete figure.
         """
         self.align_ticks()
         new_size = self.size()        
 
         if new_size.width() > 0 and new_size.height() > 0:  # avoid singular matrix
-            self._fig.tight_layout()
+            self._apply_tight_layout()
+            self.decimate_lines()   # the axes width in pixels may have changed
+            self.draw()
+
+
+    def _layout_key(self) -> tuple:
+        """
+        Returns a key that contains everything that has an effect on the result of tight_layout:
+        the canvas size, the font size, the number of axes, the tick labels, the offset texts
+        (e.g. "1e-6" or "+2.5e3") and the axes labels.
+        """
+        key = [self.get_width_height(physical=True), self._fig.dpi, style_manager.base_font_size(), len(self.axes_list)]
+        for ax in self.axes_list:
+            for axis in (ax.xaxis, ax.yaxis):
+                if not axis.get_visible():
+                    continue
+                # The label texts and not only their lengths are used, because the width of a
+                # label depends on its characters in a proportional font. format_ticks() also
+                # updates the offset of the formatter, which is drawn as offset text next to the axis.
+                formatter = axis.major.formatter
+                key.append(tuple(formatter.format_ticks(axis.get_majorticklocs())))
+                key.append(formatter.get_offset())
+                key.append(axis.label.get_text())
+            key.append(ax.get_title())
+        return tuple(key)
+
+
+    def _apply_tight_layout(self):
+        """
+        Applies the tight layout to the figure. The subplot parameters are cached, so that
+        tight_layout is only calculated, if the layout key changed.
+        """
+        key = self._layout_key()
+        params = self._layout_cache.get(key)
+        if params is not None:
+            self.layout_cache_hits += 1
+            self._layout_cache.move_to_end(key)
+            self._fig.subplots_adjust(**params)
+            return
+
+        self.layout_cache_misses += 1
+        self._fig.tight_layout()
+        sp = self._fig.subplotpars
+        self._layout_cache[key] = dict(left=sp.left, right=sp.right, bottom=sp.bottom, top=sp.top,
+                                       wspace=sp.wspace, hspace=sp.hspace)
+        if len(self._layout_cache) > 32:
+            self._layout_cache.popitem(last=False)
+
+
+    def set_blit_enabled(self, enabled: bool):
+        """
+        Enables or disables the blitting based incremental redraw.
+
+        Args:
+            enabled (bool): If True, line updates only redraw the line artists on top of the
+                cached background. If False, every update triggers a full redraw.
+        """
+        self._blit_enabled = enabled and self.supports_blit
+        self._background = None
+        self._background_key = None
+
+
+    def is_blit_enabled(self) -> bool:
+        """
+        Returns True, if the blitting based incremental redraw is active.
+        """
+        return self._blit_enabled
+
+
+    def _line_artists(self) -> list[lines.Line2D]:
+        """
+        Returns all line artists of all axes, that are drawn on top of the cached background.
+        """
+        return [line for ax in self.axes_list for line in ax.get_lines()]
+
+
+    def _static_state_key(self) -> tuple:
+        """
+        Returns a key that describes everything that is part of the cached background.
+        If this key changes, the background is invalid and a full redraw is required.
+        """
+        key = [self.get_width_height(physical=True), self._fig.dpi, to_rgba(self._fig.patch.get_facecolor())]
+        for ax in self.axes_list:
+            key.append((ax.get_xlim(), ax.get_ylim(), ax.get_xlabel(), ax.get_ylabel(), ax.get_title()))
+
+        legend = self.ax1.get_legend()
+        if legend:
+            key.append(tuple(text.get_text() for text in legend.get_texts()))
+        return tuple(key)
+
+
+    def draw(self):
+        """
+        Renders the complete figure.
+
+        If blitting is enabled, the figure is rendered without the line artists first to
+        cache the static background. The lines are then drawn on top of the cached background.
+        """
+        if not self._blit_enabled:
+            super().draw()
+            return
+
+        line_artists = [line for line in self._line_artists() if not line.get_animated()]
+        for line in line_artists:
+            line.set_animated(True)
+        try:
+            super().draw()
+            self._background = self.copy_from_bbox(self._fig.bbox)
+            self._background_key = self._static_state_key()
+            self._draw_line_artists()
+        finally:
+            for line in line_artists:
+                line.set_animated(False)
+
+
+    def _draw_line_artists(self):
+        """
+        Draws all line artists and the legend on top of the current canvas content.
+        """
+        for ax in self.axes_list:
+            for line in ax.get_lines():
+                if line.get_visible():
+                    ax.draw_artist(line)
+
+        # The legend is part of the background, but it needs to stay on top of the lines
+        legend = self.ax1.get_legend()
+        if legend:
+            self.ax1.draw_artist(legend)
+
+
+    def redraw_lines(self):
+        """
+        Schedules a redraw of the line artists after their data or style changed.
+        The redraw is done by the redraw scheduler with the next display frame.
+        """
+        redraw_scheduler.request(self, RedrawScheduler.LINES)
+
+
+    def _redraw_lines_now(self):
+        """
+        Redraws the line artists immediately.
+
+        Only the line artists are redrawn on top of the cached background if possible.
+        A full redraw is done, if blitting is disabled, no valid background is cached or
+        if the axes limits, labels or the figure size changed since the last full redraw.
+        """
+        if (not self._blit_enabled
+                or self._background is None
+                or self._background_key != self._static_state_key()):
             self.draw()
+            return
+
+        self.restore_region(self._background)
+        self._draw_line_artists()
+        self.blit(self._fig.bbox)
+
+
+    def set_decimation_enabled(self, enabled: bool):
+        """
+        Enables or disables the level of detail decimation of long lines.
+
+        Args:
+            enabled (bool): If True, only about two points per horizontal pixel are passed to the
+                renderer. If False, all lines are rendered with their full resolution data.
+        """
+        self._decimation_enabled = enabled
+        self.decimate_lines()
+        redraw_scheduler.request(self, RedrawScheduler.FULL)
+
+
+    def _set_full_line_data(self, line: lines.Line2D, x_data: Sequence[float], y_data: Sequence[float]):
+        """
+        Stores the full resolution data of the given line and passes the decimated data to the line.
+        """
+        try:
+            x_full = np.asarray(x_data, dtype=float)
+            y_full = np.asarray(y_data, dtype=float)
+        except (TypeError, ValueError):
+            x_full = y_full = None
+
+        # Decimation requires sorted x values with matching length - other data is plotted unchanged
+        if (x_full is not None and x_full.ndim == 1 and x_full.shape == y_full.shape
+                and (len(x_full) < 2 or np.all(np.diff(x_full) >= 0))):
+            self._full_line_data[line] = (x_full, y_full)
+            self._decimate_line(line, full_range=True)
+        else:
+            self._full_line_data.pop(line, None)
+            line.set_data(x_data, y_data)
+
+
+    def get_line_data(self, line: lines.Line2D) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the full resolution x and y data of the given line - independent of the
+        decimated data that is currently rendered.
+        """
+        full_data = self._full_line_data.get(line)
+        if full_data is not None:
+            return full_data
+        return np.asarray(line.get_xdata()), np.asarray(line.get_ydata())
+
+
+    def _decimate_line(self, line: lines.Line2D, full_range: bool = False):
+        """
+        Updates the rendered data of the given line from its full resolution data for the
+        current x limits and the current axes width in pixels.
+        """
+        full_data = self._full_line_data.get(line)
+        if full_data is None:
+            return
+
+        x_full, y_full = full_data
+        if not self._decimation_enabled or len(x_full) == 0:
+            line.set_data(x_full, y_full)
+            return
+
+        ax = line.axes
+        if full_range:
+            x_min, x_max = x_full[0], x_full[-1]
+        else:
+            x_min, x_max = sorted(ax.get_xlim())
+        columns = max(int(ax.bbox.width), 1)
+        line.set_data(*decimate_minmax(x_full, y_full, x_min, x_max, columns))
+
+
+    def decimate_lines(self, full_range: bool = False):
+        """
+        Updates the rendered data of all lines for the current x limits.
+
+        Args:
+            full_range (bool): If True, the complete x range of each line is used. This is required
+                before the axes are autoscaled, so that the data limits cover the whole line.
+        """
+        for line in self._line_artists():
+            self._decimate_line(line, full_range)
+        for ax, history in self._history.items():
+            if len(history):
+                x_range = None if full_range else tuple(sorted(ax.get_xlim()))
+                history.decimate(x_range, max(int(ax.bbox.width), 1), self._decimation_enabled)
+
+
+    def on_xlim_changed(self):
+        """
+        Handles zooming and panning - the lines are decimated again for the new visible x range
+        so that the details come back when zooming in.
+        """
+        if not self._decimation_suspended:
+            self.decimate_lines()
+
+
+    def _autoscale_view(self, ax: Axes):
+        """
+        Autoscales the given axes to the full resolution data of all its lines and decimates
+        the lines again for the resulting x limits.
+        """
+        self._decimation_suspended = True
+        try:
+            self.decimate_lines(full_range=True)
+            ax.relim()
+            history = self._history.get(ax)
+            limits = history.data_limits() if history is not None else None
+            if limits is not None:
+                x_min, x_max, y_min, y_max = limits
+                ax.update_datalim([(x_min, y_min), (x_max, y_max)])
+            ax.autoscale_view()
+        finally:
+            self._decimation_suspended = False
+        self.decimate_lines()
+
+
+    def add_streaming_line(self, label: str, window_ms: float, sample_period_ms: float,
+                           color : QColor = QColor('orange'), axis : int = 0,
+                           y_range: tuple[float, float] | None = None) -> StreamingLine:
+        """
+        Adds a live streaming line that shows a fixed rolling time window.
+
+        Args:
+            label (str): The label of the line for the legend.
+            window_ms (float): The length of the rolling time window in milliseconds.
+            sample_period_ms (float): The time between two samples in milliseconds.
+            color (QColor): The line color.
+            axis (int): The index of the axes to add the line to.
+            y_range (tuple[float, float] | None): Fixed y limits. If None, the y limits are
+                extended automatically if the data leaves the current limits.
+
+        Returns:
+            StreamingLine: The streaming line - new samples are added with StreamingLine.append().
+        """
+        ax = self.get_axes(axis)
+        line, = ax.plot([], [], color=mpl_color(color), label=label)
+        stream = StreamingLine(self, line, window_ms, sample_period_ms, y_range)
+        self._add_streaming_line(stream, ax)
+        return stream
+
+
+    def attach_streaming_line(self, stream: StreamingLine, axis: int = 0):
+        """
+        Shows an existing streaming line of another canvas in this canvas. The label and the color
+        of its current line are used for the new line and the samples of the rolling window are kept.
+
+        Args:
+            stream (StreamingLine): The streaming line to attach.
+            axis (int): The index of the axes to add the line to.
+        """
+        ax = self.get_axes(axis)
+        color = QColor.fromRgbF(*to_rgba(stream.line.get_color()))
+        line, = ax.plot([], [], color=mpl_color(color), label=stream.line.get_label())
+        stream.attach(self, line)
+        self._add_streaming_line(stream, ax)
+
+
+    def _add_streaming_line(self, stream: StreamingLine, ax: Axes):
+        """
+        Registers the streaming line and configures the axes for the rolling time window.
+        """
+        self._streaming_lines.append(stream)
+
+        # The x axis is the time relative to the newest sample and does not change while streaming
+        ax.set_autoscale_on(False)
+        ax.set_xlim(-(stream.capacity - 1) * stream.sample_period_ms, 0)
+        if stream.y_range is not None:
+            ax.set_ylim(*stream.y_range)
+
+        self.generate_legend()
+        self.update_layout()
+
+
+    def streaming_lines(self) -> list[StreamingLine]:
+        """
+        Returns the streaming lines that are still shown in the plot.
+        """
+        return [stream for stream in self._streaming_lines if stream.line.axes is not None]
+
+
+    def _sync_streaming_lines(self):
+        """
+        Copies the ring buffers of all streaming lines into their line artists. Streaming lines
+        that have been removed from the axes are dropped.
+        """
+        self._streaming_lines = [stream for stream in self._streaming_lines if stream.line.axes is not None]
+        for stream in self._streaming_lines:
+            stream.sync()
 
 
     def set_plot_title(self, title: str):
@@ -222,17 +1081,17 @@ class MplCanvas(FigureCanvas):
         
         print(f"Adding line with color: {rgba} and label: {label}")
         line, = ax.plot(
-            x_data, y_data, 
+            [], [],
             linestyle=linestyle, color=rgba, label=label
         )
+        self._set_full_line_data(line, x_data, y_data)
 
         ax.set_autoscale_on(True)       # Turns autoscale mode back on
         ax.set_xlim(auto=True)          # Reset x-axis limits
         ax.set_ylim(auto=True)          # Reset y-axis limits
 
         # Autoscale the axes after plotting the data
-        ax.relim()
-        ax.autoscale_view()
+        self._autoscale_view(ax)
         
         self.generate_legend()
 
@@ -254,6 +1113,12 @@ class MplCanvas(FigureCanvas):
                 lines.append(line)
                 labels.append(line.get_label())
 
+        # All history traces of an axes share a single legend entry
+        for history in self._history.values():
+            if len(history):
+                lines.append(history.collection)
+                labels.append(history.collection.get_label())
+
         # Show the legend with custom styling on first axis
         self.ax1.legend(
             lines,
@@ -330,8 +1195,7 @@ class MplCanvas(FigureCanvas):
         ax.set_ylim(auto=True)          # Reset y-axis limits
 
         # Autoscale the axes after plotting the data
-        ax.relim()
-        ax.autoscale_view()
+        self._autoscale_view(ax)
 
         # Redraw the canvas
         self.update_layout()
@@ -346,15 +1210,13 @@ class MplCanvas(FigureCanvas):
         
         if 0 <= line_index < len(lines):
             line = lines[line_index]
-            line.set_xdata(x_data)
-            line.set_ydata(y_data)
+            self._set_full_line_data(line, x_data, y_data)
 
             # Rescale the axes to fit the new data
-            ax.relim()
-            ax.autoscale_view()
+            self._autoscale_view(ax)
 
-            # Redraw the canvas to reflect the changes
-            self.draw()
+            # Redraw the lines to reflect the changes
+            self.redraw_lines()
         else:
             raise IndexError("Line index out of range.")
 
@@ -393,7 +1255,7 @@ class MplCanvas(FigureCanvas):
             )
             print(f"Setting line color: {rgba}")
             line.set_color(rgba)
-            self.draw()
+            self.redraw_lines()
 
 
     def get_lines(self, axis: int = 0) -> Sequence:
@@ -420,8 +1282,9 @@ class MplCanvas(FigureCanvas):
         ax.set_xlim(x_min, x_max)
         ax.set_ylim(y_min, y_max)
 
-        # Redraw the canvas to reflect the changes
-        self.draw()    
+        # Redraw the canvas to reflect the changes - if the limits did not change,
+        # only the lines are redrawn
+        self.redraw_lines()
 
     def remove_all_axes_lines(self, axis: int = 0):
         """Removes all lines from the axes."""
@@ -433,18 +1296,109 @@ class MplCanvas(FigureCanvas):
         for line in ax.get_lines():
             line.remove()
 
-        # Redraw the canvas to reflect the change
-        self.draw()
+        # Redraw the lines to reflect the change
+        self.redraw_lines()
+
+
+    def add_band(self, x_data: Sequence[float], low_data: Sequence[float], high_data: Sequence[float],
+                 color : QColor = QColor('orange'), axis : int = 0, alpha: float = 0.25):
+        """
+        Adds a filled band between low_data and high_data to the given axes, e.g. a ±σ band around
+        a mean value. The band is not part of the legend and is removed by clear_plot().
+        """
+        ax = self.get_axes(axis)
+        band = ax.fill_between(x_data, low_data, high_data, color=mpl_color(color), alpha=alpha, linewidth=0)
+        self._bands.append((band, x_data, low_data, high_data, QColor(color), axis, alpha))
+        self._autoscale_view(ax)
+        self.update_layout()
+        return band
+
+
+    def remove_bands(self):
+        """
+        Removes all bands of all axes.
+        """
+        for band, *_ in self._bands:
+            band.remove()
+        self._bands.clear()
+        redraw_scheduler.request(self, RedrawScheduler.FULL)
+
+
+    def bands(self) -> list[tuple[Sequence[float], Sequence[float], Sequence[float], QColor, int, float]]:
+        """
+        Returns the source data of all bands as (x_data, low_data, high_data, color, axis, alpha) -
+        the arguments of add_band().
+        """
+        return [tuple(source) for _, *source in self._bands]
 
 
     def clear_plot(self):
         """
         Clears the plot by removing all lines and resetting the axes.
         """
+        self.clear_history()
+        self.remove_bands()
         self.remove_all_axes_lines(0)
         self.remove_all_axes_lines(1)
 
 
+    def get_history(self, axis: int = 0) -> HistoryCollection:
+        """
+        Returns the history collection of the given axes - it is created on first use.
+        """
+        ax = self.get_axes(axis)
+        history = self._history.get(ax)
+        if history is None:
+            history = self._history[ax] = HistoryCollection(ax, self._history_depth)
+        return history
+
+
+    def set_history_depth(self, depth: int):
+        """
+        Sets the maximum number of history traces per axes.
+        """
+        self._history_depth = depth
+        for history in self._history.values():
+            history.set_depth(depth)
+        self.generate_legend()
+        redraw_scheduler.request(self, RedrawScheduler.FULL)
+
+
+    def move_lines_to_history(self, line_indices: Sequence[int], axis: int = 0):
+        """
+        Moves the given lines into the history collection of the axes. The lines are removed
+        from the axes and their data is rendered as faded history trace.
+
+        Args:
+            line_indices (Sequence[int]): The indices of the lines to move.
+            axis (int): The index of the axes.
+        """
+        ax = self.get_axes(axis)
+        lines = ax.get_lines()
+        history = self.get_history(axis)
+        history.decimate(tuple(sorted(ax.get_xlim())), max(int(ax.bbox.width), 1), self._decimation_enabled)
+
+        # Push the oldest line first, so that the newest line has the lowest age
+        selected = [lines[i] for i in line_indices if 0 <= i < len(lines)]
+        for line in reversed(selected):
+            x_data, y_data = self.get_line_data(line)
+            history.push(x_data, y_data, line.get_label(), line.get_color())
+            line.remove()
+
+        self.generate_legend()
+        redraw_scheduler.request(self, RedrawScheduler.FULL)
+
+
+    def clear_history(self):
+        """
+        Removes all history traces of all axes.
+        """
+        for history in self._history.values():
+            history.clear()
+        self.generate_legend()
+        redraw_scheduler.request(self, RedrawScheduler.FULL)
+
+
     def set_dark_mode(self, dark_mode: bool):
         """
         Sets the dark mode for the canvas.
@@ -488,120 +1442,68 @@ class MplCanvas(FigureCanvas):
         Returns:
             pd.DataFrame | None: The exported data as a DataFrame, or None if there are no lines to export.
         """
+        export_data = self._export_line_data()
+        if export_data is None:
+            return
+        return build_export_dataframe(*export_data)
+
+
+    def _export_line_data(self) -> tuple[str, list[str], list[tuple[np.ndarray, np.ndarray]]] | None:
+        """
+        Collects the x label and the labels and full resolution data of all lines and history
+        traces in the first axes - or returns None if there is nothing to export. The data of
+        streaming lines is copied, because their arrays are updated in place.
+        """
         ax = self.axes_list[0]
         lines = ax.get_lines()
 
-        if not lines:
+        # Export the full resolution data and not the decimated data that is rendered
+        line_data = [self.get_line_data(line) for line in lines]
+        line_labels = [line.get_label() for line in lines]
+        stream_lines = [stream.line for stream in self.streaming_lines()]
+        line_data = [(x.copy(), y.copy()) if any(line is s for s in stream_lines) else (x, y)
+                     for line, (x, y) in zip(lines, line_data)]
+
+        # History traces are exported after the current lines - oldest trace last
+        history = self._history.get(ax)
+        if history is not None:
+            for age, (x, y, label) in enumerate(history.traces(), start=1):
+                line_data.append((x, y))
+                line_labels.append(f"{label} (history {age})")
+
+        if not line_data:
             print("No data to export.")
-            return
-
-        # Gather all lines' lengths and X data
-        lengths = [len(line.get_xdata()) for line in lines]
-        all_lengths_equal = all(length == lengths[0] for length in lengths)
+            return None
 
-        # Check if all lines have identical X data arrays (if lengths equal)
-        if all_lengths_equal:
-            base_x = lines[0].get_xdata()
-            all_x_same = all(np.array_equal(line.get_xdata(), base_x) for line in lines)
-        else:
-            all_x_same = False
-
-        if all_lengths_equal and all_x_same:
-            # Simple export: all share same x and same length
-            x_data = lines[0].get_xdata()
-            data = {ax.get_xlabel(): x_data}
-            for i, line in enumerate(lines, start=1):
-                label = line.get_label()
-                if not label or label.startswith("_"):
-                    label = f"y{i}"
-                data[label] = line.get_ydata()
-
-            df = pd.DataFrame(data)
-        else:
-            # More complicated: shared full X from first line, partial Y data per line
-            
-            # Create union of all X data points from all lines
-            all_x_values = set()
-            for line in lines:
-                all_x_values.update(line.get_xdata())
-            full_x = np.array(sorted(all_x_values))
-
-            x_to_index = {x_val: idx for idx, x_val in enumerate(full_x)}
-            data = {ax.get_xlabel(): full_x}
-
-            for i, line in enumerate(lines, start=1):
-                line_x = line.get_xdata()
-                line_y = line.get_ydata()
-                label = line.get_label()
-                if not label or label.startswith("_"):
-                    label = f"y{i}"
-
-                y_full = np.full_like(full_x, fill_value=np.nan, dtype=float)
-
-                for lx, ly in zip(line_x, line_y):
-                    idx = x_to_index.get(lx)
-                    if idx is not None:
-                        y_full[idx] = ly
-                    else:
-                        print(f"Warning: x value {lx} in line '{label}' not found in full X data")
-
-                data[label] = y_full
-
-            df = pd.DataFrame(data)
-            # Forward-fill missing Y values down each column except 'x'
-            df.loc[:, df.columns != "x"] = df.loc[:, df.columns != "x"].ffill()
-        
-        return df
+        return ax.get_xlabel(), line_labels, line_data
     
    
     def export_plot_data(self) -> None:
         """
-        Export the data from the first Matplotlib Axes in the widget's canvas to CSV or Excel.
+        Export the data from the first Matplotlib Axes in the widget's canvas to a file.
 
         This function:
-        - Assumes the widget has an attribute `canvas` (a Matplotlib FigureCanvas).
         - Retrieves all Line2D objects from the first axes in the figure.
-        - Exports the X values and each line's Y values into a DataFrame.
-        - Prompts the user to select a save location and format (*.csv or *.xlsx).
-        - Automatically saves in the chosen format, defaulting to CSV if no extension is given.
+        - Exports the X values and each line's Y values (full resolution data).
+        - Prompts the user to select a save location and format.
+        - Merges the lines and writes the file in a background thread with a progress dialog
+          that allows cancelling the export.
 
         File format behavior:
-        - *.csv   → saved with `DataFrame.to_csv(index=False)`
-        - *.xlsx  → saved with `DataFrame.to_excel(index=False)` (requires openpyxl)
+        - *.csv     → streamed CSV file
+        - *.xlsx    → streamed with the openpyxl write-only workbook
+        - *.parquet → streamed row group by row group (requires pyarrow)
+        - *.npz     → NumPy archive with one array per column
+        - *.bin     → row-major float32 binary data with a JSON sidecar file
 
         Dependencies:
-        pip install pandas openpyxl
-
-        Raises:
-        AttributeError: If `self.canvas` is missing or is not a Matplotlib FigureCanvas.
+        pip install pandas openpyxl pyarrow
         """
-        df = self.create_export_data()
-        if df is None:
-            return
-
-        home_dir = QStandardPaths.writableLocation(QStandardPaths.HomeLocation)
-        file_path, selected_filter = QFileDialog.getSaveFileName(
-            self,
-            "Save Data",
-            home_dir,
-            "CSV Files (*.csv);;Excel Files (*.xlsx)",
-            "Excel Files (*.xlsx)"
-        )
-
-        if not file_path:
+        export_data = self._export_line_data()
+        if export_data is None:
             return
 
-        if "csv" in selected_filter.lower():
-            if not file_path.lower().endswith(".csv"):
-                file_path += ".csv"
-            df.to_csv(file_path, index=False)
-            print(f"Data exported to CSV: {file_path}")
-
-        elif "xlsx" in selected_filter.lower():
-            if not file_path.lower().endswith(".xlsx"):
-                file_path += ".xlsx"
-            df.to_excel(file_path, index=False)
-            print(f"Data exported to Excel: {file_path}")
+        export_line_data(self, *export_data)
 
 
 class LightIconToolbar(NavigationToolbar2QT):
@@ -673,16 +1575,28 @@ class LightIconToolbar(NavigationToolbar2QT):
         self._initialize_icons() 
 
 
+PLOT_BACKEND_MATPLOTLIB = "matplotlib"
+PLOT_BACKEND_QPAINTER = "qpainter"
+
+
 class MplWidget(QWidget):
     '''
     Widget promoted and defined in Qt Designer
+
+    The widget hosts the plot canvas and its toolbar. The plot backend can be selected per view:
+    - matplotlib: MplCanvas - the Matplotlib based canvas (default)
+    - qpainter:   PainterCanvas - a fast QPainter based canvas with the same plot API
     '''
-    def __init__(self, parent = None):
+    backend_changed = Signal(str)
+
+    def __init__(self, parent = None, backend: str = PLOT_BACKEND_MATPLOTLIB):
         QWidget.__init__(self, parent)
-        self.canvas = MplCanvas(self)
-        # Create the navigation toolbar linked to the canvas
-        self.toolbar = LightIconToolbar(self.canvas, self)
+        self.backend = backend
+        self.canvas, self.toolbar = self._create_canvas(backend)
         self.export_action : QAction | None = None
+        self.backend_action : QAction | None = None
+        self._backend_settings_key : str | None = None
+        self._toolbar_actions : list[QAction] = []   # custom actions that are moved to a new toolbar
         self.vbl = QVBoxLayout()
         self.vbl.addWidget(self.toolbar)
         self.vbl.addWidget(self.canvas)
@@ -691,6 +1605,89 @@ class MplWidget(QWidget):
         self.setContentsMargins(0, 0, 0, 0)
 
 
+    def _create_canvas(self, backend: str):
+        """
+        Creates the canvas and the navigation toolbar for the given backend.
+        """
+        if backend == PLOT_BACKEND_QPAINTER:
+            from pisoworks.qpainter_canvas import PainterCanvas, PainterToolbar
+            canvas = PainterCanvas(self)
+            return canvas, PainterToolbar(canvas, self)
+
+        canvas = MplCanvas(self)
+        # Create the navigation toolbar linked to the canvas
+        return canvas, LightIconToolbar(canvas, self)
+
+
+    def set_backend(self, backend: str):
+        """
+        Replaces the canvas by a canvas of the given plot backend. The axes labels, the title,
+        the lines, the history traces and the bands are transferred to the new canvas. Streaming
+        lines are attached to the new canvas with their ring buffers, so their owners can keep
+        appending samples. The custom toolbar actions are moved to the new toolbar.
+
+        Args:
+            backend (str): PLOT_BACKEND_MATPLOTLIB or PLOT_BACKEND_QPAINTER
+        """
+        if backend == self.backend:
+            return
+
+        old_canvas, old_toolbar = self.canvas, self.toolbar
+        self.canvas, self.toolbar = self._create_canvas(backend)
+        self.backend = backend
+
+        # Transfer the plot content - the streaming lines are attached last, because they
+        # disable the autoscaling and set the x limits of their axes
+        streams = [(stream, old_canvas.axes_list.index(stream.line.axes)) for stream in old_canvas.streaming_lines()]
+        stream_lines = [stream.line for stream, _ in streams]
+        for i, ax in enumerate(old_canvas.axes_list):
+            new_ax = self.canvas.get_axes(i)
+            new_ax.set_xlabel(ax.get_xlabel())
+            new_ax.set_ylabel(ax.get_ylabel())
+            new_ax.set_title(ax.get_title())
+            for line in ax.get_lines():
+                if any(line is stream_line for stream_line in stream_lines):
+                    continue
+                x_data, y_data = old_canvas.get_line_data(line)
+                color = QColor.fromRgbF(*to_rgba(line.get_color()))
+                self.canvas.add_line(x_data, y_data, line.get_label(), color, i, line.get_linestyle())
+
+            old_history = old_canvas.get_history(i)
+            if len(old_history):
+                self.canvas.set_history_depth(old_history.depth)
+                history = self.canvas.get_history(i)
+                for x_data, y_data, label, rgba in reversed(old_history.colored_traces()):
+                    history.push(x_data, y_data, label, rgba)
+
+        for x_data, low_data, high_data, color, axis, alpha in old_canvas.bands():
+            self.canvas.add_band(x_data, low_data, high_data, color, axis, alpha)
+
+        stream_axes = {axis for _, axis in streams}
+        for i in range(len(old_canvas.axes_list)):
+            if i not in stream_axes:
+                self.canvas.autoscale(i)
+        for stream, axis in streams:
+            self.canvas.attach_streaming_line(stream, axis)
+        self.canvas.generate_legend()
+
+        for action in self._toolbar_actions:
+            old_toolbar.removeAction(action)
+            self.toolbar.add_custom_action(action)
+
+        self.vbl.replaceWidget(old_toolbar, self.toolbar)
+        self.vbl.replaceWidget(old_canvas, self.canvas)
+        old_toolbar.deleteLater()
+        old_canvas.deleteLater()
+        self.set_dark_mode(style_manager.style.is_current_theme_dark())
+
+        if self.backend_action is not None:
+            self.backend_action.setChecked(backend == PLOT_BACKEND_QPAINTER)
+        if self._backend_settings_key:
+            with SettingsContext() as settings:
+                settings.setValue(f"PlotBackend/{self._backend_settings_key}", backend)
+        self.backend_changed.emit(backend)
+
+
     def add_toolbar_action(self, action: QAction):
         """
         Adds a custom action to the toolbar.
@@ -698,8 +1695,22 @@ class MplWidget(QWidget):
         Args:
             action (QAction): The action to add to the toolbar.
         """
+        self._toolbar_actions.append(action)
         self.toolbar.add_custom_action(action)
 
+
+    def add_toolbar_widget(self, widget: QWidget):
+        """
+        Adds a custom widget to the end of the toolbar.
+
+        Args:
+            widget (QWidget): The widget to add to the toolbar.
+        """
+        action = QWidgetAction(self)
+        action.setDefaultWidget(widget)
+        self._toolbar_actions.append(action)
+        self.toolbar.addAction(action)
+
     def show_export_action(self):
         """
         Shows the export to CSV action.
@@ -708,7 +1719,38 @@ class MplWidget(QWidget):
             return
         self.export_action = a = QAction(get_icon('export_notes', size=24, fill=False, color=QPalette.ColorRole.WindowText), "Export to Excel / CSV", self)
         self.add_toolbar_action(a)
-        a.triggered.connect(self.canvas.export_plot_data)
+        a.triggered.connect(lambda: self.canvas.export_plot_data())
+
+
+    def show_backend_action(self, settings_key: str | None = None):
+        """
+        Shows a checkable toolbar action to switch between the Matplotlib and the fast QPainter
+        plot backend.
+
+        Args:
+            settings_key (str | None): If given, the selected backend is stored in the settings
+                under this key and restored when the view is created.
+        """
+        if self.backend_action:
+            return
+        self.backend_action = a = QAction(get_icon('speed', size=24, fill=False, color=QPalette.ColorRole.WindowText), "Fast Rendering", self)
+        a.setCheckable(True)
+        a.setChecked(self.backend == PLOT_BACKEND_QPAINTER)
+        a.setToolTip("Use the fast QPainter based plot backend")
+        self.add_toolbar_action(a)
+
+        # The backend is switched with a delay because the action is part of the toolbar that is replaced.
+        # The delayed switch uses the check state at the time of the switch - set_backend() updates the
+        # check state as well, so several switches in a row must not toggle the backend back and forth.
+        a.toggled.connect(lambda checked: QTimer.singleShot(0, lambda: self.set_backend(
+            PLOT_BACKEND_QPAINTER if a.isChecked() else PLOT_BACKEND_MATPLOTLIB)))
+
+        if settings_key:
+            with SettingsContext() as settings:
+                backend = settings.value(f"PlotBackend/{settings_key}", self.backend, type=str)
+            self._backend_settings_key = settings_key
+            self.set_backend(backend)
+
 
     def add_toolbar_separator(self):
         """
@@ -716,7 +1758,7 @@ class MplWidget(QWidget):
         """
         action = QAction(self)
         action.setSeparator(True)
-        self.toolbar.add_custom_action(action)
+        self.add_toolbar_action(action)
 
 
     def set_dark_mode(self, dark_mode: bool):
@@ -728,6 +1770,10 @@ class MplWidget(QWidget):
         """
         self.canvas.set_dark_mode(dark_mode)
         self.toolbar.set_dark_mode(dark_mode)
+        if self.export_action:
+            self.export_action.setIcon(get_icon('export_notes', size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        if self.backend_action:
+            self.backend_action.setIcon(get_icon('speed', size=24, fill=False, color=QPalette.ColorRole.WindowText))
 
 
     
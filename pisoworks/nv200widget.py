@@ -2,16 +2,17 @@
 from pathlib import Path
 import asyncio
 from enum import Enum
-import pandas as pd
+from collections import deque
 
 from typing import Any, cast, Dict, Tuple, List
 import math
+import time
 import numpy as np
 
 from PySide6.QtWidgets import QApplication, QWidget, QMenu, QFileDialog, QSizePolicy
 from PySide6.QtCore import Qt, QSize, QObject, Signal, QTimer, QStandardPaths, QUrl
 from PySide6.QtGui import QColor, QPalette, QAction, QPixmap, QDesktopServices
-from PySide6.QtWidgets import QDoubleSpinBox, QComboBox, QMessageBox
+from PySide6.QtWidgets import QDoubleSpinBox, QComboBox, QMessageBox, QSpinBox, QPushButton, QHBoxLayout, QLabel
 import qtinter
 
 from matplotlib.backends.backend_qtagg import FigureCanvas
@@ -39,7 +40,21 @@ from nv200.analysis import ResonanceAnalyzer
 from nv200.utils import DeviceParamFile
 from pisoworks.input_widget_change_tracker import InputWidgetChangeTracker
 from pisoworks.svg_cycle_widget import SvgCycleWidget
-from pisoworks.mplcanvas import MplWidget, MplCanvas
+from pisoworks.mplcanvas import MplWidget, MplCanvas, StreamingLine
+from pisoworks.recording_store import RecordingInfo, recording_store
+from pisoworks.recording_browser import RecordingBrowserDialog
+from pisoworks.ensemble_average import EnsembleAverage
+from pisoworks.progressive_readout import ProgressiveRecorderReadout
+from pisoworks.waveform_upload_cache import waveform_upload_cache, waveform_hash, device_cache_key
+from pisoworks.waveform_delta_upload import upload_waveform_cached
+from pisoworks.waveform_memo import waveform_memo
+from pisoworks.progress_bus import ProgressBus
+from pisoworks.parameter_snapshot import ControllerParameters
+from pisoworks.parameter_transaction import ParameterTransaction
+from pisoworks.parameter_cache import parameter_cache
+from pisoworks.device_session import DeviceSession
+from pisoworks.waveform_playlist import PlaylistItem, WaveformPlaylistRunner
+from pisoworks.waveform_importer import read_waveform_file, FILE_DIALOG_FILTER, FILE_DIALOG_DEFAULT_FILTER
 from pisoworks.ui_helpers import get_icon, get_icon_for_menu, set_combobox_index_by_value, safe_asyncslot, repolish, images_path
 import pisoworks.ui_helpers as ui_helpers
 from pisoworks.action_manager import ActionManager, MenuID, action_manager
@@ -74,6 +89,8 @@ class NV200Widget(QWidget):
 
     status_message = Signal(str, int)  # message text, timeout in ms
     DEFAULT_RECORDING_DURATION_MS : int = 120  # Default recording duration in milliseconds
+    WAVEFORM_PLOT_DEBOUNCE_MS : int = 16  # One frame at 60 Hz
+    IMPULSE_VOLTAGES_TTL_S : float = 5.0  # The impulse voltages follow the piezo voltage
     browse_dev_param_action : QAction | None = None
 
     def __init__(self, parent=None):
@@ -93,6 +110,22 @@ class NV200Widget(QWidget):
         self._hysteresis_rec_cycles: int = 1  # number of recorded cycles for hysteresis measurement
         self._controller_param_widgets: Dict[str, QWidget] = {}
         self._custom_waveform: WaveformGenerator.WaveformData = WaveformGenerator.WaveformData() # empty list
+        self._continuous_acquisition_active: bool = False
+        self._continuous_acquisition_task: asyncio.Task | None = None
+        self._device_serial: str = ""
+        self._recording_browser: RecordingBrowserDialog | None = None
+        self._scope_lines: List[StreamingLine] = []
+        self._averaging_active: bool = False
+        self._averaging_task: asyncio.Task | None = None
+        self._refinement_active: bool = False
+        self._playlist: List[PlaylistItem] = []
+        self._playlist_active: bool = False
+        self._playlist_task: asyncio.Task | None = None
+        # Coalesces bursts of waveform parameter changes (e.g. wheel ticks) into one plot update per frame
+        self._waveform_plot_timer = QTimer(self)
+        self._waveform_plot_timer.setSingleShot(True)
+        self._waveform_plot_timer.setInterval(self.WAVEFORM_PLOT_DEBOUNCE_MS)
+        self._waveform_plot_timer.timeout.connect(self.update_waveform_plot)
    
         self.ui = Ui_NV200Widget()
 
@@ -105,6 +138,7 @@ class NV200Widget(QWidget):
 
         ui = self.ui
         ui.setupUi(self)
+        self.progress_bus = ProgressBus(ui.mainProgressBar, self.status_message.emit, parent=self)
 
         ui.tabWidget.setCurrentIndex(TabWidgetTabs.EASY_MODE.value)
         ui.stackedWidget.setCurrentIndex(TabWidgetTabs.EASY_MODE.value)
@@ -229,6 +263,20 @@ class NV200Widget(QWidget):
             raise RuntimeError("Device not connected.")
         return self._device
     
+    @property
+    def session(self) -> DeviceSession:
+        """
+        Returns the shared session of the connected device - command sequences that must not
+        be interleaved with the commands of other views run with session.execute().
+
+        Raises:
+            RuntimeError: If no device is connected.
+        """
+        session = self.ui.deviceSearchWidget.session
+        if session is None:
+            raise RuntimeError("Device not connected.")
+        return session
+
     @property
     def is_device_connected(self) -> bool:
         """
@@ -346,7 +394,7 @@ class NV200Widget(QWidget):
 
         ui.retrieveButton.setIconSize(QSize(24, 24))
         ui.retrieveButton.setIcon(get_icon("sync", size=24, fill=True))
-        ui.retrieveButton.clicked.connect(safe_asyncslot(self.update_controller_ui_from_device))
+        ui.retrieveButton.clicked.connect(safe_asyncslot(self.refresh_device_parameters))
 
         ui.restorePrevButton.setIconSize(QSize(24, 24))
         ui.restorePrevButton.setIcon(get_icon("arrow_back", size=24, fill=True))
@@ -434,11 +482,11 @@ class NV200Widget(QWidget):
         Initializes the waveform UI components for waveform generation and control.
         """
         ui = self.ui
-        ui.lowLevelSpinBox.valueChanged.connect(self.update_waveform_plot)
-        ui.highLevelSpinBox.valueChanged.connect(self.update_waveform_plot)
-        ui.freqSpinBox.valueChanged.connect(self.update_waveform_plot)
-        ui.phaseShiftSpinBox.valueChanged.connect(self.update_waveform_plot)
-        ui.dutyCycleSpinBox.valueChanged.connect(self.update_waveform_plot)
+        ui.lowLevelSpinBox.valueChanged.connect(self.schedule_waveform_plot_update)
+        ui.highLevelSpinBox.valueChanged.connect(self.schedule_waveform_plot_update)
+        ui.freqSpinBox.valueChanged.connect(self.schedule_waveform_plot_update)
+        ui.phaseShiftSpinBox.valueChanged.connect(self.schedule_waveform_plot_update)
+        ui.dutyCycleSpinBox.valueChanged.connect(self.schedule_waveform_plot_update)
         ui.uploadButton.clicked.connect(self.on_upload_waveform_button_clicked)
         ui.uploadButton.setIcon(get_icon("upload", size=24, fill=True))
         ui.startWaveformButton.setIcon(get_icon("play_arrow", size=24, fill=True))
@@ -452,6 +500,45 @@ class NV200Widget(QWidget):
         ui.waveSamplingPeriodSpinBox.valueChanged.connect(self.update_waveform_running_duration)
         ui.recSyncCheckBox.clicked.connect(self.sync_waveform_recording_duration)
         ui.importButton.clicked.connect(self.import_custom_waveform)
+
+        # Averaging of repeated waveform runs
+        sb = self.average_runs_spinbox = QSpinBox(ui.generatorGroupBox)
+        sb.setRange(2, 10000)
+        sb.setValue(10)
+        sb.setSuffix(" runs")
+        sb.setToolTip("Number of waveform runs to average")
+        button = self.average_button = QPushButton("Average", ui.generatorGroupBox)
+        button.setCheckable(True)
+        button.setIcon(get_icon("functions", size=24, fill=True))
+        button.setToolTip("Repeat the waveform run and plot the mean with a ±σ band")
+        button.toggled.connect(self.on_average_button_toggled)
+        layout = QHBoxLayout()
+        layout.addWidget(sb)
+        layout.addWidget(button)
+        ui.formLayout_2.addRow("Averaging:", layout)
+
+        # Playlist of waveform runs
+        self.playlist_label = QLabel(ui.generatorGroupBox)
+        add_button = QPushButton("Add", ui.generatorGroupBox)
+        add_button.setIcon(get_icon("playlist_add", size=24, fill=True))
+        add_button.setToolTip("Add the current waveform parameters to the playlist")
+        add_button.clicked.connect(self.add_playlist_item)
+        clear_button = QPushButton("Clear", ui.generatorGroupBox)
+        clear_button.setIcon(get_icon("playlist_remove", size=24, fill=True))
+        clear_button.setToolTip("Remove all items from the playlist")
+        clear_button.clicked.connect(self.clear_playlist)
+        button = self.playlist_run_button = QPushButton("Run", ui.generatorGroupBox)
+        button.setCheckable(True)
+        button.setIcon(get_icon("playlist_play", size=24, fill=True))
+        button.setToolTip("Run the playlist items one after another and record each run")
+        button.toggled.connect(self.on_playlist_run_button_toggled)
+        layout = QHBoxLayout()
+        layout.addWidget(self.playlist_label)
+        layout.addWidget(add_button)
+        layout.addWidget(clear_button)
+        layout.addWidget(button)
+        ui.formLayout_2.addRow("Playlist:", layout)
+        self.update_playlist_ui()
         self.update_waveform_running_duration()
         self.sync_waveform_recording_duration()
 
@@ -478,6 +565,8 @@ class NV200Widget(QWidget):
         ax.set_ylabel(rec_ui.recsrc2ComboBox.currentData())
         plot.set_plot_title("Hysteresis")
         ui.hysteresisPlot.show_export_action()
+        ui.hysteresisPlot.show_backend_action("nv200_hysteresis")
+        ui.waveformPlot.mpl_widget.show_backend_action("nv200_waveform")
 
         style_manager.style.dark_mode_changed.connect(ui.waveformPlot.mpl_widget.set_dark_mode)
         style_manager.style.dark_mode_changed.connect(ui.hysteresisPlot.set_dark_mode)
@@ -503,6 +592,33 @@ class NV200Widget(QWidget):
         Initializes the data recorder UI components for recording and plotting data.
         """
         self.ui.waveformPlot.clear_plot_action.triggered.connect(self.clear_waveform_plot)
+        self.ui.waveformPlot.continuous_action.toggled.connect(self.on_continuous_acquisition_toggled)
+        self.ui.waveformPlot.recordings_action.triggered.connect(self.show_recording_browser)
+        cb = self.ui.waveformPlot.store_continuous_checkbox
+        cb.setChecked(recording_store.store_continuous)
+        cb.toggled.connect(lambda checked: setattr(recording_store, "store_continuous", checked))
+
+        # The progressive readout actions are shared by the easy mode and the waveform recorder plot
+        ui = self.ui
+        self.progressive_readout_action = a = QAction("Progressive Readout", parent=self, icon=get_icon("blur_on", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        a.setCheckable(True)
+        a.setToolTip("Show a coarse preview of the recorded data first and refine it in the background")
+        self.stop_refinement_action = a = QAction("Stop Refinement", parent=self, icon=get_icon("stop_circle", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        a.setToolTip("Stop the refinement of the recorded data - the current preview is kept")
+        a.setEnabled(False)
+        a.triggered.connect(self.stop_refinement)
+        for mpl_widget in (ui.easyModePlot, ui.waveformPlot.mpl_widget):
+            mpl_widget.add_toolbar_action(self.progressive_readout_action)
+            mpl_widget.add_toolbar_action(self.stop_refinement_action)
+        style_manager.style.dark_mode_changed.connect(self.update_recorder_action_icons)
+
+
+    def update_recorder_action_icons(self, dark_mode: bool):
+        """
+        Updates the icons of the shared recorder actions if dark mode is enabled or disabled.
+        """
+        self.progressive_readout_action.setIcon(get_icon("blur_on", size=24, fill=False, color=QPalette.ColorRole.WindowText))
+        self.stop_refinement_action.setIcon(get_icon("stop_circle", size=24, fill=False, color=QPalette.ColorRole.WindowText))
 
 
     def init_resonance_ui(self):
@@ -639,6 +755,11 @@ class NV200Widget(QWidget):
         
         await self.backup_actuator_config()
         await self.init_ui_from_device()
+        try:
+            self._device_serial = str(await device.get_actuator_serial_number())
+        except Exception as e:
+            print(f"Error reading actuator serial number: {e}")
+            self._device_serial = ""
 
         self.set_ui_connected(True)
         
@@ -646,6 +767,8 @@ class NV200Widget(QWidget):
 
 
     async def handle_disconnect_device(self):
+        self.ui.waveformPlot.continuous_action.setChecked(False)
+        self.playlist_run_button.setChecked(False)
         self.set_ui_connected(False)
         self._device = None       
         self._recorder = None
@@ -653,15 +776,20 @@ class NV200Widget(QWidget):
         self._analyzer = None  
 
 
-    async def update_target_pos_edits(self):
+    async def update_target_pos_edits(self, refresh: bool = False):
         """
         Asynchronously updates the minimum and maximum values for the target position spin boxes
-        in the UI based on the setpoint range retrieved from the device.
+        in the UI based on the setpoint range retrieved from the device. The setpoint range and
+        unit are served from the parameter cache unless refresh is True.
         """
         print("Updating target position spin boxes...")
         dev = self.device
-        setpoint_range = await dev.get_setpoint_range()
-        unit = await dev.get_setpoint_unit()
+
+        async def read_setpoint_range():
+            return await dev.get_setpoint_range(), await dev.get_setpoint_unit()
+
+        setpoint_range, unit = await parameter_cache.fetch(
+            self.parameter_cache_key(), "setpoint_range", read_setpoint_range, refresh)
         self.update_target_pos_edits_easy(unit, setpoint_range)
         self.update_target_pos_edits_wave(unit, setpoint_range)
     
@@ -707,6 +835,8 @@ class NV200Widget(QWidget):
         pid_mode = PidLoopMode.CLOSED_LOOP if ui.closedLoopCheckBox.isChecked() else PidLoopMode.OPEN_LOOP
         try:
             await self.device.pid.set_mode(pid_mode)
+            # The setpoint range and the controller settings depend on the PID mode
+            parameter_cache.invalidate(self.parameter_cache_key())
             print(f"PID mode set to {pid_mode}.")
             await self.update_pid_mode_ui()
         except Exception as e:
@@ -725,25 +855,94 @@ class NV200Widget(QWidget):
         self.ui.closedLoopCheckBox.setChecked(pid_mode == PidLoopMode.CLOSED_LOOP)
         
        
+    def controller_param_transaction(self, widgets: List[QWidget]) -> Tuple[ParameterTransaction, List[QWidget]]:
+        """
+        Creates a parameter transaction with the device commands and values of the given
+        controller parameter widgets. The three pcf spin boxes are written together as one
+        pcf command.
+
+        Returns:
+            Tuple[ParameterTransaction, List[QWidget]]: The transaction and the widgets that
+            have no device command and need to be applied with their applyfunc.
+        """
+        cui = self.ui.controllerStructureWidget.ui
+        tracker = self.settings_widget_change_tracker
+        transaction = ParameterTransaction(self.device)
+        unmapped : List[QWidget] = []
+        pcf_widgets = (cui.pcfxSpinBox, cui.pcfvSpinBox, cui.pcfaSpinBox)
+        for widget in widgets:
+            if widget in pcf_widgets:
+                transaction.add("pcf", cui.pcfaSpinBox.export_func())
+                continue
+            cmd = widget.property("cmd")
+            if cmd is None:
+                unmapped.append(widget)
+                continue
+            # The parameter files use mspisrc for the SPI monitor source
+            cmd = {"mspisrc": "spisrc"}.get(str(cmd), str(cmd))
+            value = tracker.get_value_of_widget(widget)
+            if isinstance(value, Enum):
+                value = value.value
+            transaction.add(cmd, value)
+        return transaction, unmapped
+
+
     async def apply_controller_parameters(self):
         """
         Asynchronously applies setpoint parameters to the connected device.
+        Only the changed (dirty) parameters are applied. They are written as one verified
+        transaction (see ParameterTransaction) - if a write fails, the device is restored to
+        the values it had before and the widgets stay dirty.
+
+        Widgets without a device command cannot be part of the transaction, because their
+        values can neither be read back nor restored. They are applied with their applyfunc
+        after the transaction has been committed and are reported separately in the status
+        message - a widget that fails stays dirty, the committed transaction is kept.
         """
         try:
             print("Applying controller parameters...")
             tracker = self.settings_widget_change_tracker
             tracker.backup_initial_values("previous")
             dirty_widgets = tracker.get_dirty_widgets()
-
-            cl_previous = await self.device.pid.get_mode()
+            transaction, unmapped = self.controller_param_transaction(dirty_widgets)
+
+            report = await transaction.apply()
+            if report.writes:
+                parameter_cache.invalidate(self.parameter_cache_key())
+            print(report.summary())
+            if not report.success:
+                self.status_message.emit(report.summary(), 4000)
+                return
 
             for widget in dirty_widgets:
-                print(f"Applying changes from widget: {widget}")
-                await widget.applyfunc(tracker.get_value_of_widget(widget))
-                tracker.reset_widget(widget)
+                if widget not in unmapped:
+                    tracker.reset_widget(widget)
+
+            # Widgets without a device command - applied one by one without verification
+            unverified_errors = []
+            for widget in unmapped:
+                applyfunc = getattr(widget, "applyfunc", None)
+                if applyfunc is None:
+                    tracker.reset_widget(widget)
+                    continue
+                try:
+                    await applyfunc(tracker.get_value_of_widget(widget))
+                    tracker.reset_widget(widget)
+                except Exception as e:
+                    unverified_errors.append(f"{widget.objectName()}: {e}")
+            if unmapped:
+                parameter_cache.invalidate(self.parameter_cache_key())
+
+            messages = [report.summary()] if report.writes else []
+            if unverified_errors:
+                messages.append(f"Applying unverified parameters failed ({'; '.join(unverified_errors)})")
+            elif unmapped:
+                messages.append(f"{len(unmapped)} parameters applied without verification")
+            if messages:
+                self.status_message.emit(" - ".join(messages), 4000)
 
             # If closed/open loop mode was changed, we need to update the UI elements accordingly
-            if cl_previous != await self.device.pid.get_mode():
+            if any(write.cmd == "cl" for write in report.writes):
                 await self.update_pid_mode_ui()
         except Exception as e:
             self.status_message.emit(f"Error setting setpoint param: {e}", 2000)
@@ -786,15 +985,19 @@ class NV200Widget(QWidget):
         ax.set_ylabel(f"Amplitude ({impulse_resp_unit})")
 
 
-    async def update_resonance_voltages_ui(self):
+    async def update_resonance_voltages_ui(self, refresh: bool = False):
         """
         Asynchronously updates the resonance voltages in the UI based on the device's current settings.
+        The impulse voltages depend on the current piezo voltage, so they are cached only for
+        IMPULSE_VOLTAGES_TTL_S seconds, unless refresh is True.
         """
         analyzer = self.analyzer
         ui = self.ui
         
         try:
-            baseline_v, impulse_v = await analyzer.get_impulse_voltages()
+            baseline_v, impulse_v = await parameter_cache.fetch(
+                self.parameter_cache_key(), "impulse_voltages", analyzer.get_impulse_voltages, refresh,
+                ttl_s=self.IMPULSE_VOLTAGES_TTL_S)
             ui.impulseBaseVoltageSpinBox.setValue(baseline_v)
             ui.impulsePeakVoltageSpinBox.setValue(impulse_v)
         except Exception as e:
@@ -803,51 +1006,70 @@ class NV200Widget(QWidget):
         
 
 
-    async def update_controller_ui_from_device(self):
+    async def refresh_device_parameters(self):
+        """
+        Discards the cached parameters of the device and reads the controller settings again.
+        The other cached parameters are read again when they are shown the next time.
+        """
+        parameter_cache.invalidate(self.parameter_cache_key())
+        await self.update_controller_ui_from_device(refresh=True)
+
+
+    async def update_controller_ui_from_device(self, refresh: bool = False):
         """
         Asynchronously initializes the controller settings UI elements based on the device's current settings.
+        All parameters are read as one batch (see ControllerParameters) and the
+        widgets are filled from this snapshot. The snapshot is served from the parameter cache
+        unless refresh is True.
         """
         dev = self.device
-        dev.clear_cmd_cache()
+
+        async def read_controller_parameters():
+            dev.clear_cmd_cache()
+            params = await ControllerParameters.read(dev)
+            self.status_message.emit(f"Read {len(params.values)} controller parameters in {params.duration_s * 1000:.0f} ms", 2000)
+            return params
 
         print("Initializing controller settings from device...")
+        params = await parameter_cache.fetch(self.parameter_cache_key(), "controller", read_controller_parameters, refresh)
+
         ui = self.ui
         cui = ui.controllerStructureWidget.ui
         cui.srSpinBox.setMinimum(0.0000008)
         cui.srSpinBox.setMaximum(2000)
-        cui.srSpinBox.setValue(await dev.get_slew_rate())
+        cui.srSpinBox.setValue(params.slew_rate)
         cui.srSpinBox.applyfunc = dev.set_slew_rate
 
         setpoint_lpf = dev.setpoint_lpf
-        cui.setlponCheckBox.setChecked(await setpoint_lpf.is_enabled())
+        cui.setlponCheckBox.setChecked(params.setpoint_lpf_enabled)
         cui.setlponCheckBox.applyfunc = setpoint_lpf.enable
         cui.setlpfSpinBox.setMinimum(int(setpoint_lpf.cutoff_range.min))
         cui.setlpfSpinBox.setMaximum(int(setpoint_lpf.cutoff_range.max))
-        cui.setlpfSpinBox.setValue(int(await setpoint_lpf.get_cutoff()))
+        cui.setlpfSpinBox.setValue(int(params.setpoint_lpf_cutoff))
         cui.setlpfSpinBox.applyfunc = setpoint_lpf.set_cutoff
 
         poslpf = dev.position_lpf
-        cui.poslponCheckBox.setChecked(await poslpf.is_enabled())
+        cui.poslponCheckBox.setChecked(params.position_lpf_enabled)
         cui.poslponCheckBox.applyfunc = poslpf.enable 
         cui.poslpfSpinBox.setMinimum(poslpf.cutoff_range.min)
         cui.poslpfSpinBox.setMaximum(poslpf.cutoff_range.max)
-        cui.poslpfSpinBox.setValue(await poslpf.get_cutoff())
+        cui.poslpfSpinBox.setValue(params.position_lpf_cutoff)
         cui.poslpfSpinBox.applyfunc = poslpf.set_cutoff
 
         notch_filter = dev.notch_filter
-        cui.notchonCheckBox.setChecked(await notch_filter.is_enabled())
+        cui.notchonCheckBox.setChecked(params.notch_enabled)
         cui.notchonCheckBox.applyfunc = notch_filter.enable   
         cui.notchfSpinBox.setMinimum(notch_filter.freq_range.min)
         cui.notchfSpinBox.setMaximum(notch_filter.freq_range.max)  
-        cui.notchfSpinBox.setValue(await notch_filter.get_frequency())
+        cui.notchfSpinBox.setValue(params.notch_frequency)
         cui.notchfSpinBox.applyfunc = notch_filter.set_frequency
         cui.notchbSpinBox.setMinimum(notch_filter.bandwidth_range.min)
         cui.notchbSpinBox.setMaximum(notch_filter.bandwidth_range.max)
-        cui.notchbSpinBox.setValue(await notch_filter.get_bandwidth())
+        cui.notchbSpinBox.setValue(params.notch_bandwidth)
         cui.notchbSpinBox.applyfunc = notch_filter.set_bandwidth
 
         pid_controller = dev.pid
-        pidgains = await pid_controller.get_pid_gains()
+        pidgains = params.pid_gains
         print(f"PID Gains: {pidgains}")
         cui.kpSpinBox.setMinimum(0.0)
         cui.kpSpinBox.setMaximum(10000.0)
@@ -867,7 +1089,7 @@ class NV200Widget(QWidget):
         cui.kdSpinBox.setValue(pidgains.kd)
         cui.kdSpinBox.applyfunc = lambda value: pid_controller.set_pid_gains(kd=value)
         
-        pcfgains = await pid_controller.get_pcf_gains()
+        pcfgains = params.pcf_gains
         cui.pcfaSpinBox.setMinimum(0.0)
         cui.pcfaSpinBox.setMaximum(10000.0)
         # cui.pcfaSpinBox.setSpecialValueText(cui.pcfaSpinBox.prefix() + "0.0 (disabled)")
@@ -886,17 +1108,17 @@ class NV200Widget(QWidget):
         cui.pcfxSpinBox.setValue(pcfgains.position)
         cui.pcfxSpinBox.applyfunc = lambda value: pid_controller.set_pcf_gains(position=value)
 
-        pidmode = await pid_controller.get_mode()
+        pidmode = params.pid_mode
         cui.clToggleWidget.set_current_index(pidmode.value)
         cui.clToggleWidget.applyfunc = lambda value: pid_controller.set_mode(PidLoopMode(value))
 
-        modsrc = await dev.get_modulation_source()
+        modsrc = params.modulation_source
         cui.modsrcToggleWidget.set_current_index(modsrc.value)
         cui.modsrcToggleWidget.applyfunc = lambda value: dev.set_modulation_source(ModulationSource(value))
 
-        set_combobox_index_by_value(cui.monsrcComboBox, await dev.get_analog_monitor_source())
+        set_combobox_index_by_value(cui.monsrcComboBox, params.analog_monitor_source)
         cui.monsrcComboBox.applyfunc = lambda value: dev.set_analog_monitor_source(AnalogMonitorSource(value))
-        set_combobox_index_by_value(cui.spiSrcComboBox, await dev.get_spi_monitor_source())
+        set_combobox_index_by_value(cui.spiSrcComboBox, params.spi_monitor_source)
         self.settings_widget_change_tracker.reset()
         cui.spiSrcComboBox.applyfunc = lambda value: dev.set_spi_monitor_source(SPIMonitorSource(value))
         
@@ -966,42 +1188,92 @@ class NV200Widget(QWidget):
         The second data source is always set to PIEZO_VOLTAGE.
         The recording duration is set to 120 milliseconds.
 
+        The recorder is configured as one session operation, so other views cannot change
+        the recorder settings in between.
+
         Returns:
-            None
+            DataRecorder: The configured data recorder.
         """
-        dev = self.device
         recorder = self.recorder
-        if recsrc0 is None:
-            recsrc0 = DataRecorderSource.PIEZO_VOLTAGE
-        if recsrc1 is None:
-            pos_sensor_type = await dev.get_actuator_sensor_type()
-            if pos_sensor_type is PostionSensorType.NONE:
-                recsrc1 = DataRecorderSource.SETPOINT
-            else:
-                recsrc1 = DataRecorderSource.PIEZO_POSITION
- 
-        await recorder.set_data_source(0, recsrc0)
-        await recorder.set_data_source(1, recsrc1)
-        await recorder.set_recording_duration_ms(duration_ms)
-        return recorder
+
+        async def configure(dev: NV200Device) -> DataRecorder:
+            sources = [recsrc0, recsrc1]
+            if sources[0] is None:
+                sources[0] = DataRecorderSource.PIEZO_VOLTAGE
+            if sources[1] is None:
+                pos_sensor_type = await dev.get_actuator_sensor_type()
+                if pos_sensor_type is PostionSensorType.NONE:
+                    sources[1] = DataRecorderSource.SETPOINT
+                else:
+                    sources[1] = DataRecorderSource.PIEZO_POSITION
+
+            await recorder.set_data_source(0, sources[0])
+            await recorder.set_data_source(1, sources[1])
+            await recorder.set_recording_duration_ms(duration_ms)
+            return recorder
+
+        return await self.session.execute(configure)
 
 
     async def plot_recorder_data(self, plot_widget: MplWidget, clear_plot: bool = True, second_axes_index = 0) -> Tuple[DataRecorder.ChannelRecordingData, DataRecorder.ChannelRecordingData]:
         """
         Asynchronously retrieves and plots recorded data from two channels.
 
+        The readout is pipelined: the transfers of both channels are started as tasks
+        right away. The device lock serializes the transfers, so the channel 1 transfer
+        starts as soon as the channel 0 transfer is finished and runs while channel 0 is
+        converted and plotted. The combined transfer throughput is reported in the
+        status bar when the readout is finished.
+
         Emits:
             status_message (str, int): Notifies the UI about the current status.
 
         Raises:
             Any exceptions raised by recorder.wait_until_finished() or recorder.read_recorded_data_of_channel().
         """
+        if self.progressive_readout_action.isChecked():
+            return await self.plot_recorder_data_progressive(plot_widget, clear_plot, second_axes_index)
+
         plot = plot_widget.canvas
         recorder = self.recorder
         await recorder.wait_until_finished()
         self.status_message.emit("Reading recorded data from device...", 0)
-        rec_data0 = await recorder.read_recorded_data_of_channel(0)
+        start_time = time.perf_counter()
+        read_tasks = [asyncio.create_task(recorder.read_recorded_data_of_channel(channel)) for channel in (0, 1)]
+        try:
+            rec_data0 = await read_tasks[0]
+            first_plot_time = time.perf_counter()
 
+            self.prepare_recorder_plot(plot, clear_plot, second_axes_index)
+            plot.add_recorder_data_line(rec_data0, QColor('orange'), 0)
+            rec_data1 = await read_tasks[1]
+            plot.add_recorder_data_line(rec_data1, QColor(0, 255, 0), second_axes_index)
+        finally:
+            # If the first transfer or the plotting failed, the pending transfer is not needed
+            # anymore. It is not cancelled, because it may already hold the device lock in the
+            # middle of a transfer - cancelling it would leave the unread response in the
+            # connection. It is awaited instead and its result or error is discarded.
+            pending = [task for task in read_tasks if not task.done()]
+            if pending:
+                await asyncio.wait(pending)
+            for task in read_tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()  # marks the exception as retrieved
+
+        total_time = time.perf_counter() - start_time
+        sample_count = len(rec_data0.values) + len(rec_data1.values)
+        throughput = sample_count / total_time if total_time > 0 else 0.0
+        print(f"Recorder readout: first plot after {(first_plot_time - start_time) * 1000:.0f} ms, "
+              f"total {total_time * 1000:.0f} ms, {sample_count} samples, {throughput:.0f} samples/s")
+        self.status_message.emit(f"Read {sample_count} samples in {total_time * 1000:.0f} ms ({throughput:.0f} samples/s)", 2000)
+
+        return rec_data0, rec_data1
+
+
+    def prepare_recorder_plot(self, plot: MplCanvas, clear_plot: bool, second_axes_index: int):
+        """
+        Clears the plot if requested and sets the axes labels if the secondary axes is used.
+        """
         if clear_plot:
             plot.clear_plot()
 
@@ -1015,12 +1287,74 @@ class NV200Widget(QWidget):
             ax2.set_xlabel('Time (ms)')
             ax2.set_ylabel('Piezo Position (μm or mrad)')
 
-        plot.add_recorder_data_line(rec_data0, QColor('orange'), 0)
-        rec_data1 = await recorder.read_recorded_data_of_channel(1)
-        plot.add_recorder_data_line(rec_data1, QColor(0, 255, 0), second_axes_index)
-        self.status_message.emit("", 0)
 
-        return rec_data0, rec_data1
+    async def plot_recorder_data_progressive(self, plot_widget: MplWidget, clear_plot: bool = True, second_axes_index = 0) -> Tuple[DataRecorder.ChannelRecordingData, DataRecorder.ChannelRecordingData]:
+        """
+        Asynchronously retrieves and plots recorded data from two channels coarse to fine.
+
+        A strided preview of both channels is read and plotted first. The remaining samples
+        are read in refinement passes and the plotted lines are updated after each block.
+        The refinement can be stopped with the "Stop Refinement" action - samples that have
+        not been read are NaN in the returned data.
+
+        Emits:
+            status_message (str, int): Notifies the UI about the current status.
+        """
+        plot = plot_widget.canvas
+        await self.recorder.wait_until_finished()
+        start_time = time.perf_counter()
+        readout = ProgressiveRecorderReadout(self.device)
+        self.status_message.emit("Reading recorder preview from device...", 0)
+        await readout.read_header()
+        await readout.read_coarse()
+        first_plot_time = time.perf_counter()
+
+        self.prepare_recorder_plot(plot, clear_plot, second_axes_index)
+        colors = (QColor('orange'), QColor(0, 255, 0))
+        axes = (0, second_axes_index)
+        line_indices = []
+        for channel, color, axis in zip(readout.CHANNELS, colors, axes):
+            plot.add_line(*readout.line_data(channel), str(readout.sources[channel]), color, axis)
+            line_indices.append(plot.get_line_count(axis) - 1)
+
+        def update_lines():
+            for channel, axis, line_index in zip(readout.CHANNELS, axes, line_indices):
+                plot.update_line(line_index, *readout.line_data(channel), axis)
+
+        # The lines are updated at most every 250 ms, so that plotting does not slow down the transfer
+        last_update = time.perf_counter()
+        def on_progress(fraction: float):
+            nonlocal last_update
+            now = time.perf_counter()
+            if now - last_update >= 0.25:
+                last_update = now
+                update_lines()
+                self.status_message.emit(f"Refining recorder data... {fraction * 100:.0f} %", 0)
+
+        self._refinement_active = True
+        self.stop_refinement_action.setEnabled(True)
+        try:
+            completed = await readout.refine(on_progress, lambda: not self._refinement_active)
+        finally:
+            self._refinement_active = False
+            self.stop_refinement_action.setEnabled(False)
+            update_lines()
+
+        total_time = time.perf_counter() - start_time
+        print(f"Progressive recorder readout: preview after {(first_plot_time - start_time) * 1000:.0f} ms, "
+              f"total {total_time * 1000:.0f} ms, {readout.known_fraction() * 100:.0f} % of samples read")
+        if completed:
+            self.status_message.emit(f"Read {readout.sample_count * 2} samples in {total_time * 1000:.0f} ms", 2000)
+        else:
+            self.status_message.emit(f"Refinement stopped - {readout.known_fraction() * 100:.0f} % of samples read", 2000)
+        return readout.channel_data(0), readout.channel_data(1)
+
+
+    def stop_refinement(self):
+        """
+        Stops the refinement of a progressive recorder readout after the current block.
+        """
+        self._refinement_active = False
 
 
     def ask_upload_waveform(self) -> bool:
@@ -1042,11 +1376,14 @@ class NV200Widget(QWidget):
     async def ensure_waveform_uploaded(self) -> bool:
         """
         Ensures that the waveform data is uploaded to the device before proceeding with any operations.
+        The upload is skipped if the waveform upload cache shows that the device already holds
+        the current waveform.
 
         Returns:
             bool: True if the waveform was successfully uploaded, False if the user cancelled the upload.
         """
-        if not self.waveform_widget_change_tracker.has_dirty_widgets():
+        if self.is_waveform_uploaded(self.generate_waveform_from_ui()):
+            self.waveform_widget_change_tracker.reset()
             return True
 
         if self.ask_upload_waveform():
@@ -1153,10 +1490,11 @@ class NV200Widget(QWidget):
             # await self._device.start_move()
             print("Starting move operation...")
             await dev.move(spinbox.value())
+            parameter_cache.invalidate(self.parameter_cache_key(), ["impulse_voltages"])
             self.status_message.emit("Move operation started.", 0)
-            await self.plot_recorder_data(ui.easyModePlot, second_axes_index = 1)
+            rec_data0, rec_data1 = await self.plot_recorder_data(ui.easyModePlot, second_axes_index = 1)
+            self.store_recording(rec_data0, rec_data1, "move", {"target": spinbox.value()})
             ui.mainProgressBar.stop(success=True, context="start_move")
-            self.status_message.emit("", 0)
         except Exception as e:
             self.status_message.emit(f"Error during move operation: {e}", 4000)
             ui.mainProgressBar.reset()
@@ -1227,8 +1565,8 @@ class NV200Widget(QWidget):
         Generates a waveform using the current UI settings.
 
         Retrieves waveform parameters from the UI elements, including waveform type,
-        low and high levels, frequency, phase shift, and duty cycle, then calls
-        WaveformGenerator.generate_waveform to create the waveform data.
+        low and high levels, frequency, phase shift, and duty cycle, then gets the waveform
+        data from the shared waveform memo, which generates it only for new parameters.
 
         Returns:
             WaveformGenerator.WaveformData: The generated waveform data object.
@@ -1238,7 +1576,7 @@ class NV200Widget(QWidget):
             self._custom_waveform.sample_time_ms = ui.waveSamplingPeriodSpinBox.value()
             return self._custom_waveform
         else:
-            waveform = WaveformGenerator.generate_waveform(
+            waveform = waveform_memo.generate(
                     waveform_type=self.current_waveform_type(),
                     low_level=ui.lowLevelSpinBox.value(),
                     high_level=ui.highLevelSpinBox.value(),
@@ -1249,11 +1587,20 @@ class NV200Widget(QWidget):
             return waveform
 
 
+    def schedule_waveform_plot_update(self):
+        """
+        Schedules a waveform plot update. All parameter changes within one frame
+        result in a single update.
+        """
+        self._waveform_plot_timer.start()
+
+
     def update_waveform_plot(self):
         """
         Updates the waveform plot in the UI when the corresponding tab is active.
         """
         ui = self.ui
+        self._waveform_plot_timer.stop()
         if ui.tabWidget.currentIndex() != TabWidgetTabs.WAVEFORM.value:
             return
         
@@ -1273,25 +1620,70 @@ class NV200Widget(QWidget):
 
     async def upload_waveform(self):
         """
-        Asynchronously uploads the waveform to the device.
+        Asynchronously uploads the waveform to the device. Only the samples that differ from
+        the mirror of the device buffer are written - see upload_waveform_delta.
         """
         try:
-            wg = self.waveform_generator
             waveform = self.generate_waveform_from_ui()
+            if self.is_waveform_uploaded(waveform):
+                self.status_message.emit("Waveform is already uploaded to the device.", 2000)
+                self.waveform_widget_change_tracker.reset()
+                return
+
             self.setCursor(Qt.CursorShape.WaitCursor)
-            unit = WaveformUnit.POSITION if self.ui.closedLoopCheckBox.isChecked() else WaveformUnit.VOLTAGE
-            await wg.set_waveform(waveform, unit=unit, on_progress=self.report_progress)
+            cache_key, digest, unit = self.waveform_cache_key(), self.waveform_upload_hash(waveform), self.waveform_upload_unit()
+            # Other views must not use the waveform generator while the buffer is written
+            sent = await self.session.execute(lambda dev: upload_waveform_cached(
+                dev, waveform, cache_key, digest, unit=unit, on_progress=self.report_progress))
+            self.progress_bus.finish()
 
-            self.status_message.emit("Waveform uploaded successfully.", 2000)
+            self.status_message.emit(f"Waveform uploaded successfully ({sent} of {len(waveform.values)} samples written).", 2000)
             self.waveform_widget_change_tracker.reset()
         except Exception as e:
             self.status_message.emit(f"Error uploading waveform: {e}", 4000)
         finally:#
             self.setCursor(Qt.CursorShape.ArrowCursor)
+            self.progress_bus.cancel()
             self.ui.mainProgressBar.reset()
             self.ui.uploadButton.setChecked(False)
 
 
+    def waveform_upload_unit(self) -> WaveformUnit:
+        """
+        Returns the unit of the waveform values - position in closed loop and voltage in open loop mode.
+        """
+        return WaveformUnit.POSITION if self.ui.closedLoopCheckBox.isChecked() else WaveformUnit.VOLTAGE
+
+
+    def waveform_cache_key(self) -> str:
+        """
+        Returns the key of the connected device in the waveform upload cache.
+        """
+        return device_cache_key(self.device, self._device_serial)
+
+
+    def parameter_cache_key(self) -> str:
+        """
+        Returns the key of the connected device in the parameter cache.
+        """
+        return device_cache_key(self.device)
+
+
+    def waveform_upload_hash(self, waveform: WaveformGenerator.WaveformData) -> str:
+        """
+        Returns the content hash of the given waveform together with the upload parameters
+        that change the device buffer (sample time and unit).
+        """
+        return waveform_hash(waveform.values, waveform.sample_time_ms, self.waveform_upload_unit().name)
+
+
+    def is_waveform_uploaded(self, waveform: WaveformGenerator.WaveformData) -> bool:
+        """
+        Returns True, if the given waveform is the last waveform uploaded to the connected device.
+        """
+        return waveform_upload_cache.is_uploaded(self.waveform_cache_key(), 0, self.waveform_upload_hash(waveform))
+
+
     def on_upload_waveform_button_clicked(self, checked : bool):
         """
         Handles the event when the upload waveform button is clicked.
@@ -1309,44 +1701,548 @@ class NV200Widget(QWidget):
             self.status_message.emit("Waveform upload cancelled.", 2000)
 
         
-    def fade_plot_line(self, line_index: int, alpha: float = 0.5):
-        """
-        Fades the specified plot line by reducing its alpha value.
-        
-        Args:
-            line_index (int): The index of the line to fade.
-            alpha (float): The alpha value to set for the line (0.0 to 1.0).
-        """
-        plot = self.ui.waveformPlot.canvas
-        color = plot.get_line_color(line_index)
-        color.setAlphaF(color.alphaF() * alpha)
-        plot.set_line_color(line_index, color)
-
-
     async def plot_waveform_recorder_data(self) -> Tuple[DataRecorder.ChannelRecordingData, DataRecorder.ChannelRecordingData]:
         """
         Plots waveform recorder data on the UI's matplotlib canvas.
 
-        If the 'history' checkbox is checked, previous plot lines (except the first) are faded.
+        If the 'history' checkbox is checked, previous plot lines (except the first) are moved into
+        the bounded history collection of the plot, where they are faded by age.
         Otherwise, the waveform plot is cleared before plotting new data.
         Finally, recorder data is plotted.
         """
         ui = self.ui
         plot = ui.waveformPlot.ui.mplWidget.canvas
         if ui.waveformPlot.history_checkbox.isChecked():
-            for i in range(1, plot.get_line_count()):
-                self.fade_plot_line(i)
+            plot.move_lines_to_history(range(1, plot.get_line_count()))
         else:
             self.clear_waveform_plot()
         return await self.plot_recorder_data(plot_widget=ui.waveformPlot.ui.mplWidget , clear_plot=False, second_axes_index=0)
 
 
+    def plot_waveform_recorder_frame(self, rec_data0: DataRecorder.ChannelRecordingData, rec_data1: DataRecorder.ChannelRecordingData):
+        """
+        Plots one capture of the continuous acquisition mode into the waveform plot.
+
+        If history is disabled and the plot already shows the recorder lines of the previous
+        capture, these lines are updated in place. This avoids rebuilding the lines and the
+        legend for each capture. Otherwise the plot is prepared like in plot_waveform_recorder_data().
+        """
+        ui = self.ui
+        plot = ui.waveformPlot.canvas
+        lines = plot.get_lines(0)
+        labels = [str(rec_data0.source), str(rec_data1.source)]
+        if (not ui.waveformPlot.history_checkbox.isChecked() and len(lines) == 3
+                and [line.get_label() for line in lines[1:]] == labels):
+            plot.update_line(1, rec_data0.sample_times_ms, rec_data0.values)
+            plot.update_line(2, rec_data1.sample_times_ms, rec_data1.values)
+        else:
+            if ui.waveformPlot.history_checkbox.isChecked():
+                plot.move_lines_to_history(range(1, plot.get_line_count()))
+            else:
+                self.clear_waveform_plot()
+            plot.add_recorder_data_line(rec_data0, QColor('orange'), 0)
+            plot.add_recorder_data_line(rec_data1, QColor(0, 255, 0), 0)
+        self._rec_chan0, self._rec_chan1 = rec_data0, rec_data1
+
+
+    def plot_continuous_frame(self, rec_data0: DataRecorder.ChannelRecordingData, rec_data1: DataRecorder.ChannelRecordingData):
+        """
+        Plots one capture of the continuous acquisition mode - appended to the scope lines in
+        scope mode or as a single capture otherwise.
+        """
+        if self.ui.waveformPlot.scope_checkbox.isChecked():
+            self.plot_waveform_scope_frame(rec_data0, rec_data1)
+        else:
+            self._scope_lines = []
+            self.plot_waveform_recorder_frame(rec_data0, rec_data1)
+
+
+    def plot_waveform_scope_frame(self, rec_data0: DataRecorder.ChannelRecordingData, rec_data1: DataRecorder.ChannelRecordingData):
+        """
+        Appends one capture of the continuous acquisition mode to the rolling time window of the
+        scope mode. The captures are appended back to back - a gap sample between two captures
+        interrupts the lines, because the recorder does not sample between the captures.
+
+        The scope lines are created again if the recording sources, the sample period or the
+        time window change or if the lines have been removed from the plot.
+        """
+        rec_widget = self.ui.waveformPlot
+        plot = rec_widget.canvas
+        data = (rec_data0, rec_data1)
+        window_ms = rec_widget.scope_window_ms()
+        sample_period_ms = rec_data0.sample_time_ms
+        capacity = max(int(round(window_ms / sample_period_ms)), 2)
+        lines = self._scope_lines
+        if (len(lines) != len(data)
+                or any(stream.canvas is not plot or stream.line.axes is None for stream in lines)
+                or [stream.line.get_label() for stream in lines] != [str(d.source) for d in data]
+                or lines[0].sample_period_ms != sample_period_ms
+                or lines[0].capacity != capacity):
+            plot.clear_plot()
+            self._scope_lines = lines = [
+                plot.add_streaming_line(str(d.source), window_ms, sample_period_ms, color, 0)
+                for d, color in zip(data, (QColor('orange'), QColor(0, 255, 0)))]
+        else:
+            for stream in lines:
+                stream.append([np.nan])
+        for stream, d in zip(lines, data):
+            stream.append(d.values)
+        self._rec_chan0, self._rec_chan1 = rec_data0, rec_data1
+
+
+    def waveform_parameters(self) -> Dict[str, Any]:
+        """
+        Returns the waveform parameters of the UI for the metadata of stored recordings.
+        """
+        ui = self.ui
+        if self.is_custom_waveform():
+            return {
+                "waveform": "custom",
+                "sample_period_ms": ui.waveSamplingPeriodSpinBox.value(),
+                "cycles": ui.cyclesSpinBox.value(),
+            }
+        return {
+            "waveform": self.current_waveform_type().name,
+            "low": ui.lowLevelSpinBox.value(),
+            "high": ui.highLevelSpinBox.value(),
+            "freq_hz": ui.freqSpinBox.value(),
+            "phase_deg": ui.phaseShiftSpinBox.value(),
+            "duty_percent": ui.dutyCycleSpinBox.value(),
+            "cycles": ui.cyclesSpinBox.value(),
+        }
+
+
+    def store_recording(self, rec_data0: DataRecorder.ChannelRecordingData, rec_data1: DataRecorder.ChannelRecordingData,
+                        kind: str, parameters: Dict[str, Any] | None = None):
+        """
+        Appends a capture to the on-disk recording store of the current session.
+        The capture is written in the background - a failure to store the capture is reported,
+        but does not abort the measurement.
+        """
+        def on_stored(future: asyncio.Future):
+            if not future.cancelled() and future.exception() is not None:
+                print(f"Error storing recording: {future.exception()}")
+                self.status_message.emit(f"Error storing recording: {future.exception()}", 4000)
+
+        try:
+            future = recording_store.append(rec_data0, rec_data1, kind, self._device_serial, parameters)
+        except Exception as e:
+            print(f"Error storing recording: {e}")
+            self.status_message.emit(f"Error storing recording: {e}", 4000)
+            return
+        if future is not None:
+            asyncio.wrap_future(future).add_done_callback(on_stored)
+
+
+    def show_recording_browser(self):
+        """
+        Shows the browser for the stored recordings. The browser is created once and
+        refreshed each time it is shown.
+        """
+        if self._recording_browser is None:
+            self._recording_browser = RecordingBrowserDialog(self)
+            self._recording_browser.replay_requested.connect(self.replay_recording)
+        else:
+            self._recording_browser.refresh()
+        self._recording_browser.show()
+        self._recording_browser.raise_()
+        self._recording_browser.activateWindow()
+
+
+    def replay_recording(self, info: RecordingInfo):
+        """
+        Replays a stored capture into the waveform plot. The capture file is memory mapped and
+        the rows of the mapped array are passed to the plot without copying.
+        """
+        try:
+            data = recording_store.load(info)
+        except Exception as e:
+            print(f"Error loading recording: {e}")
+            self.status_message.emit(f"Error loading recording: {e}", 4000)
+            return
+
+        ui = self.ui
+        plot = ui.waveformPlot.canvas
+        if ui.waveformPlot.history_checkbox.isChecked():
+            plot.move_lines_to_history(range(1, plot.get_line_count()))
+        else:
+            self.clear_waveform_plot()
+        time_label = info.timestamp.split("T")[-1]
+        plot.add_line(data[0], data[1], f"{info.sources[0]} ({time_label})", QColor('orange'), 0)
+        plot.add_line(data[0], data[2], f"{info.sources[1]} ({time_label})", QColor(0, 255, 0), 0)
+        self.status_message.emit(f"Replayed {info.kind} recording {info.capture_id} of session {info.session}.", 2000)
+
+
+    def on_continuous_acquisition_toggled(self, checked: bool):
+        """
+        Starts or stops the continuous acquisition mode of the data recorder.
+        Stopping is cooperative - the running capture is finished, read and plotted
+        before the acquisition loop ends.
+        """
+        if not checked:
+            self._continuous_acquisition_active = False
+            return
+
+        if self._device is None:
+            self.ui.waveformPlot.continuous_action.setChecked(False)
+            self.status_message.emit("Connect a device to start the continuous acquisition.", 2000)
+            return
+
+        self._continuous_acquisition_active = True
+        # If the previous loop has not finished yet, it simply continues
+        if self._continuous_acquisition_task is None or self._continuous_acquisition_task.done():
+            self._continuous_acquisition_task = asyncio.create_task(self.run_continuous_acquisition())
+
+
+    async def wait_for_capture(self, recorder: DataRecorder, armed_time: float, duration_ms: int, timeout_s: float = 10.0):
+        """
+        Waits until the capture that has been armed at armed_time is finished.
+
+        The known recording duration is awaited first without any device traffic. After that
+        the recorder state is polled in short intervals, so that the end of the capture is
+        detected much faster than with the 100 ms poll interval of recorder.wait_until_finished().
+        """
+        remaining = armed_time + duration_ms / 1000 - time.perf_counter()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        await asyncio.wait_for(self._poll_recording_finished(recorder), timeout_s)
+
+
+    @staticmethod
+    async def _poll_recording_finished(recorder: DataRecorder, poll_interval_s: float = 0.005):
+        while await recorder.is_recording():
+            await asyncio.sleep(poll_interval_s)
+
+
+    async def run_continuous_acquisition(self):
+        """
+        Runs back-to-back captures until the continuous acquisition mode is stopped.
+
+        The captures are double buffered: as soon as a capture has been read from the device,
+        the recorder is re-armed and the previous capture is plotted while the next one runs.
+        The configured frame rate limits the number of captures per second. The achieved
+        captures per second (averaged over the last captures) and the dead time between the
+        end of a capture and the start of the next one are shown in the recorder toolbar.
+        """
+        ui = self.ui
+        rec_widget = ui.waveformPlot
+        rec_ui = rec_widget.ui
+        ui.startWaveformButton.setEnabled(False)
+        ui.measureHysteresisButton.setEnabled(False)
+        rec_ui.dataRecSettingsGroupBox.setEnabled(False)
+        self.average_button.setEnabled(False)
+        self.playlist_run_button.setEnabled(False)
+        rec_widget.clear_acquisition_statistics()
+
+        pending = None      # capture that has been read and is plotted during the next capture
+        capture_times = deque(maxlen=10)
+        capture_end = None
+        try:
+            duration_ms = rec_ui.recDurationSpinBox.value()
+            recorder = await self.setup_data_recorder(
+                duration_ms,
+                rec_widget.get_recording_source(0),
+                rec_widget.get_recording_source(1))
+            # Free running captures - start_recording() starts each capture immediately
+            await recorder.set_autostart_mode(RecorderAutoStartMode.OFF)
+            self.status_message.emit("Continuous acquisition started.", 2000)
+
+            while self._continuous_acquisition_active:
+                await recorder.start_recording()
+                armed_time = time.perf_counter()
+                dead_time_ms = (armed_time - capture_end) * 1000 if capture_end is not None else 0.0
+
+                if pending is not None:
+                    self.plot_continuous_frame(*pending)
+
+                await self.wait_for_capture(recorder, armed_time, duration_ms)
+                capture_end = time.perf_counter()
+                pending = tuple(await asyncio.gather(
+                    recorder.read_recorded_data_of_channel(0),
+                    recorder.read_recorded_data_of_channel(1)))
+                if recording_store.store_continuous:
+                    self.store_recording(*pending, "continuous")
+
+                capture_times.append(capture_end)
+                if len(capture_times) > 1:
+                    captures_per_second = (len(capture_times) - 1) / (capture_times[-1] - capture_times[0])
+                    rec_widget.set_acquisition_statistics(captures_per_second, dead_time_ms)
+
+                # Limit the number of captures per second to the configured frame rate
+                remaining = armed_time + 1 / rec_widget.frame_rate() - time.perf_counter()
+                if remaining > 0 and self._continuous_acquisition_active:
+                    await asyncio.sleep(remaining)
+
+            if pending is not None:
+                self.plot_continuous_frame(*pending)
+            self.status_message.emit("Continuous acquisition stopped.", 2000)
+        except Exception as e:
+            print(f"Error during continuous acquisition: {e}")
+            self.status_message.emit(f"Error during continuous acquisition: {e}", 4000)
+        finally:
+            self._continuous_acquisition_active = False
+            rec_widget.continuous_action.setChecked(False)
+            rec_ui.dataRecSettingsGroupBox.setEnabled(True)
+            self.average_button.setEnabled(True)
+            self.update_playlist_ui()
+            ui.startWaveformButton.setEnabled(True)
+            ui.measureHysteresisButton.setEnabled(True)
+
+
+    async def start_waveform_run(self, cycles: int | None = None, recording_duration_ms: int | None = None) -> DataRecorder:
+        """
+        Arms the data recorder to start with the waveform generator and starts the waveform generator.
+
+        Args:
+            cycles (int | None): The number of waveform cycles - the value of the UI if None.
+            recording_duration_ms (int | None): The recording duration - the value of the UI if None.
+
+        Returns:
+            DataRecorder: The armed data recorder.
+        """
+        ui = self.ui
+        if cycles is None:
+            cycles = ui.cyclesSpinBox.value()
+        if recording_duration_ms is None:
+            recording_duration_ms = ui.waveformPlot.ui.recDurationSpinBox.value()
+        recsrc0, recsrc1 = ui.waveformPlot.get_recording_source(0), ui.waveformPlot.get_recording_source(1)
+        pid_mode = PidLoopMode.CLOSED_LOOP if ui.closedLoopCheckBox.isChecked() else PidLoopMode.OPEN_LOOP
+
+        # The recorder must be armed and the generator started without commands of other views in between
+        async def start_run(dev: NV200Device) -> DataRecorder:
+            recorder = await self.setup_data_recorder(recording_duration_ms, recsrc0, recsrc1)
+            await recorder.set_autostart_mode(RecorderAutoStartMode.START_ON_WAVEFORM_GEN_RUN)
+            await recorder.start_recording()
+
+            # Ensure that the right PID mode is set in case somene changed it externally
+            await dev.pid.set_mode(pid_mode)
+            await self.waveform_generator.start(cycles=cycles)
+            return recorder
+
+        recorder = await self.session.execute(start_run)
+        parameter_cache.invalidate(self.parameter_cache_key(), ["impulse_voltages"])
+        return recorder
+
+
+    def add_playlist_item(self):
+        """
+        Adds the waveform parameters of the UI as a new item to the waveform playlist.
+        """
+        if self.is_custom_waveform():
+            self.status_message.emit("Custom waveforms cannot be added to the playlist.", 2000)
+            return
+
+        ui = self.ui
+        # 0 cycles would run the waveform endlessly and the item would never finish
+        if ui.cyclesSpinBox.value() < 1:
+            self.status_message.emit("Playlist items require at least one waveform cycle.", 2000)
+            return
+
+        self._playlist.append(PlaylistItem(
+            waveform_type=self.current_waveform_type(),
+            low_level=ui.lowLevelSpinBox.value(),
+            high_level=ui.highLevelSpinBox.value(),
+            freq_hz=ui.freqSpinBox.value(),
+            phase_deg=ui.phaseShiftSpinBox.value(),
+            duty_percent=ui.dutyCycleSpinBox.value(),
+            cycles=ui.cyclesSpinBox.value()))
+        self.update_playlist_ui()
+
+
+    def clear_playlist(self):
+        """
+        Removes all items from the waveform playlist.
+        """
+        self._playlist.clear()
+        self.update_playlist_ui()
+
+
+    def update_playlist_ui(self):
+        """
+        Updates the item count and the tooltip of the playlist label.
+        """
+        count = len(self._playlist)
+        self.playlist_label.setText(f"{count} item{'s' if count != 1 else ''}")
+        self.playlist_label.setToolTip("\n".join(f"{index + 1}. {item}" for index, item in enumerate(self._playlist)))
+        self.playlist_run_button.setEnabled(count > 0 or self.playlist_run_button.isChecked())
+
+
+    def on_playlist_run_button_toggled(self, checked: bool):
+        """
+        Starts the waveform playlist or requests to stop it after the current item.
+        """
+        if not checked:
+            self._playlist_active = False
+            return
+
+        if self._device is None or not self._playlist:
+            self.playlist_run_button.setChecked(False)
+            self.status_message.emit("Connect a device and add items to the playlist to run it.", 2000)
+            return
+
+        self._playlist_active = True
+        if self._playlist_task is None or self._playlist_task.done():
+            self._playlist_task = asyncio.create_task(self.run_waveform_playlist())
+
+
+    async def start_playlist_item_run(self, item: PlaylistItem) -> Tuple[DataRecorder, int]:
+        """
+        Starts the waveform run of a playlist item. If the recording duration is synchronized
+        with the waveform duration, the recording covers the run of the item.
+        """
+        ui = self.ui
+        rec_duration_spinbox = ui.waveformPlot.ui.recDurationSpinBox
+        if ui.recSyncCheckBox.isChecked():
+            duration_ms = min(max(int(item.duration_ms), rec_duration_spinbox.minimum()), rec_duration_spinbox.maximum())
+        else:
+            duration_ms = rec_duration_spinbox.value()
+        recorder = await self.start_waveform_run(item.cycles, duration_ms)
+        return recorder, duration_ms
+
+
+    async def run_waveform_playlist(self):
+        """
+        Runs the items of the waveform playlist one after another - see WaveformPlaylistRunner.
+        Each recording is plotted and stored together with the parameters of its item.
+        Unchecking the run button stops the playlist after the current item.
+        """
+        ui = self.ui
+        items = list(self._playlist)
+        ui.startWaveformButton.setEnabled(False)
+        ui.measureHysteresisButton.setEnabled(False)
+        ui.uploadButton.setEnabled(False)
+        self.average_button.setEnabled(False)
+        ui.waveformPlot.continuous_action.setEnabled(False)
+
+        def on_item_started(index: int, item: PlaylistItem):
+            self.status_message.emit(f"Playlist item {index + 1} of {len(items)}: {item}", 0)
+
+        def on_recorded(index: int, item: PlaylistItem, rec_data0: DataRecorder.ChannelRecordingData,
+                        rec_data1: DataRecorder.ChannelRecordingData):
+            self.plot_waveform_recorder_frame(rec_data0, rec_data1)
+            self._last_waveform_freq_hz = item.freq_hz
+            self.store_recording(rec_data0, rec_data1, "playlist",
+                                 {**item.parameters(), "item": index + 1, "items": len(items)})
+
+        try:
+            runner = WaveformPlaylistRunner(self.device, self.waveform_cache_key(), self.waveform_upload_unit(),
+                                            self.start_playlist_item_run)
+            timing = await runner.run(items, on_recorded, lambda: not self._playlist_active, on_item_started)
+            print(f"Playlist finished: {timing.summary()}")
+            self.status_message.emit(f"Playlist finished: {timing.summary()}", 10000)
+        except Exception as e:
+            print(f"Error running waveform playlist: {e}")
+            self.status_message.emit(f"Error running waveform playlist: {e}", 4000)
+            # An item may still be running, e.g. if waiting for its end timed out
+            try:
+                await self.waveform_generator.stop()
+            except Exception as stop_error:
+                print(f"Error stopping waveform generator: {stop_error}")
+        finally:
+            self._playlist_active = False
+            self.playlist_run_button.setChecked(False)
+            self.update_playlist_ui()
+            ui.startWaveformButton.setEnabled(True)
+            ui.measureHysteresisButton.setEnabled(True)
+            ui.uploadButton.setEnabled(True)
+            self.average_button.setEnabled(True)
+            ui.waveformPlot.continuous_action.setEnabled(True)
+
+
+    def on_average_button_toggled(self, checked: bool):
+        """
+        Starts the averaging of repeated waveform runs or requests to stop it after the current run.
+        """
+        if not checked:
+            self._averaging_active = False
+            return
+
+        self._averaging_active = True
+        if self._averaging_task is None or self._averaging_task.done():
+            self._averaging_task = asyncio.create_task(self.average_waveform_runs())
+
+
+    def plot_ensemble_average(self, rec_data: Tuple[DataRecorder.ChannelRecordingData, DataRecorder.ChannelRecordingData],
+                              ensembles: Tuple[EnsembleAverage, EnsembleAverage]):
+        """
+        Plots the mean of both recorder channels with a ±σ band into the waveform plot.
+        The averaged data is also used as the data of the hysteresis plot.
+        """
+        plot = self.ui.waveformPlot.canvas
+        self.clear_waveform_plot()
+        averaged = []
+        for data, ensemble, color in zip(rec_data, ensembles, (QColor('orange'), QColor(0, 255, 0))):
+            mean = ensemble.mean
+            std = ensemble.std
+            x = np.arange(len(mean)) * data.sample_time_ms
+            plot.add_band(x, mean - std, mean + std, color, 0)
+            plot.add_line(x, mean, f"Mean {data.source} (n={ensemble.count}, ±σ)", color, 0)
+            averaged.append(DataRecorder.ChannelRecordingData(mean.tolist(), data.sample_time_ms, data.source))
+        self._rec_chan0, self._rec_chan1 = averaged
+
+
+    async def average_waveform_runs(self):
+        """
+        Repeats waveform runs and averages the recorded data of both channels.
+
+        After each run, the recorded data is folded into the running mean and variance
+        (Welford updates), so that the memory usage stays constant for any number of runs.
+        The plot shows the current mean with a ±σ band after each run. Unchecking the
+        average button stops the averaging after the current run.
+        """
+        ui = self.ui
+        button = self.average_button
+        ui.startWaveformButton.setEnabled(False)
+        ui.measureHysteresisButton.setEnabled(False)
+        ui.waveformPlot.continuous_action.setEnabled(False)
+        self.playlist_run_button.setEnabled(False)
+        ensembles = (EnsembleAverage(), EnsembleAverage())
+        try:
+            if not await self.ensure_waveform_uploaded():
+                return
+
+            wg = self.waveform_generator
+            # If we use custom waveform, user may have modified the sampling period
+            if self.is_custom_waveform():
+                await wg.set_output_sampling_time(int(ui.waveSamplingPeriodSpinBox.value() * 1000))
+
+            runs = self.average_runs_spinbox.value()
+            parameters = self.waveform_parameters()
+            for run in range(1, runs + 1):
+                if not self._averaging_active:
+                    break
+                self.status_message.emit(f"Averaging run {run} of {runs}...", 0)
+                recorder = await self.start_waveform_run()
+                await recorder.wait_until_finished()
+                rec_data = tuple(await asyncio.gather(
+                    recorder.read_recorded_data_of_channel(0),
+                    recorder.read_recorded_data_of_channel(1)))
+                await wg.wait_until_finished()
+                self.store_recording(*rec_data, "average run", {**parameters, "run": run, "runs": runs})
+
+                for data, ensemble in zip(rec_data, ensembles):
+                    ensemble.add(data.values)
+                self.plot_ensemble_average(rec_data, ensembles)
+
+            self._last_waveform_freq_hz = ui.freqSpinBox.value()
+            self.status_message.emit(f"Averaged {ensembles[0].count} waveform runs.", 2000)
+        except Exception as e:
+            print(f"Error during waveform averaging: {e}")
+            self.status_message.emit(f"Error during waveform averaging: {e}", 4000)
+        finally:
+            self._averaging_active = False
+            button.setChecked(False)
+            ui.startWaveformButton.setEnabled(True)
+            ui.measureHysteresisButton.setEnabled(True)
+            ui.waveformPlot.continuous_action.setEnabled(True)
+            self.update_playlist_ui()
+
+
     async def start_waveform_generator(self):
         """
         Asynchronously starts the waveform generator.
         """       
         ui = self.ui
-        rec_ui = ui.waveformPlot.ui
         try:
             if not await self.ensure_waveform_uploaded():
                 return
@@ -1356,22 +2252,13 @@ class NV200Widget(QWidget):
             if self.is_custom_waveform():
                 await wg.set_output_sampling_time(int(ui.waveSamplingPeriodSpinBox.value() * 1000))
             ui.mainProgressBar.start(5000, "start_waveform")
-
-            recorder = await self.setup_data_recorder(
-                rec_ui.recDurationSpinBox.value(), 
-                ui.waveformPlot.get_recording_source(0), 
-                ui.waveformPlot.get_recording_source(1))
-            await recorder.set_autostart_mode(RecorderAutoStartMode.START_ON_WAVEFORM_GEN_RUN)
-            await recorder.start_recording()
-
             ui.startWaveformButton.setEnabled(False)
-            # Ensure that the right PID mode is set in case somene changed it externally
-            await self.device.pid.set_mode(PidLoopMode.CLOSED_LOOP if ui.closedLoopCheckBox.isChecked() else PidLoopMode.OPEN_LOOP)
-            await wg.start(cycles=self.ui.cyclesSpinBox.value())
+            await self.start_waveform_run()
             print("Waveform generator started successfully.")
             self.status_message.emit("Waveform generator started successfully.", 2000)
             
             self._rec_chan0 , self._rec_chan1 = await self.plot_waveform_recorder_data()
+            self.store_recording(self._rec_chan0, self._rec_chan1, "waveform", self.waveform_parameters())
 
             ui.mainProgressBar.stop(success=True, context="start_waveform")
             await wg.wait_until_finished()
@@ -1411,6 +2298,10 @@ class NV200Widget(QWidget):
 
         dev = self.device       
         self.ui.console.prompt_count += 1
+        # Commands with parameters may modify the waveform buffer behind the back of the cache
+        if "," in command:
+            waveform_upload_cache.invalidate(self.waveform_cache_key())
+            parameter_cache.invalidate(self.parameter_cache_key())
         response = await dev.read_stripped_response_string(command, 10)
         print(f"Command response: {response}")
         self.ui.console.print_output(response)
@@ -1427,17 +2318,15 @@ class NV200Widget(QWidget):
 
     async def report_progress(self, current_index: int, total: int):
         """
-        Asynchronously updates the progress bar and status message to reflect the current progress of an upload operation.
+        Reports the current progress of an upload operation to the progress bus, which updates
+        the progress bar and the status message at a limited rate. The upload does not wait
+        for any UI update.
 
         Args:
             current_index (int): The current item index being processed.
             total (int): The total number of items to process.
         """
-        percent = 100 * current_index / total
-        ui = self.ui
-        ui.mainProgressBar.setMaximum(total)
-        ui.mainProgressBar.setValue(current_index)
-        self.status_message.emit(f" Uploading waveform - sample {current_index} of {total} [{percent:.1f}%]", 0)
+        self.progress_bus.report(current_index, total, "Uploading waveform")
 
 
     def showEvent(self, event):
@@ -1675,97 +2564,31 @@ class NV200Widget(QWidget):
         QDesktopServices.openUrl(QUrl.fromLocalFile(self.actuator_backup_path()))
 
 
-    def read_percentage_column_with_limit(self, file_path: str, max_values: int = 1024) -> List[float]:
-        """
-        Reads a single-column CSV or Excel file containing percentage values (0-100).
-
-        If the number of values exceeds max_values, asks the user whether to truncate
-        or resample the data to fit the max_values limit.
-
-        Args:
-            parent (QWidget): Parent widget for dialogs.
-            file_path (str): Path to CSV or Excel file.
-            max_values (int): Maximum allowed number of values (default 1024).
-
-        Returns:
-            List[float]: List of percentage values as floats.
-
-        Raises:
-            ValueError: For invalid data or unsupported file types.
-        """
-        # Load data
-        if file_path.lower().endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.lower().endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
-        else:
-            raise ValueError("Unsupported file type. Provide a .csv or Excel (.xls/.xlsx) file.")
-
-        if df.shape[1] != 1:
-            raise ValueError(f"Expected exactly one column, found {df.shape[1]} columns.")
-
-        col = df.iloc[:, 0]
-        col_numeric = pd.to_numeric(col, errors='coerce')
-
-        if col_numeric.isnull().any():
-            raise ValueError("Column contains non-numeric or invalid values.")
-
-        if not ((col_numeric >= 0) & (col_numeric <= 100)).all():
-            raise ValueError("Waveform values are given in percent and must be in the range 0 to 100 inclusive.")
-
-        values = col_numeric.tolist()
-
-        # Check length limit
-        if len(values) > max_values:
-            # Ask user what to do
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Too many values")
-            msg.setText(f"The data has {len(values)} values, which exceeds the limit of {max_values}.")
-            msg.setInformativeText("Do you want to truncate the data or resample it?")
-            truncate_button = msg.addButton("Truncate", QMessageBox.ButtonRole.AcceptRole)
-            resample_button = msg.addButton("Resample", QMessageBox.ButtonRole.AcceptRole)
-            cancel_button = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
-            msg.setDefaultButton(truncate_button)
-            msg.exec()
-
-            clicked = msg.clickedButton()
-
-            if clicked == cancel_button:
-                raise ValueError("User cancelled operation due to too many values.")
-
-            elif clicked == truncate_button:
-                # Truncate list
-                values = values[:max_values]
-
-            elif clicked == resample_button:
-                # Resample by skipping values to reduce to max_values
-                factor = (len(values) + max_values - 1) // max_values  # ceiling division
-                values = values[::factor]
-
-                # Ensure result not longer than max_values (edge case)
-                values = values[:max_values]
-
-        return values
-    
-
     def import_custom_waveform(self):
         """
-        Opens a file dialog for the user to select a waveform file (CSV or Excel),
-        reads the percentage column with a limit from the selected file, and updates
-        the waveform plot with the imported data.
+        Opens a file dialog for the user to select a waveform file (see waveform_importer
+        for the supported formats), reads the percentage values with a limit from the selected
+        file, and updates the waveform plot with the imported data.
 
-        The default file type is Excel (*.xlsx). The imported data is stored in
-        self._custom_waveform.
+        The imported data is stored in self._custom_waveform.
         """
         home_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.HomeLocation)
         file_path, selected_filter = QFileDialog.getOpenFileName(
             self,
             "Import Waveform File",
             home_dir,
-            "CSV and Excel Files (*.csv *.xlsx);;CSV Files (*.csv);;Excel Files (*.xlsx)",
-            "CSV and Excel Files (*.csv *.xlsx)"  # default
+            FILE_DIALOG_FILTER,
+            FILE_DIALOG_DEFAULT_FILTER
         )
+        if not file_path:
+            return  # User cancelled the dialog
+
         ui = self.ui
-        self._custom_waveform = WaveformGenerator.WaveformData(self.read_percentage_column_with_limit(file_path), ui.waveSamplingPeriodSpinBox.value())
+        try:
+            values = read_waveform_file(self, file_path, WaveformGenerator.NV200_WAVEFORM_BUFFER_SIZE)
+        except ValueError as e:
+            self.status_message.emit(f"Error importing waveform: {e}", 4000)
+            return
+        self._custom_waveform = WaveformGenerator.WaveformData(values, ui.waveSamplingPeriodSpinBox.value())
         self.update_waveform_plot()
         self.update_waveform_running_duration()
\ No newline at end of file
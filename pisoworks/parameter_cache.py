@@ -0,0 +1,185 @@
+"""
+Cache of device parameters that are shown in the device views.
+
+Switching between the tabs of a device view re-reads parameters that rarely change - e.g.
+the controller settings or the setpoint range. The parameter cache keeps the last read
+values per device, so repeated views are served from memory. The cache entries are invalidated
+explicitly by the code that changes the device state:
+
+- writes of parameters (e.g. applying the controller settings or changing the PID mode)
+- console commands, which may change any parameter behind the back of the cache
+- opening or closing the connection to a device (see device_session)
+
+Optionally, the entries expire after a time to live (TTL) that is stored in the application
+settings. Values that depend on the live state of the device can use their own TTL.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+from pisoworks.settings_manager import SettingsContext
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached parameter value and the time it has been read.
+    """
+    value: Any
+    timestamp: float
+
+    def age_s(self) -> float:
+        return time.monotonic() - self.timestamp
+
+
+class DeviceParameterCache:
+    """
+    Caches parameter values per device and parameter name.
+
+    The values are read with fetch(), which calls the given loader only if there is no valid
+    entry. Concurrent fetches of the same parameter share one read. A fetch that was started
+    before an invalidation does not store its (possibly outdated) value.
+    """
+    TTL_KEY = "ParameterCache/ttl_s"
+
+    def __init__(self):
+        self._entries : Dict[str, Dict[str, CacheEntry]] = {}
+        self._pending : Dict[Tuple[str, str], asyncio.Future] = {}
+        self._generations : Dict[str, int] = {}
+        self._ttl_s : float | None = None
+        self._ttl_loaded = False
+        self.hits = 0
+        self.misses = 0
+
+
+    def ttl_s(self) -> float | None:
+        """
+        Returns the time to live of the cache entries in seconds or None, if the entries
+        only expire when they are invalidated.
+        """
+        if not self._ttl_loaded:
+            self._ttl_loaded = True
+            with SettingsContext() as settings:
+                ttl_s = settings.value(self.TTL_KEY, 0.0, type=float)
+            self._ttl_s = ttl_s if ttl_s > 0 else None
+        return self._ttl_s
+
+
+    def set_ttl(self, ttl_s: float | None):
+        """
+        Sets the time to live of the cache entries and stores it in the application settings.
+        None or 0 disables the expiry.
+        """
+        self._ttl_s = ttl_s if ttl_s else None
+        self._ttl_loaded = True
+        with SettingsContext() as settings:
+            settings.setValue(self.TTL_KEY, self._ttl_s or 0.0)
+
+
+    def get(self, device_key: str, name: str, default: Any = None, ttl_s: float | None = None) -> Any:
+        """
+        Returns the cached value of the given parameter or default, if there is no valid entry.
+
+        Args:
+            device_key (str): The key of the device - see waveform_upload_cache.device_cache_key.
+            name (str): The name of the parameter.
+            default (Any): The value returned if the parameter is not cached.
+            ttl_s (float | None): The time to live of this parameter - None uses the configured TTL.
+        """
+        entry = self._entries.get(device_key, {}).get(name)
+        if entry is None:
+            return default
+        if ttl_s is None:
+            ttl_s = self.ttl_s()
+        if ttl_s is not None and entry.age_s() > ttl_s:
+            return default
+        return entry.value
+
+
+    def store(self, device_key: str, name: str, value: Any):
+        """
+        Stores the value of the given parameter.
+        """
+        self._entries.setdefault(device_key, {})[name] = CacheEntry(value, time.monotonic())
+
+
+    def invalidate(self, device_key: str, names: Iterable[str] | None = None):
+        """
+        Removes the given parameters or all parameters of the device from the cache.
+        This has to be called whenever the parameters may have been changed on the device.
+        """
+        self._generations[device_key] = self._generations.get(device_key, 0) + 1
+        entries = self._entries.get(device_key)
+        if entries is None:
+            return
+        if names is None:
+            del self._entries[device_key]
+            return
+        for name in names:
+            entries.pop(name, None)
+
+
+    def clear(self):
+        """
+        Removes all cached parameters of all devices.
+        """
+        for device_key in list(self._entries):
+            self.invalidate(device_key)
+
+
+    async def fetch(
+        self,
+        device_key: str,
+        name: str,
+        loader: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+        ttl_s: float | None = None,
+    ) -> Any:
+        """
+        Returns the cached value of the given parameter or reads it with the loader.
+
+        Args:
+            device_key (str): The key of the device.
+            name (str): The name of the parameter.
+            loader (Callable[[], Awaitable[Any]]): Reads the value from the device.
+            refresh (bool): If True, the cache is bypassed and the value is read again.
+            ttl_s (float | None): The time to live of this parameter - None uses the configured TTL.
+        """
+        sentinel = object()
+        if not refresh:
+            value = self.get(device_key, name, sentinel, ttl_s)
+            if value is not sentinel:
+                self.hits += 1
+                return value
+            pending = self._pending.get((device_key, name))
+            if pending is not None:
+                self.hits += 1
+                return await asyncio.shield(pending)
+
+        self.misses += 1
+        generation = self._generations.get(device_key, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(device_key, name)] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved - it is raised here and in the waiting fetches
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if self._generations.get(device_key, 0) == generation:
+                self.store(device_key, name, value)
+            return value
+        finally:
+            if self._pending.get((device_key, name)) is future:
+                del self._pending[(device_key, name)]
+
+
+# Global cache shared by all device views
+parameter_cache = DeviceParameterCache()
@@ -0,0 +1,145 @@
+"""
+Batched readback of NV200 device parameters.
+
+Reading a parameter is a full round trip: the command is written and the response is awaited
+before the next command is sent. The parameter snapshot sends the read commands of all
+parameters with a single transport write instead and then reads the responses, which the
+device sends in command order (each terminated by XON). The transports flush the input buffer
+before each write, so the batch must be written at once - a second write would discard the
+responses that have already been received.
+
+If a response does not match its command (e.g. an error response), the input is flushed and
+the parameters are read again one by one.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from nv200.nv200_device import NV200Device
+from nv200.shared_types import (
+    PidLoopMode,
+    ModulationSource,
+    SPIMonitorSource,
+    AnalogMonitorSource,
+    PIDGains,
+    PCFGains,
+)
+
+
+def strip_response(response: str) -> str:
+    """
+    Removes the framing characters from a device response.
+    """
+    return response.strip("\x01\n\r\x00")
+
+
+async def _read_batch(device: NV200Device, commands: Sequence[str], timeout: float) -> Dict[str, List[str]]:
+    """
+    Writes all read commands at once and reads the responses in command order.
+    The caller holds the device lock.
+
+    Raises:
+        ValueError: If a response does not belong to its command.
+    """
+    transport = device.transport_protocol
+    delimiter = device.frame_delimiter_write
+    await transport.write("".join(cmd + delimiter for cmd in commands))
+
+    responses : Dict[str, List[str]] = {}
+    for cmd in commands:
+        response = strip_response(await transport.read_message(timeout))
+        name, *values = [strip_response(part) for part in response.split(",")]
+        if name != cmd:
+            raise ValueError(f"Unexpected response {response!r} to command {cmd!r}")
+        responses[cmd] = values
+    return responses
+
+
+async def read_parameters(device: NV200Device, commands: Sequence[str],
+                          timeout: float = NV200Device.DEFAULT_TIMEOUT_SECS) -> Dict[str, List[str]]:
+    """
+    Reads the values of the given parameter commands as one batch. The device lock
+    is held for the whole batch, so the snapshot is consistent with respect to other device
+    commands of this application.
+
+    Args:
+        device (NV200Device): The device to read from.
+        commands (Sequence[str]): The parameter commands, e.g. ["sr", "kp", "ki"].
+        timeout (float): The timeout for each response in seconds.
+
+    Returns:
+        Dict[str, List[str]]: The response values of each command.
+    """
+    async with device.lock:
+        try:
+            return await _read_batch(device, commands, timeout)
+        except (ValueError, asyncio.TimeoutError):
+            # Read one by one - this raises the DeviceError of a failing command
+            await device.transport_protocol.flush_input()
+            return {cmd: await device.read_values(cmd, timeout) for cmd in commands}
+
+
+@dataclass
+class ControllerParameters:
+    """
+    Snapshot of the controller parameters shown in the settings tab.
+    """
+    COMMANDS = ("sr", "setlpon", "setlpf", "poslpon", "poslpf", "notchon", "notchf", "notchb",
+                "kp", "ki", "kd", "pcf", "cl", "modsrc", "monsrc", "spisrc")
+
+    slew_rate: float
+    setpoint_lpf_enabled: bool
+    setpoint_lpf_cutoff: float
+    position_lpf_enabled: bool
+    position_lpf_cutoff: float
+    notch_enabled: bool
+    notch_frequency: int
+    notch_bandwidth: int
+    pid_gains: PIDGains
+    pcf_gains: PCFGains
+    pid_mode: PidLoopMode
+    modulation_source: ModulationSource
+    analog_monitor_source: AnalogMonitorSource
+    spi_monitor_source: SPIMonitorSource
+    duration_s: float = 0.0
+    values: Dict[str, List[str]] = field(default_factory=dict, repr=False)
+
+
+    @classmethod
+    def from_values(cls, values: Dict[str, List[str]], duration_s: float = 0.0) -> "ControllerParameters":
+        """
+        Creates the snapshot from the response values of the COMMANDS.
+        """
+        def number(cmd: str, index: int = 0) -> float:
+            return float(values[cmd][index])
+
+        return cls(
+            slew_rate=number("sr"),
+            setpoint_lpf_enabled=int(number("setlpon")) == 1,
+            setpoint_lpf_cutoff=number("setlpf"),
+            position_lpf_enabled=int(number("poslpon")) == 1,
+            position_lpf_cutoff=number("poslpf"),
+            notch_enabled=int(number("notchon")) == 1,
+            notch_frequency=int(number("notchf")),
+            notch_bandwidth=int(number("notchb")),
+            pid_gains=PIDGains(number("kp"), number("ki"), number("kd")),
+            # Acceleration is not scaled - this is done on firmware level
+            pcf_gains=PCFGains(position=number("pcf", 0), velocity=number("pcf", 1), acceleration=number("pcf", 2)),
+            pid_mode=PidLoopMode(int(number("cl"))),
+            modulation_source=ModulationSource(int(number("modsrc"))),
+            analog_monitor_source=AnalogMonitorSource(int(number("monsrc"))),
+            spi_monitor_source=SPIMonitorSource(int(number("spisrc"))),
+            duration_s=duration_s,
+            values=values,
+        )
+
+
+    @classmethod
+    async def read(cls, device: NV200Device) -> "ControllerParameters":
+        """
+        Reads all controller parameters as one batch and records the time it took.
+        """
+        start = time.perf_counter()
+        values = await read_parameters(device, cls.COMMANDS)
+        return cls.from_values(values, time.perf_counter() - start)
@@ -0,0 +1,288 @@
+"""
+Transactional apply of NV200 controller parameters.
+
+The NV200 does not acknowledge a successful write - only a failed write is answered with
+an error response. The device library therefore waits for a possible error response after
+each write, and applying the parameters one by one takes a round trip plus this wait per
+parameter. The parameter transaction sends each write directly followed by a read of the
+same parameter instead. The read response acknowledges the write (an error response in front
+of it belongs to the write) and returns the value for the verification. Like the reads of the
+parameter snapshot (see parameter_snapshot), all write / read pairs are sent with a single
+transport write, because the transports flush the input buffer before each write. If the
+responses of the batch cannot be assigned to the writes, the parameters are written again one
+by one, each followed by its read back.
+
+A transaction applies its parameters in dependency order (e.g. the filter cutoff before the
+filter is enabled and the PID mode last), verifies all read back values and restores the
+values read before the apply if any write fails or does not verify.
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from nv200.nv200_device import NV200Device
+from nv200.shared_types import DeviceError, ErrorCode
+from pisoworks.parameter_snapshot import read_parameters, strip_response
+
+
+# The order in which parameters are written - parameters that configure a function are
+# written before the function is enabled and the loop and source selection comes last
+DEPENDENCY_ORDER = ("sr", "setlpf", "setlpon", "poslpf", "poslpon", "notchf", "notchb", "notchon",
+                    "kp", "ki", "kd", "pcf", "monsrc", "spisrc", "modsrc", "cl")
+
+
+def dependency_rank(cmd: str) -> int:
+    """
+    Returns the position of the given command in the write order - unknown commands are written
+    before the source and mode selection.
+    """
+    try:
+        return DEPENDENCY_ORDER.index(cmd)
+    except ValueError:
+        return DEPENDENCY_ORDER.index("monsrc")
+
+
+def values_match(written: str, readback: str) -> bool:
+    """
+    Compares a written value with the value read back from the device. Numbers are compared
+    with the precision of the read back value, because the device rounds the values it reports
+    (e.g. a slew rate of 12.34567 is reported as 12.346).
+    """
+    written_parts = written.split(",")
+    readback_parts = readback.split(",")
+    if len(written_parts) != len(readback_parts):
+        return False
+    for w, r in zip(written_parts, readback_parts):
+        w, r = w.strip(), r.strip()
+        try:
+            w_value, r_value = float(w), float(r)
+        except ValueError:
+            if w != r:
+                return False
+            continue
+        decimals = len(r.split(".")[1]) if "." in r else 0
+        if not math.isclose(w_value, r_value, rel_tol=1e-6, abs_tol=0.5 * 10 ** -decimals + 1e-12):
+            return False
+    return True
+
+
+@dataclass
+class ParameterWrite:
+    """
+    A single parameter write of a transaction.
+
+    Attributes:
+        cmd (str): The device command, e.g. "kp".
+        value (str): The value to write, e.g. "12.5" or "0.1,0.2,0.3" for pcf.
+        previous (str | None): The value read from the device before the apply.
+        readback (str | None): The value read back after the write.
+        latency_s (float): The time the write took - the round trip of a single write or the
+            time from the previous response of the batch to the read back value.
+        error (str | None): The error response of the device or the verification error.
+    """
+    cmd: str
+    value: str
+    previous: str | None = None
+    readback: str | None = None
+    latency_s: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class TransactionReport:
+    """
+    The result of an applied parameter transaction.
+
+    Attributes:
+        writes (List[ParameterWrite]): The writes in the order in which they have been sent.
+        duration_s (float): The total duration including the snapshot and a rollback.
+        rolled_back (bool): True if the previous values have been restored.
+        rollback_error (str | None): The reason if the rollback failed as well.
+    """
+    writes: List[ParameterWrite] = field(default_factory=list)
+    duration_s: float = 0.0
+    rolled_back: bool = False
+    rollback_error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        return not self.rolled_back and all(w.ok for w in self.writes)
+
+    @property
+    def failed(self) -> List[ParameterWrite]:
+        return [w for w in self.writes if not w.ok]
+
+    def latency_report(self) -> str:
+        """
+        Returns the write latency of each parameter, e.g. "kp 3.1 ms, ki 2.9 ms".
+        """
+        return ", ".join(f"{w.cmd} {w.latency_s * 1000:.1f} ms" for w in self.writes)
+
+    def summary(self) -> str:
+        if self.success:
+            return f"Applied {len(self.writes)} parameters in {self.duration_s * 1000:.0f} ms ({self.latency_report()})"
+        errors = "; ".join(f"{w.cmd}: {w.error}" for w in self.failed)
+        if self.rollback_error:
+            return f"Applying parameters failed ({errors}) - rollback failed: {self.rollback_error}"
+        return f"Applying parameters failed ({errors}) - previous values restored"
+
+
+def _parse_error(response: str) -> str:
+    """
+    Returns the description of an error response (error,<code>).
+    """
+    try:
+        return str(DeviceError(ErrorCode.from_value(int(response.split(",", 1)[1]))))
+    except (ValueError, IndexError):
+        return str(DeviceError(ErrorCode.from_value(1)))
+
+
+async def _read_write_response(transport, write: ParameterWrite, timeout: float, start: float):
+    """
+    Reads the response to a write / read pair and stores the error response, the read back
+    value and the latency in the write.
+
+    Raises:
+        ValueError: If the read back response does not belong to the command of the write.
+    """
+    response = strip_response(await transport.read_message(timeout))
+    if response.startswith("error"):
+        # A write is only answered if it fails
+        write.error = _parse_error(response)
+        response = strip_response(await transport.read_message(timeout))
+    write.latency_s = time.perf_counter() - start
+    name, _, values = response.partition(",")
+    if name.strip() != write.cmd:
+        raise ValueError(f"Unexpected response {response!r} to command {write.cmd!r}")
+    write.readback = ",".join(strip_response(v) for v in values.split(","))
+    if write.ok and not values_match(write.value, write.readback):
+        write.error = f"read back {write.readback} instead of {write.value}"
+
+
+def _write_read_commands(write: ParameterWrite, delimiter: str) -> str:
+    return f"{write.cmd},{write.value}{delimiter}{write.cmd}{delimiter}"
+
+
+async def _write_batch(device: NV200Device, writes: Sequence[ParameterWrite], timeout: float):
+    """
+    Sends all writes, each followed by a read of the same parameter, with a single transport
+    write and reads the responses in order. The caller holds the device lock.
+
+    Raises:
+        ValueError: If a read back response does not belong to its command.
+    """
+    transport = device.transport_protocol
+    delimiter = device.frame_delimiter_write
+    await transport.write("".join(_write_read_commands(w, delimiter) for w in writes))
+    start = time.perf_counter()
+    for write in writes:
+        await _read_write_response(transport, write, timeout, start)
+        start = time.perf_counter()
+
+
+async def _write_sequential(device: NV200Device, writes: Sequence[ParameterWrite], timeout: float):
+    """
+    Sends the writes one by one, each followed by a read of the same parameter, and waits for
+    the read back value before the next write. The caller holds the device lock.
+    """
+    transport = device.transport_protocol
+    delimiter = device.frame_delimiter_write
+    for write in writes:
+        write.error = write.readback = None
+        start = time.perf_counter()
+        try:
+            await transport.write(_write_read_commands(write, delimiter))
+            await _read_write_response(transport, write, timeout, start)
+        except (ValueError, asyncio.TimeoutError) as e:
+            write.error = str(e) or "timeout"
+            await transport.flush_input()
+
+
+class ParameterTransaction:
+    """
+    Collects parameter writes and applies them as one verified batch.
+
+    Example:
+        >>> transaction = ParameterTransaction(device)
+        >>> transaction.add("cl", 1)
+        >>> transaction.add("kp", 12.5)
+        >>> report = await transaction.apply()
+        >>> print(report.summary())
+    """
+    def __init__(self, device: NV200Device, timeout: float = NV200Device.DEFAULT_TIMEOUT_SECS):
+        """
+        Args:
+            device (NV200Device): The device to apply the parameters to.
+            timeout (float): The timeout for each response in seconds.
+        """
+        self.device = device
+        self.timeout = timeout
+        self._values: Dict[str, str] = {}
+
+
+    def add(self, cmd: str, value) -> None:
+        """
+        Adds a parameter to the transaction - a later value of the same command replaces
+        the earlier one. Booleans are written as 0 / 1.
+        """
+        if isinstance(value, bool):
+            value = int(value)
+        self._values[cmd] = str(value)
+
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+    async def _run(self, writes: List[ParameterWrite]) -> None:
+        """
+        Writes and verifies the given parameters as one batch. If the responses of the batch
+        cannot be assigned to the writes, the parameters are written again one by one - the
+        writes set absolute values, so repeating them is safe.
+        """
+        try:
+            await _write_batch(self.device, writes, self.timeout)
+        except (ValueError, asyncio.TimeoutError):
+            await self.device.transport_protocol.flush_input()
+            await _write_sequential(self.device, writes, self.timeout)
+
+
+    async def apply(self) -> TransactionReport:
+        """
+        Reads the current values of all parameters of the transaction, writes the new values
+        in dependency order and verifies them. If a write fails, all parameters are restored
+        to the values read before the apply. The device lock is held for the whole transaction.
+
+        Returns:
+            TransactionReport: The writes with their latencies and errors.
+        """
+        report = TransactionReport()
+        if not self._values:
+            return report
+
+        start = time.perf_counter()
+        cmds = sorted(self._values, key=dependency_rank)
+        device = self.device
+        async with device.lock:
+            snapshot = await read_parameters(device, cmds, timeout=self.timeout)
+            report.writes = [ParameterWrite(cmd, self._values[cmd], ",".join(snapshot[cmd])) for cmd in cmds]
+            await self._run(report.writes)
+
+            if report.failed:
+                rollback = [ParameterWrite(w.cmd, w.previous) for w in report.writes]
+                await self._run(rollback)
+                report.rolled_back = True
+                failed = [w for w in rollback if not w.ok]
+                if failed:
+                    report.rollback_error = "; ".join(f"{w.cmd}: {w.error}" for w in failed)
+
+            # The library caches written values - the raw writes bypass this cache
+            device.clear_cmd_cache()
+        report.duration_s = time.perf_counter() - start
+        return report
@@ -0,0 +1,429 @@
+"""
+Streaming export of plot data in a background thread.
+
+The exporters write the data in chunks, so that the export can report its progress and can
+be cancelled at any time. The following formats are supported:
+
+- CSV      (*.csv)  - streamed with the csv module
+- Excel    (*.xlsx) - streamed with the write-only workbook of openpyxl
+- Parquet  (*.parquet) - streamed row group by row group (requires pyarrow)
+- NumPy    (*.npz)  - one .npy entry per column, streamed into the zip archive
+- Raw      (*.bin)  - row-major float32 binary data with a JSON sidecar file (*.json)
+"""
+import csv
+import json
+import os
+import zipfile
+from typing import Callable, Sequence
+
+import numpy as np
+from PySide6.QtCore import QObject, QThread, Signal, Qt, QStandardPaths
+from PySide6.QtWidgets import QProgressDialog, QWidget, QFileDialog
+
+
+CHUNK_ROWS = 50_000
+
+# File dialog filter -> file extension
+EXPORT_FILTERS: dict[str, str] = {
+    "CSV Files (*.csv)": ".csv",
+    "Excel Files (*.xlsx)": ".xlsx",
+    "Parquet Files (*.parquet)": ".parquet",
+    "NumPy Archives (*.npz)": ".npz",
+    "Raw float32 Binary (*.bin)": ".bin",
+}
+
+
+class ExportCancelled(Exception):
+    """
+    Raised by the exporters if the export has been cancelled by the user.
+    """
+
+
+ProgressCallback = Callable[[int], None]
+
+# The X and Y data of one plot line
+LineData = tuple[np.ndarray, np.ndarray]
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """
+    Replaces each NaN value by the last valid value before it. Leading NaN values are kept.
+
+    Args:
+        values (np.ndarray): The 1D array to fill.
+
+    Returns:
+        np.ndarray: A new array with the forward-filled values.
+    """
+    valid = ~np.isnan(values)
+    indices = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(indices, out=indices)
+    return values[indices]
+
+
+def merge_line_data(line_data: Sequence[LineData]) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Merges the data of several lines with different X data onto one common X axis.
+
+    The common X axis is the sorted union of the X values of all lines. The Y values of each
+    line are placed at the positions of their X values and the gaps are forward-filled.
+    All steps are vectorized, so the merge scales linearly with the number of samples.
+
+    Args:
+        line_data (Sequence[LineData]): The X and Y data of each line.
+
+    Returns:
+        tuple[np.ndarray, list[np.ndarray]]: The common X values and the merged Y values of each line.
+    """
+    x_arrays = [np.asarray(x, dtype=float) for x, _ in line_data]
+    full_x = np.unique(np.concatenate(x_arrays)) if x_arrays else np.empty(0)
+
+    y_columns = []
+    for line_x, (_, line_y) in zip(x_arrays, line_data):
+        y_full = np.full(len(full_x), np.nan)
+        y_full[np.searchsorted(full_x, line_x)] = np.asarray(line_y, dtype=float)
+        y_columns.append(forward_fill(y_full))
+
+    return full_x, y_columns
+
+
+def build_export_columns(x_label: str, line_labels: Sequence[str], line_data: Sequence[LineData]) -> tuple[list[str], list[np.ndarray]]:
+    """
+    Builds the export columns from the data of several lines.
+    The function handles two cases:
+    1. If all lines have identical X data arrays and lengths, there is one X column and one column per line's Y data.
+    2. If lines have different X data arrays or lengths, the X column is the union of all X values and the
+       Y data is aligned accordingly and forward-filled (see merge_line_data()).
+
+    Lines without a label or with a label starting with "_" get the column name y1, y2, ... -
+    if several lines have the same label, the last line wins.
+
+    Args:
+        x_label (str): The name of the X column.
+        line_labels (Sequence[str]): The label of each line - used as column name.
+        line_data (Sequence[LineData]): The X and Y data of each line.
+
+    Returns:
+        tuple[list[str], list[np.ndarray]]: The column names and the float column data.
+    """
+    lengths = [len(x) for x, _ in line_data]
+    base_x = line_data[0][0]
+    if all(length == lengths[0] for length in lengths) and all(np.array_equal(x, base_x) for x, _ in line_data):
+        # Simple export: all lines share the same x data
+        full_x, y_columns = base_x, [y for _, y in line_data]
+    else:
+        # Merge all lines on the union of all X data points - missing Y values are forward-filled
+        full_x, y_columns = merge_line_data(line_data)
+
+    data = {x_label: full_x}
+    for i, (label, y) in enumerate(zip(line_labels, y_columns), start=1):
+        if not label or label.startswith("_"):
+            label = f"y{i}"
+        data[label] = y
+    return [str(name) for name in data], [np.asarray(column, dtype=float) for column in data.values()]
+
+
+class _ChunkIterator:
+    """
+    Iterates over the rows of the given columns in chunks and reports the progress.
+    Raises ExportCancelled, if the is_cancelled function returns True.
+    """
+    def __init__(self, columns: list[np.ndarray], on_progress: ProgressCallback, is_cancelled: Callable[[], bool]):
+        self.columns = columns
+        self.row_count = len(columns[0]) if columns else 0
+        self.on_progress = on_progress
+        self.is_cancelled = is_cancelled
+
+    def __iter__(self):
+        for start in range(0, self.row_count, CHUNK_ROWS):
+            if self.is_cancelled():
+                raise ExportCancelled()
+            stop = min(start + CHUNK_ROWS, self.row_count)
+            yield start, stop
+            self.on_progress(int(stop * 100 / self.row_count))
+
+
+def _export_csv(file_path: str, names: list[str], columns: list[np.ndarray], chunks: _ChunkIterator):
+    """
+    Writes the columns as CSV file - NaN values are written as empty fields.
+    """
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for start, stop in chunks:
+            block = np.column_stack([c[start:stop] for c in columns]).astype(float)
+            rows = block.astype(object)
+            rows[np.isnan(block)] = ""
+            writer.writerows(rows.tolist())
+
+
+def _export_xlsx(file_path: str, names: list[str], columns: list[np.ndarray], chunks: _ChunkIterator):
+    """
+    Writes the columns into an Excel file using the write-only mode of openpyxl.
+    The write-only mode streams the rows to disk, so the memory usage stays flat.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Data")
+    ws.append(names)
+    try:
+        for start, stop in chunks:
+            block = np.column_stack([c[start:stop] for c in columns]).astype(float)
+            rows = block.astype(object)
+            rows[np.isnan(block)] = None
+            for row in rows.tolist():
+                ws.append(row)
+    except ExportCancelled:
+        # Close the streamed worksheet properly - the incomplete file is removed by the caller
+        wb.save(file_path)
+        raise
+    wb.save(file_path)
+
+
+def _export_parquet(file_path: str, names: list[str], columns: list[np.ndarray], chunks: _ChunkIterator):
+    """
+    Writes the columns into a Parquet file - each chunk is written as one row group.
+
+    Dependencies:
+    pip install pyarrow
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires the pyarrow package") from e
+
+    schema = pa.schema([(name, pa.float64()) for name in names])
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for start, stop in chunks:
+            arrays = [pa.array(np.asarray(c[start:stop], dtype=float)) for c in columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def _export_npz(file_path: str, names: list[str], columns: list[np.ndarray], chunks: _ChunkIterator):
+    """
+    Writes each column as .npy entry into a NumPy .npz archive. The data is streamed into
+    the archive entries, so the archive can be loaded with numpy.load().
+    """
+    # Each column is a separate archive entry - the progress covers all columns
+    total = len(columns)
+    on_progress = chunks.on_progress
+    with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for i, (name, column) in enumerate(zip(names, columns)):
+            column = np.asarray(column, dtype=float)
+            chunks.on_progress = lambda percent: on_progress(int((i * 100 + percent) / total))
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                header = {"descr": np.lib.format.dtype_to_descr(column.dtype), "fortran_order": False, "shape": column.shape}
+                np.lib.format.write_array_header_1_0(f, header)
+                for start, stop in chunks:
+                    f.write(column[start:stop].tobytes())
+    chunks.on_progress = on_progress
+
+
+def _export_raw(file_path: str, names: list[str], columns: list[np.ndarray], chunks: _ChunkIterator):
+    """
+    Writes the columns as row-major little endian float32 binary data. The column names and the
+    data layout are written into a JSON sidecar file with the same base name.
+    """
+    with open(file_path, "wb") as f:
+        for start, stop in chunks:
+            block = np.column_stack([c[start:stop] for c in columns]).astype("<f4")
+            f.write(block.tobytes())
+
+    sidecar = {
+        "file": os.path.basename(file_path),
+        "dtype": "float32",
+        "byte_order": "little",
+        "layout": "row-major",
+        "shape": [chunks.row_count, len(columns)],
+        "columns": names,
+    }
+    with open(os.path.splitext(file_path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, indent=2)
+
+
+EXPORTERS: dict[str, Callable[[str, list[str], list[np.ndarray], _ChunkIterator], None]] = {
+    ".csv": _export_csv,
+    ".xlsx": _export_xlsx,
+    ".parquet": _export_parquet,
+    ".npz": _export_npz,
+    ".bin": _export_raw,
+}
+
+
+def export_columns(file_path: str, names: list[str], columns: list[np.ndarray],
+                   on_progress: ProgressCallback = lambda percent: None,
+                   is_cancelled: Callable[[], bool] = lambda: False):
+    """
+    Exports the given columns into a file. The format is selected by the file extension.
+
+    Args:
+        file_path (str): The path of the file to write.
+        names (list[str]): The column names.
+        columns (list[np.ndarray]): The column data - all columns need the same length.
+        on_progress (ProgressCallback): Called with the progress in percent after each chunk.
+        is_cancelled (Callable[[], bool]): Polled before each chunk - if it returns True,
+            the export is stopped and ExportCancelled is raised.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+        ExportCancelled: If the export has been cancelled.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    exporter = EXPORTERS.get(extension)
+    if exporter is None:
+        raise ValueError(f"Unsupported export format: {extension}")
+
+    exporter(file_path, names, columns, _ChunkIterator(columns, on_progress, is_cancelled))
+    on_progress(100)
+
+
+class PlotExportWorker(QObject):
+    """
+    Builds the export columns from the raw line data and runs export_columns() in a
+    background thread - the merge of lines with different X data does not block the GUI.
+    """
+    progress = Signal(int)
+    finished = Signal(str)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, file_path: str, x_label: str, line_labels: Sequence[str], line_data: Sequence[LineData]):
+        super().__init__()
+        self.file_path = file_path
+        self.x_label = x_label
+        self.line_labels = list(line_labels)
+        self.line_data = list(line_data)
+        self._cancel_requested = False
+
+    def cancel(self):
+        """
+        Requests the cancellation of the export - the export stops with the next chunk.
+        """
+        self._cancel_requested = True
+
+    def run(self):
+        """
+        Exports the data and emits finished, failed or cancelled.
+        """
+        try:
+            names, columns = build_export_columns(self.x_label, self.line_labels, self.line_data)
+            if self._cancel_requested:
+                raise ExportCancelled()
+            export_columns(self.file_path, names, columns,
+                           on_progress=self.progress.emit,
+                           is_cancelled=lambda: self._cancel_requested)
+        except ExportCancelled:
+            self._remove_partial_file()
+            self.cancelled.emit()
+        except Exception as e:
+            self._remove_partial_file()
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(self.file_path)
+
+    def _remove_partial_file(self):
+        """
+        Removes the incomplete output file of a cancelled or failed export.
+        """
+        try:
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+        except OSError as e:
+            print(f"Failed to remove incomplete export file {self.file_path}: {e}")
+
+
+class PlotExporter(QObject):
+    """
+    Runs a PlotExportWorker in a QThread and shows its progress in a QProgressDialog
+    with a cancel button. The GUI stays responsive during the export.
+    """
+    finished = Signal(str)
+    failed = Signal(str)
+    status_message = Signal(str, int)
+
+    def __init__(self, parent: QWidget, file_path: str, x_label: str, line_labels: Sequence[str], line_data: Sequence[LineData]):
+        super().__init__(parent)
+        self._thread = QThread(self)
+        self._worker = PlotExportWorker(file_path, x_label, line_labels, line_data)
+        self._worker.moveToThread(self._thread)
+
+        self._dialog = QProgressDialog(f"Exporting {os.path.basename(file_path)}...", "Cancel", 0, 100, parent)
+        self._dialog.setWindowTitle("Export Data")
+        self._dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self._dialog.setMinimumDuration(300)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.setValue(0)
+
+        # The cancel request is a plain attribute write, so it is called directly and not queued
+        self._dialog.canceled.connect(self._worker.cancel, Qt.ConnectionType.DirectConnection)
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self._dialog.setValue)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.cancelled.connect(self._on_cancelled)
+
+    def start(self):
+        """
+        Starts the export in the background thread.
+        """
+        self._thread.start()
+
+    def _cleanup(self):
+        self._dialog.close()
+        self._thread.quit()
+        self._thread.wait()
+        self._worker.deleteLater()
+        self.deleteLater()
+
+    def _on_finished(self, file_path: str):
+        self._cleanup()
+        self.status_message.emit(f"Data exported to: {file_path}", 4000)
+        self.finished.emit(file_path)
+
+    def _on_failed(self, message: str):
+        self._cleanup()
+        self.status_message.emit(f"Data export failed: {message}", 4000)
+        self.failed.emit(message)
+
+    def _on_cancelled(self):
+        self._cleanup()
+        self.status_message.emit("Data export cancelled", 4000)
+
+
+def export_line_data(parent: QWidget, x_label: str, line_labels: Sequence[str], line_data: Sequence[LineData]):
+    """
+    Prompts the user for the export file and format and exports the given line data in a
+    background thread with a progress dialog. Merging the lines onto a common X axis is done
+    in the background thread as well. The result is shown in the status bar of the main window.
+
+    Args:
+        parent (QWidget): The parent widget of the file and progress dialog.
+        x_label (str): The name of the X column.
+        line_labels (Sequence[str]): The label of each line - used as column name.
+        line_data (Sequence[LineData]): The full resolution X and Y data of each line. The arrays
+            are read in the background thread, so they must not be modified in place during the export.
+    """
+    home_dir = QStandardPaths.writableLocation(QStandardPaths.HomeLocation)
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+        parent,
+        "Save Data",
+        home_dir,
+        ";;".join(EXPORT_FILTERS.keys()),
+        "Excel Files (*.xlsx)"
+    )
+
+    if not file_path:
+        return
+
+    extension = EXPORT_FILTERS.get(selected_filter, ".csv")
+    if not file_path.lower().endswith(extension):
+        file_path += extension
+
+    exporter = PlotExporter(parent, file_path, x_label, line_labels, line_data)
+    window = parent.window()
+    if hasattr(window, "show_status_message"):
+        exporter.status_message.connect(window.show_status_message)
+    exporter.start()
@@ -0,0 +1,113 @@
+"""
+Rate limited progress reporting for device transfers.
+
+Waveform uploads and downloads report their progress per sample. Updating the progress bar
+and the status bar for each sample makes the transfer speed depend on the cost of the UI
+updates. The progress bus decouples both: the transfer loop only records the latest
+progress, and a timer applies it to the UI at a fixed rate.
+"""
+from typing import Callable
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtWidgets import QProgressBar
+
+
+class ProgressBus(QObject):
+    """
+    Coalesces progress updates and shows them at a fixed rate in a progress bar and
+    in the status bar.
+
+    report() only stores the values and returns immediately - it never updates the UI.
+    The first report after an idle period is shown immediately, later reports are shown
+    by a timer with the configured rate. The status message is only formatted when it is
+    shown. The timer stops when no new progress has been reported.
+    """
+    DEFAULT_MESSAGE_FORMAT = " {label} - sample {current} of {total} [{percent:.1f}%]"
+
+    def __init__(
+        self,
+        progress_bar: QProgressBar,
+        status_message: Callable[[str, int], None],
+        message_format: str = DEFAULT_MESSAGE_FORMAT,
+        rate_hz: float = 20.0,
+        parent: QObject | None = None,
+    ):
+        """
+        Args:
+            progress_bar (QProgressBar): The progress bar that shows the progress.
+            status_message (Callable[[str, int], None]): Shows a status message with a timeout in ms,
+                e.g. the emit method of a status_message signal.
+            message_format (str): The format of the status message with the fields
+                label, current, total and percent.
+            rate_hz (float): The maximum number of UI updates per second.
+            parent (QObject | None): The parent object.
+        """
+        super().__init__(parent)
+        self.progress_bar = progress_bar
+        self.status_message = status_message
+        self.message_format = message_format
+        self._current = 0
+        self._total = 0
+        self._label = ""
+        self._pending = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, round(1000 / rate_hz)))
+        self._timer.timeout.connect(self._on_timeout)
+
+
+    def report(self, current: int, total: int, label: str = "Progress"):
+        """
+        Records the progress of a transfer. Can be called for every transferred item.
+
+        Args:
+            current (int): The number of transferred items.
+            total (int): The total number of items.
+            label (str): The name of the operation shown in the status message.
+        """
+        self._current = current
+        self._total = total
+        self._label = label
+        self._pending = True
+        if not self._timer.isActive():
+            # Show the first update of a transfer without delay
+            self.flush()
+            self._timer.start()
+
+
+    def flush(self):
+        """
+        Shows the pending progress in the progress bar and in the status bar.
+        """
+        if not self._pending:
+            return
+        self._pending = False
+        current, total = self._current, self._total
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(current)
+        percent = 100 * current / total if total else 100.0
+        self.status_message(self.message_format.format(label=self._label, current=current, total=total, percent=percent), 0)
+
+
+    def finish(self):
+        """
+        Shows the pending (final) progress and stops the timer - call this when a transfer
+        has completed successfully.
+        """
+        self.flush()
+        self._timer.stop()
+
+
+    def cancel(self):
+        """
+        Discards pending progress and stops the timer - call this when a transfer has
+        failed or has been aborted, before the progress bar is reset.
+        """
+        self._pending = False
+        self._timer.stop()
+
+
+    def _on_timeout(self):
+        if self._pending:
+            self.flush()
+        else:
+            self._timer.stop()
@@ -0,0 +1,147 @@
+"""
+Progressive coarse-to-fine readout of the NV200 data recorder buffer.
+
+Reading the complete recorder buffer (up to 6144 samples per channel) over a serial
+connection takes several seconds. The progressive readout first reads a strided subset of
+both channels with single value reads (recout,<channel>,<index>,1), so that a preview of
+the whole recording can be plotted right away. The device only supports contiguous reads,
+so each preview sample costs a full command round trip - the number of preview reads is
+therefore limited and the stride is increased for long recordings. The remaining samples are then read in
+contiguous blocks (recout,<channel>,<index>,<count>) during refinement passes, that can be
+stopped at any time. Samples that have not been read are NaN.
+"""
+from typing import Callable
+
+import numpy as np
+
+from nv200.nv200_device import NV200Device
+from nv200.data_recorder import DataRecorder, DataRecorderSource
+
+
+class ProgressiveRecorderReadout:
+    """
+    Reads both channels of the data recorder buffer coarse to fine.
+
+    The device lock is only held for a single read command, so other device commands
+    can be interleaved between the reads.
+    """
+    CHANNELS = (0, 1)
+
+    def __init__(self, device: NV200Device, coarse_stride: int = 64, block_size: int = 256, max_coarse_reads: int = 32):
+        """
+        Args:
+            device (NV200Device): The device to read the recorder buffer from.
+            coarse_stride (int): The minimum distance of the samples that are read in the coarse pass.
+            block_size (int): The number of samples that are read per command in the refinement passes.
+            max_coarse_reads (int): The maximum number of single sample reads per channel in the
+                coarse pass - the stride is increased for recordings with more samples.
+        """
+        self._dev = device
+        self.coarse_stride = max(1, coarse_stride)
+        self.block_size = max(1, block_size)
+        self.max_coarse_reads = max(1, max_coarse_reads)
+        self.sample_count = 0
+        self.sample_period_ms = 0.0
+        self.sources : list[DataRecorderSource] = []
+        self.values : list[np.ndarray] = []
+        self.known : list[np.ndarray] = []
+
+
+    async def read_header(self):
+        """
+        Reads the recorder configuration - the number of recorded samples, the sample period
+        and the sources of both channels - and prepares the sample buffers.
+
+        Raises:
+            ValueError: If the device reports no recorded samples.
+        """
+        dev = self._dev
+        async with dev.lock:
+            sample_count = await dev.read_int_value("reclen")
+            stride = await dev.read_int_value("recstr")
+            self.sources = [DataRecorderSource.from_value(await dev.read_int_value(cmd=f"recsrc,{channel}", param_index=1))
+                            for channel in self.CHANNELS]
+        if sample_count <= 0:
+            raise ValueError(f"The data recorder reports no recorded samples (reclen = {sample_count}).")
+        self.sample_count = sample_count
+        self.sample_period_ms = 1000 / (DataRecorder.NV200_RECORDER_SAMPLE_RATE_HZ / max(stride, 1))
+        self.values = [np.full(self.sample_count, np.nan) for _ in self.CHANNELS]
+        self.known = [np.zeros(self.sample_count, dtype=bool) for _ in self.CHANNELS]
+
+
+    async def _read_block(self, channel: int, start: int, count: int):
+        """
+        Reads count samples starting at start into the sample buffer of the given channel.
+        """
+        async with self._dev.lock:
+            response = await self._dev.read_values(f"recout,{channel},{start},{count}", DataRecorder.BUFFER_READ_TIMEOUT_SECS)
+        # The response starts with the channel and the start index
+        block = np.asarray(response[2:2 + count], dtype=float)
+        self.values[channel][start:start + len(block)] = block
+        self.known[channel][start:start + len(block)] = True
+
+
+    def effective_coarse_stride(self) -> int:
+        """
+        Returns the stride of the coarse pass - at least coarse_stride and large enough that
+        at most max_coarse_reads samples are read per channel.
+        """
+        return max(self.coarse_stride, -(-self.sample_count // self.max_coarse_reads))
+
+
+    async def read_coarse(self):
+        """
+        Reads every n-th sample of both channels - see effective_coarse_stride().
+        """
+        for index in range(0, self.sample_count, self.effective_coarse_stride()):
+            for channel in self.CHANNELS:
+                await self._read_block(channel, index, 1)
+
+
+    async def refine(self, on_progress: Callable[[float], None] = lambda fraction: None,
+                     should_stop: Callable[[], bool] = lambda: False) -> bool:
+        """
+        Reads the remaining samples block by block. Both channels are refined alternately,
+        so that both lines improve at the same pace.
+
+        Args:
+            on_progress (Callable[[float], None]): Called after each block pair with the fraction of known samples.
+            should_stop (Callable[[], bool]): Polled before each block - refinement stops if it returns True.
+
+        Returns:
+            bool: True if all samples have been read, False if the refinement has been stopped.
+        """
+        for start in range(0, self.sample_count, self.block_size):
+            count = min(self.block_size, self.sample_count - start)
+            for channel in self.CHANNELS:
+                if should_stop():
+                    return False
+                # Skip blocks that are already complete (e.g. very short recordings)
+                if not self.known[channel][start:start + count].all():
+                    await self._read_block(channel, start, count)
+            on_progress(self.known_fraction())
+        return True
+
+
+    def known_fraction(self) -> float:
+        """
+        Returns the fraction of samples of both channels that have been read.
+        """
+        if self.sample_count == 0:
+            return 1.0
+        return sum(int(known.sum()) for known in self.known) / (self.sample_count * len(self.CHANNELS))
+
+
+    def line_data(self, channel: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the sample times (ms) and values of the samples of the given channel that have been read.
+        """
+        indices = np.flatnonzero(self.known[channel])
+        return indices * self.sample_period_ms, self.values[channel][indices]
+
+
+    def channel_data(self, channel: int) -> DataRecorder.ChannelRecordingData:
+        """
+        Returns the recording data of the given channel - samples that have not been read are NaN.
+        """
+        return DataRecorder.ChannelRecordingData(self.values[channel].tolist(), self.sample_period_ms, self.sources[channel])
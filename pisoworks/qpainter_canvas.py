@@ -0,0 +1,1272 @@
+"""
+QPainter based plot backend.
+
+PainterCanvas is a lightweight alternative to the Matplotlib based MplCanvas. It draws the
+lines directly with QPainter from NumPy buffers and provides the same public plot API
+(add_line, update_line, get_axes, scale_axes, clear_plot, create_export_data, ...), so that
+a view can switch between both backends via MplWidget.set_backend().
+
+Long lines are decimated to about two points per horizontal pixel (min/max per pixel
+column) and converted into a QPolygonF in one block via QDataStream, so lines with
+millions of samples can be updated with the display frame rate.
+"""
+import math
+import struct
+from collections import deque
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+from matplotlib.colors import to_rgba
+from matplotlib.ticker import MaxNLocator
+from PySide6.QtCore import Qt, QByteArray, QDataStream, QPointF, QRectF
+from PySide6.QtGui import QAction, QColor, QFont, QFontMetricsF, QPainter, QPalette, QPen, QPolygonF
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QToolBar, QWidget
+from nv200.data_recorder import DataRecorder
+
+from pisoworks.mplcanvas import StreamingLine, build_export_dataframe, decimate_minmax
+from pisoworks.plot_export import export_line_data
+from pisoworks.style_manager import style_manager
+from pisoworks.ui_helpers import get_icon
+
+
+def qcolor_to_rgba(color: QColor) -> tuple[float, float, float, float]:
+    """
+    Converts a QColor to a tuple of floats in the range 0.0–1.0.
+    """
+    return (color.redF(), color.greenF(), color.blueF(), color.alphaF())
+
+
+def polygon_from_arrays(x: np.ndarray, y: np.ndarray) -> QPolygonF:
+    """
+    Creates a QPolygonF from the given coordinate arrays without creating a QPointF
+    object per point. The points are serialized into the QDataStream format of QPolygonF
+    (point count followed by big endian double pairs) and read back in one block.
+    """
+    count = len(x)
+    points = np.empty(count, dtype=[('x', '>f8'), ('y', '>f8')])
+    points['x'] = x
+    points['y'] = y
+    data = QByteArray(struct.pack('>I', count) + points.tobytes())
+    polygon = QPolygonF()
+    QDataStream(data) >> polygon
+    return polygon
+
+
+class PainterLine:
+    """
+    A line of the PainterCanvas - provides the subset of the Matplotlib Line2D API used by the views.
+    """
+    def __init__(self, axes: "PainterAxes", x_data, y_data, label: str, color, linestyle: str = '-'):
+        """
+        Creates a line of the given axes - color is any Matplotlib color specification.
+        """
+        self.axes : PainterAxes | None = axes
+        self._label = label
+        self._rgba = to_rgba(color)
+        self._linestyle = linestyle
+        self._visible = True
+        self.set_data(x_data, y_data)
+
+    def set_data(self, x_data, y_data):
+        """
+        Sets the x and y data of the line and schedules a repaint of the canvas.
+        """
+        self._x = np.asarray(x_data, dtype=float).ravel()
+        self._y = np.asarray(y_data, dtype=float).ravel()
+        self._sorted = len(self._x) < 2 or bool(np.all(np.diff(self._x) >= 0))
+        self._data_limits = None
+        self._request_update()
+
+    def set_xdata(self, x_data):
+        """
+        Sets the x data of the line.
+        """
+        self.set_data(x_data, self._y)
+
+    def set_ydata(self, y_data):
+        """
+        Sets the y data of the line.
+        """
+        self.set_data(self._x, y_data)
+
+    def get_xdata(self) -> np.ndarray:
+        """
+        Returns the x data of the line.
+        """
+        return self._x
+
+    def get_ydata(self) -> np.ndarray:
+        """
+        Returns the y data of the line.
+        """
+        return self._y
+
+    def get_data(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the x and y data of the line.
+        """
+        return self._x, self._y
+
+    def is_sorted(self) -> bool:
+        """
+        Returns True if the x data is sorted in ascending order - only sorted lines are decimated.
+        """
+        return self._sorted
+
+    def data_limits(self) -> tuple[float, float, float, float] | None:
+        """
+        Returns the finite data limits (x_min, x_max, y_min, y_max) or None if the line has no finite data.
+        """
+        if self._data_limits is None:
+            finite = np.isfinite(self._x) & np.isfinite(self._y)
+            if not finite.any():
+                return None
+            x, y = self._x[finite], self._y[finite]
+            self._data_limits = (x.min(), x.max(), y.min(), y.max())
+        return self._data_limits
+
+    def get_label(self) -> str:
+        """
+        Returns the label of the line.
+        """
+        return self._label
+
+    def set_label(self, label: str):
+        """
+        Sets the label of the line that is shown in the legend.
+        """
+        self._label = label
+        self._request_update()
+
+    def get_color(self) -> tuple[float, float, float, float]:
+        """
+        Returns the color of the line as RGBA tuple.
+        """
+        return self._rgba
+
+    def set_color(self, color):
+        """
+        Sets the color of the line - any Matplotlib color specification.
+        """
+        self._rgba = to_rgba(color)
+        self._request_update()
+
+    def get_linestyle(self) -> str:
+        """
+        Returns the Matplotlib line style of the line, e.g. '-' or '--'.
+        """
+        return self._linestyle
+
+    def get_visible(self) -> bool:
+        """
+        Returns True if the line is drawn.
+        """
+        return self._visible
+
+    def set_visible(self, visible: bool):
+        """
+        Shows or hides the line.
+        """
+        self._visible = visible
+        self._request_update()
+
+    def remove(self):
+        """
+        Removes the line from its axes.
+        """
+        if self.axes is not None:
+            self.axes._lines.remove(self)
+            self.axes.canvas.update()
+            self.axes = None
+
+    def _request_update(self):
+        """
+        Schedules a repaint of the canvas, if the line belongs to an axes.
+        """
+        if getattr(self, "axes", None) is not None:
+            self.axes.canvas.update()
+
+
+class PainterBand:
+    """
+    A filled band between a lower and an upper curve - the counterpart of Axes.fill_between().
+    """
+    def __init__(self, axes: "PainterAxes", x_data, low_data, high_data, color, alpha: float):
+        """
+        Creates a band of the given axes - the alpha value is applied to the fill color.
+        """
+        self.axes : PainterAxes | None = axes
+        self.x = np.asarray(x_data, dtype=float).ravel()
+        self.low = np.asarray(low_data, dtype=float).ravel()
+        self.high = np.asarray(high_data, dtype=float).ravel()
+        self.rgba = to_rgba(color, alpha)
+
+    def data_limits(self) -> tuple[float, float, float, float] | None:
+        """
+        Returns the finite data limits (x_min, x_max, y_min, y_max) or None if the band has no finite data.
+        """
+        finite = np.isfinite(self.x) & np.isfinite(self.low) & np.isfinite(self.high)
+        if not finite.any():
+            return None
+        x = self.x[finite]
+        return (x.min(), x.max(), self.low[finite].min(), self.high[finite].max())
+
+    def remove(self):
+        """
+        Removes the band from its axes.
+        """
+        if self.axes is not None:
+            self.axes._bands.remove(self)
+            self.axes.canvas.update()
+            self.axes = None
+
+
+class PainterAxes:
+    """
+    An axes of the PainterCanvas - provides the subset of the Matplotlib Axes API used by the views.
+    The secondary axes (index 1) shares the x limits with the primary axes, like Axes.twinx().
+    """
+    def __init__(self, canvas: "PainterCanvas", shared_x: "PainterAxes | None" = None):
+        """
+        Creates an axes of the canvas - if shared_x is given, the x limits of that axes are used.
+        """
+        self.canvas = canvas
+        self._shared_x = shared_x
+        self._lines : list[PainterLine] = []
+        self._bands : list[PainterBand] = []
+        self._xlabel = ""
+        self._ylabel = ""
+        self._title = ""
+        self._xlim = (0.0, 1.0)
+        self._ylim = (0.0, 1.0)
+        self._autoscale_x = True
+        self._autoscale_y = True
+
+    def plot(self, x_data, y_data, color='orange', label: str = "", linestyle: str = '-') -> list[PainterLine]:
+        """
+        Adds a line to the axes and returns it in a list, like Axes.plot().
+        """
+        line = PainterLine(self, x_data, y_data, label, color, linestyle)
+        self._lines.append(line)
+        self.canvas.update()
+        return [line]
+
+    def get_lines(self) -> list[PainterLine]:
+        """
+        Returns a copy of the list of lines of the axes.
+        """
+        return list(self._lines)
+
+    def set_xlabel(self, label: str, **kwargs):
+        """
+        Sets the x axis label - the keyword arguments are ignored.
+        """
+        self._xlabel = str(label)
+        self.canvas.update()
+
+    def get_xlabel(self) -> str:
+        """
+        Returns the x axis label.
+        """
+        return self._xlabel
+
+    def set_ylabel(self, label: str, **kwargs):
+        """
+        Sets the y axis label - the keyword arguments are ignored.
+        """
+        self._ylabel = str(label)
+        self.canvas.update()
+
+    def get_ylabel(self) -> str:
+        """
+        Returns the y axis label.
+        """
+        return self._ylabel
+
+    def set_title(self, title: str, **kwargs):
+        """
+        Sets the title of the axes - the keyword arguments are ignored.
+        """
+        self._title = str(title)
+        self.canvas.update()
+
+    def get_title(self) -> str:
+        """
+        Returns the title of the axes.
+        """
+        return self._title
+
+    def get_xlim(self) -> tuple[float, float]:
+        """
+        Returns the x limits - of the shared axes, if the x axis is shared.
+        """
+        if self._shared_x is not None:
+            return self._shared_x.get_xlim()
+        return self._xlim
+
+    def set_xlim(self, left=None, right=None, *, auto: bool | None = False):
+        """
+        Sets the x limits like Axes.set_xlim() - setting the limits disables the x autoscaling
+        unless auto is None.
+        """
+        if self._shared_x is not None:
+            self._shared_x.set_xlim(left, right, auto=auto)
+            return
+        if isinstance(left, (tuple, list)):
+            left, right = left
+        low, high = self._xlim
+        self._xlim = (low if left is None else float(left), high if right is None else float(right))
+        if auto is not None:
+            self._autoscale_x = auto
+        self.canvas.update()
+
+    def get_ylim(self) -> tuple[float, float]:
+        """
+        Returns the y limits.
+        """
+        return self._ylim
+
+    def set_ylim(self, bottom=None, top=None, *, auto: bool | None = False):
+        """
+        Sets the y limits like Axes.set_ylim() - setting the limits disables the y autoscaling
+        unless auto is None.
+        """
+        if isinstance(bottom, (tuple, list)):
+            bottom, top = bottom
+        low, high = self._ylim
+        self._ylim = (low if bottom is None else float(bottom), high if top is None else float(top))
+        if auto is not None:
+            self._autoscale_y = auto
+        self.canvas.update()
+
+    def set_autoscale_on(self, enabled: bool):
+        """
+        Enables or disables the autoscaling of both axes in autoscale_view().
+        """
+        self._autoscale_x = enabled
+        self._autoscale_y = enabled
+
+    def relim(self):
+        """
+        The data limits are calculated on demand in autoscale_view().
+        """
+
+    def autoscale_view(self):
+        """
+        Adjusts the limits to the data limits of the lines, bands and history traces with a margin
+        of 5 %. The x limits are calculated from the lines of all axes that share the x axis.
+        """
+        if self._autoscale_y:
+            y_limits = self._data_limits(self._lines + self._bands + self._histories(), 2)
+            if y_limits is not None:
+                self._ylim = y_limits
+
+        x_axes = self._shared_x if self._shared_x is not None else self
+        if x_axes._autoscale_x:
+            all_lines = [line for ax in self.canvas.axes_list for line in ax._lines + ax._histories()]
+            x_limits = self._data_limits(all_lines, 0)
+            if x_limits is not None:
+                x_axes._xlim = x_limits
+        self.canvas.update()
+
+    def _histories(self) -> list["PainterHistory"]:
+        """
+        Returns the history of the axes in a list or an empty list if the axes has no history.
+        """
+        history = self.canvas._history.get(self)
+        return [history] if history is not None else []
+
+    @staticmethod
+    def _data_limits(lines: Sequence["PainterLine | PainterBand | PainterHistory"], index: int) -> tuple[float, float] | None:
+        """
+        Returns the limits of the x (index 0) or y (index 2) data of the given lines and bands
+        including a margin of 5 % or None if there is no finite data.
+        """
+        limits = [line.data_limits() for line in lines]
+        limits = [l for l in limits if l is not None]
+        if not limits:
+            return None
+        low = min(l[index] for l in limits)
+        high = max(l[index + 1] for l in limits)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        margin = (high - low) * 0.05
+        return (low - margin, high + margin)
+
+    def legend(self, *args, **kwargs):
+        """
+        The legend is always drawn by the canvas.
+        """
+
+    def grid(self, *args, **kwargs):
+        """
+        The grid is always drawn by the canvas.
+        """
+
+
+class PainterHistory:
+    """
+    Bounded history traces of a PainterCanvas axes - provides the same API as HistoryCollection.
+    Older traces are faded by age.
+    """
+    def __init__(self, depth: int = 20, fade: float = 0.5, min_alpha: float = 0.05, label: str = "History"):
+        """
+        Creates an empty history with the given depth and fading parameters.
+        """
+        self.label = label
+        self.fade = fade
+        self.min_alpha = min_alpha
+        self._traces : deque[tuple[np.ndarray, np.ndarray, str, tuple]] = deque(maxlen=depth)
+
+    @property
+    def depth(self) -> int:
+        """
+        Returns the maximum number of history traces.
+        """
+        return self._traces.maxlen
+
+    def set_depth(self, depth: int):
+        """
+        Sets the maximum number of history traces - the oldest traces are dropped.
+        """
+        self._traces = deque(self._traces, maxlen=max(int(depth), 1))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of history traces.
+        """
+        return len(self._traces)
+
+    def push(self, x_data: np.ndarray, y_data: np.ndarray, label: str, rgba: Sequence[float], columns: int = 1000):
+        """
+        Adds a trace to the history - the columns argument exists for API compatibility with
+        HistoryCollection, the traces are decimated while painting.
+        """
+        self._traces.appendleft((np.asarray(x_data, dtype=float), np.asarray(y_data, dtype=float), label, to_rgba(rgba)))
+
+    def clear(self):
+        """
+        Removes all traces from the history.
+        """
+        self._traces.clear()
+
+    def traces(self) -> list[tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Returns the data and the label of all traces - newest first.
+        """
+        return [(x, y, label) for x, y, label, _ in self._traces]
+
+    def colored_traces(self) -> list[tuple[np.ndarray, np.ndarray, str, tuple[float, float, float, float]]]:
+        """
+        Returns the data, the label and the unfaded color of all traces - newest first.
+        """
+        return list(self._traces)
+
+    def data_limits(self) -> tuple[float, float, float, float] | None:
+        """
+        Returns the finite data limits (x_min, x_max, y_min, y_max) of all traces or None if
+        the history contains no finite data.
+        """
+        limits = []
+        for x, y, _, _ in self._traces:
+            finite = np.isfinite(x) & np.isfinite(y)
+            if finite.any():
+                limits.append((x[finite].min(), x[finite].max(), y[finite].min(), y[finite].max()))
+        if not limits:
+            return None
+        x_min, x_max, y_min, y_max = zip(*limits)
+        return min(x_min), max(x_max), min(y_min), max(y_max)
+
+    def faded_traces(self):
+        """
+        Yields the x data, the y data and the faded color of each trace - oldest first, so that
+        the newest trace is drawn on top.
+        """
+        for age in range(len(self._traces) - 1, -1, -1):
+            x, y, _, rgba = self._traces[age]
+            alpha = max(self.fade ** (age + 1), self.min_alpha)
+            yield x, y, (rgba[0], rgba[1], rgba[2], rgba[3] * alpha)
+
+
+class PainterCanvas(QWidget):
+    """
+    QPainter based plot canvas with the same public API as MplCanvas.
+
+    Mouse interaction:
+    - Mouse wheel zooms in or out around the mouse position (hold Shift to zoom the y axis only,
+      hold Ctrl to zoom the x axis only)
+    - Dragging with the left mouse button pans the plot
+    - Double click autoscales the plot
+    """
+    LINESTYLES = {'-': Qt.PenStyle.SolidLine, '--': Qt.PenStyle.DashLine, ':': Qt.PenStyle.DotLine, '-.': Qt.PenStyle.DashDotLine}
+
+    def __init__(self, parent=None):
+        """
+        Creates the canvas with the primary axes - the secondary axes is created by get_axes(1).
+        """
+        super().__init__(parent)
+        self.setMinimumSize(100, 80)
+        self.setMouseTracking(False)
+        self.ax1 = PainterAxes(self)
+        self.ax1.set_xlabel('Time (ms)')
+        self.ax1.set_ylabel('Value')
+        self.ax2 : PainterAxes | None = None
+        self.axes_list : list[PainterAxes] = [self.ax1]
+        self._history : dict[PainterAxes, PainterHistory] = {}
+        self._history_depth = 20
+        self._streaming_lines : list[StreamingLine] = []
+        self._plot_rect = QRectF()
+        self._pan_start : QPointF | None = None
+        self._pan_limits = None
+        self._dark_mode = style_manager.style.is_current_theme_dark()
+
+
+    def get_axes(self, index : int) -> PainterAxes:
+        """
+        Retrieve the axes object at the specified index - the secondary axes is created on first use.
+        """
+        if index < len(self.axes_list):
+            return self.axes_list[index]
+
+        if index == 1:
+            self.ax2 = PainterAxes(self, shared_x=self.ax1)
+            self.ax2.set_ylabel("")
+            self.axes_list.append(self.ax2)
+            return self.ax2
+
+        raise IndexError(f"Index {index} out of range for axes list.")
+
+
+    def update_layout(self):
+        """
+        Schedules a repaint - the layout is calculated while painting.
+        """
+        self.update()
+
+
+    def redraw_lines(self):
+        """
+        Schedules a repaint. The streaming lines are synchronized here and not while painting,
+        because updating a line during the paint event would schedule another repaint.
+        """
+        self._streaming_lines = [stream for stream in self._streaming_lines if stream.line.axes is not None]
+        for stream in self._streaming_lines:
+            stream.sync()
+        self.update()
+
+
+    def generate_legend(self):
+        """
+        The legend is generated while painting.
+        """
+        self.update()
+
+
+    def set_plot_title(self, title: str):
+        """
+        Sets the title of the plot.
+        """
+        self.ax1.set_title(title)
+
+
+    def plot_recorder_data(self, rec_data : DataRecorder.ChannelRecordingData, color : QColor = QColor('orange'), axis : int = 0):
+        """
+        Replaces all lines of the given axes by the recorder data.
+        """
+        self.remove_all_axes_lines(axis)
+        self.add_recorder_data_line(rec_data, color, axis)
+
+
+    def add_recorder_data_line(self, rec_data : DataRecorder.ChannelRecordingData, color : QColor = QColor('orange'), axis : int = 0):
+        """
+        Adds the recorder data as a new line to the given axes.
+        """
+        self.add_line(rec_data.sample_times_ms, rec_data.values, str(rec_data.source), color, axis)
+
+
+    def plot_data(self, x_data: Union[Sequence[float], np.ndarray], y_data: Union[Sequence[float], np.ndarray], label: str, color : QColor = QColor('orange'), axis : int = 0):
+        """
+        Replaces all lines of the given axes by a line with the given data.
+        """
+        self.remove_all_axes_lines(axis)
+        self.add_line(x_data, y_data, label, color, axis)
+
+
+    def add_line(self, x_data: Sequence[float], y_data: Sequence[float], label: str, color : QColor = QColor('orange'), axis : int = 0, linestyle: str = '-'):
+        """
+        Adds a new line to the given axes and autoscales the axes.
+        """
+        ax = self.get_axes(axis)
+        ax.plot(x_data, y_data, color=qcolor_to_rgba(color), label=label, linestyle=linestyle)
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+
+
+    def add_streaming_line(self, label: str, window_ms: float, sample_period_ms: float,
+                           color : QColor = QColor('orange'), axis : int = 0,
+                           y_range: tuple[float, float] | None = None) -> StreamingLine:
+        """
+        Adds a live streaming line that shows a fixed rolling time window - see MplCanvas.add_streaming_line.
+        """
+        ax = self.get_axes(axis)
+        line, = ax.plot([], [], color=qcolor_to_rgba(color), label=label)
+        stream = StreamingLine(self, line, window_ms, sample_period_ms, y_range)
+        self._add_streaming_line(stream, ax)
+        return stream
+
+
+    def attach_streaming_line(self, stream: StreamingLine, axis: int = 0):
+        """
+        Shows an existing streaming line of another canvas in this canvas - see MplCanvas.attach_streaming_line.
+        """
+        ax = self.get_axes(axis)
+        line, = ax.plot([], [], color=to_rgba(stream.line.get_color()), label=stream.line.get_label())
+        stream.attach(self, line)
+        self._add_streaming_line(stream, ax)
+
+
+    def _add_streaming_line(self, stream: StreamingLine, ax: PainterAxes):
+        """
+        Registers the streaming line and configures the axes for the rolling time window.
+        """
+        self._streaming_lines.append(stream)
+        ax.set_autoscale_on(False)
+        ax.set_xlim(-(stream.capacity - 1) * stream.sample_period_ms, 0)
+        if stream.y_range is not None:
+            ax.set_ylim(*stream.y_range)
+
+
+    def streaming_lines(self) -> list[StreamingLine]:
+        """
+        Returns the streaming lines that are still shown in the plot.
+        """
+        return [stream for stream in self._streaming_lines if stream.line.axes is not None]
+
+
+    def autoscale(self, axis: int = 0):
+        """
+        Enables the autoscaling of the given axes and adjusts its limits to the data.
+        """
+        ax = self.get_axes(axis)
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+
+
+    def update_line(self, line_index: int, x_data: Sequence[float], y_data: Sequence[float], axis : int = 0):
+        """
+        Updates the data of the line with the given index and autoscales the axes.
+        """
+        ax = self.get_axes(axis)
+        lines = ax.get_lines()
+        if not 0 <= line_index < len(lines):
+            raise IndexError("Line index out of range.")
+        lines[line_index].set_data(x_data, y_data)
+        ax.autoscale_view()
+
+
+    def get_line_data(self, line: PainterLine) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the x and y data of the given line.
+        """
+        return line.get_data()
+
+
+    def get_line_color(self, line_index: int, axis : int = 0) -> QColor:
+        """
+        Returns the color of the line with the given index.
+        """
+        lines = self.get_axes(axis).get_lines()
+        if not 0 <= line_index < len(lines):
+            raise IndexError("Line index out of range.")
+        return QColor.fromRgbF(*lines[line_index].get_color())
+
+
+    def set_line_color(self, line_index: int, color: QColor, axis : int = 0):
+        """
+        Sets the color of the line with the given index.
+        """
+        lines = self.get_axes(axis).get_lines()
+        if not 0 <= line_index < len(lines):
+            raise IndexError("Line index out of range.")
+        lines[line_index].set_color(qcolor_to_rgba(color))
+
+
+    def get_lines(self, axis: int = 0) -> Sequence:
+        """
+        Returns the lines of the given axes.
+        """
+        return self.get_axes(axis).get_lines()
+
+
+    def get_line_count(self, axis: int = 0) -> int:
+        """
+        Returns the number of lines of the given axes.
+        """
+        return len(self.get_axes(axis).get_lines())
+
+
+    def scale_axes(self, x_min: float, x_max: float, y_min: float, y_max: float, axis: int = 0):
+        """
+        Sets the x and y limits of the given axes - this disables the autoscaling.
+        """
+        ax = self.get_axes(axis)
+        ax.set_xlim(x_min, x_max)
+        ax.set_ylim(y_min, y_max)
+
+
+    def remove_all_axes_lines(self, axis: int = 0):
+        """
+        Removes all lines of the given axes.
+        """
+        if axis >= len(self.axes_list):
+            return
+        for line in self.axes_list[axis].get_lines():
+            line.remove()
+
+
+    def add_band(self, x_data: Sequence[float], low_data: Sequence[float], high_data: Sequence[float],
+                 color : QColor = QColor('orange'), axis : int = 0, alpha: float = 0.25) -> PainterBand:
+        """
+        Adds a filled band between low_data and high_data to the given axes and autoscales the axes.
+        """
+        ax = self.get_axes(axis)
+        band = PainterBand(ax, x_data, low_data, high_data, qcolor_to_rgba(color), alpha)
+        ax._bands.append(band)
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+        return band
+
+
+    def remove_bands(self):
+        """
+        Removes the bands of all axes.
+        """
+        for ax in self.axes_list:
+            for band in list(ax._bands):
+                band.remove()
+
+
+    def bands(self) -> list[tuple[np.ndarray, np.ndarray, np.ndarray, QColor, int, float]]:
+        """
+        Returns the source data of all bands as (x_data, low_data, high_data, color, axis, alpha) -
+        the arguments of add_band().
+        """
+        return [(band.x, band.low, band.high, QColor.fromRgbF(*band.rgba[:3]), axis, band.rgba[3])
+                for axis, ax in enumerate(self.axes_list) for band in ax._bands]
+
+
+    def clear_plot(self):
+        """
+        Clears the plot by removing all history traces, bands and lines.
+        """
+        self.clear_history()
+        self.remove_bands()
+        self.remove_all_axes_lines(0)
+        self.remove_all_axes_lines(1)
+
+
+    def get_history(self, axis: int = 0) -> PainterHistory:
+        """
+        Returns the history of the given axes - it is created on first use.
+        """
+        ax = self.get_axes(axis)
+        history = self._history.get(ax)
+        if history is None:
+            history = self._history[ax] = PainterHistory(self._history_depth)
+        return history
+
+
+    def set_history_depth(self, depth: int):
+        """
+        Sets the maximum number of history traces per axes.
+        """
+        self._history_depth = depth
+        for history in self._history.values():
+            history.set_depth(depth)
+        self.update()
+
+
+    def move_lines_to_history(self, line_indices: Sequence[int], axis: int = 0):
+        """
+        Moves the given lines into the history of the axes - see MplCanvas.move_lines_to_history().
+        """
+        ax = self.get_axes(axis)
+        lines = ax.get_lines()
+        history = self.get_history(axis)
+        selected = [lines[i] for i in line_indices if 0 <= i < len(lines)]
+        for line in reversed(selected):
+            x_data, y_data = line.get_data()
+            history.push(x_data, y_data, line.get_label(), line.get_color())
+            line.remove()
+        self.update()
+
+
+    def clear_history(self):
+        """
+        Removes all history traces of all axes.
+        """
+        for history in self._history.values():
+            history.clear()
+        self.update()
+
+
+    def set_dark_mode(self, dark_mode: bool):
+        """
+        Switches the background color between dark and light mode.
+        """
+        self._dark_mode = dark_mode
+        self.update()
+
+
+    def create_export_data(self) -> pd.DataFrame | None:
+        """
+        Exports the data from all lines and history traces in the first axes as a pandas DataFrame.
+        """
+        export_data = self._export_line_data()
+        if export_data is None:
+            return
+        return build_export_dataframe(*export_data)
+
+
+    def _export_line_data(self) -> tuple[str, list[str], list[tuple[np.ndarray, np.ndarray]]] | None:
+        """
+        Collects the export data of the first axes - see MplCanvas._export_line_data().
+        """
+        ax = self.axes_list[0]
+        lines = ax.get_lines()
+        stream_lines = [stream.line for stream in self.streaming_lines()]
+        line_data = [tuple(a.copy() for a in line.get_data()) if any(line is s for s in stream_lines) else line.get_data()
+                     for line in lines]
+        line_labels = [line.get_label() for line in lines]
+
+        history = self._history.get(ax)
+        if history is not None:
+            for age, (x, y, label) in enumerate(history.traces(), start=1):
+                line_data.append((x, y))
+                line_labels.append(f"{label} (history {age})")
+
+        if not line_data:
+            print("No data to export.")
+            return None
+
+        return ax.get_xlabel(), line_labels, line_data
+
+
+    def export_plot_data(self) -> None:
+        """
+        Exports the plot data into a file selected by the user - see MplCanvas.export_plot_data().
+        """
+        export_data = self._export_line_data()
+        if export_data is None:
+            return
+        export_line_data(self, *export_data)
+
+
+    # --- Painting -------------------------------------------------------------------------------
+
+    @staticmethod
+    def _ticks(low: float, high: float, count: int) -> tuple[np.ndarray, list[str]]:
+        """
+        Returns nice tick positions within the given range and the formatted tick labels.
+        """
+        if not (math.isfinite(low) and math.isfinite(high)) or low == high:
+            return np.empty(0), []
+        low, high = min(low, high), max(low, high)
+        ticks = MaxNLocator(nbins=max(count, 2)).tick_values(low, high)
+        ticks = ticks[(ticks >= low) & (ticks <= high)]
+        if len(ticks) < 2:
+            return ticks, [f"{t:g}" for t in ticks]
+        step = ticks[1] - ticks[0]
+        decimals = max(0, -int(math.floor(math.log10(step)))) if step > 0 else 0
+        return ticks, [f"{t:.{decimals}f}" for t in ticks]
+
+
+    def _map_x(self, x: np.ndarray, xlim: tuple[float, float]) -> np.ndarray:
+        """
+        Maps x data values to widget coordinates of the plot area.
+        """
+        rect = self._plot_rect
+        return rect.left() + (x - xlim[0]) * (rect.width() / (xlim[1] - xlim[0]))
+
+
+    def _map_y(self, y: np.ndarray, ylim: tuple[float, float]) -> np.ndarray:
+        """
+        Maps y data values to widget coordinates of the plot area.
+        """
+        rect = self._plot_rect
+        return rect.bottom() - (y - ylim[0]) * (rect.height() / (ylim[1] - ylim[0]))
+
+
+    def _line_polygon(self, ax: PainterAxes, x: np.ndarray, y: np.ndarray, is_sorted: bool) -> QPolygonF | None:
+        """
+        Decimates the line data for the current view and maps it into a QPolygonF in widget coordinates.
+        """
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        if xlim[0] == xlim[1] or ylim[0] == ylim[1] or len(x) == 0:
+            return None
+
+        if is_sorted:
+            x, y = decimate_minmax(x, y, min(xlim), max(xlim), max(int(self._plot_rect.width()), 1))
+
+        finite = np.isfinite(x) & np.isfinite(y)
+        if not finite.all():
+            x, y = x[finite], y[finite]
+        px = self._map_x(x, xlim)
+        py = self._map_y(y, ylim)
+
+        # Drop consecutive points that fall into the same pixel - this also reduces unsorted
+        # XY data like hysteresis curves to the pixel resolution of the plot
+        if len(px) > 2:
+            ix, iy = px.astype(np.int64), py.astype(np.int64)
+            keep = np.empty(len(px), dtype=bool)
+            keep[0] = keep[-1] = True
+            keep[1:-1] = (ix[1:-1] != ix[:-2]) | (iy[1:-1] != iy[:-2])
+            px, py = px[keep], py[keep]
+        return polygon_from_arrays(px, py)
+
+
+    def _band_polygon(self, ax: PainterAxes, band: PainterBand) -> QPolygonF | None:
+        """
+        Maps a band into a closed QPolygonF in widget coordinates - the upper curve from left
+        to right followed by the lower curve from right to left.
+        """
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        finite = np.isfinite(band.x) & np.isfinite(band.low) & np.isfinite(band.high)
+        if xlim[0] == xlim[1] or ylim[0] == ylim[1] or not finite.any():
+            return None
+        px = self._map_x(band.x[finite], xlim)
+        py_high = self._map_y(band.high[finite], ylim)
+        py_low = self._map_y(band.low[finite], ylim)
+        return polygon_from_arrays(np.concatenate((px, px[::-1])), np.concatenate((py_high, py_low[::-1])))
+
+
+    def paintEvent(self, event):
+        """
+        Paints the complete plot.
+        """
+        painter = QPainter(self)
+        try:
+            self._paint(painter)
+        finally:
+            painter.end()
+
+
+    def _paint(self, painter: QPainter):
+        """
+        Paints the background, the axes, the bands, the history traces, the lines and the legend.
+        """
+        bg_color = QColor('black') if self._dark_mode else QColor('white')
+        fg_color = QColor('darkgray')
+        text_color = QPalette().color(QPalette.ColorRole.WindowText)
+
+        font = QFont(self.font())
+        font.setPointSizeF(style_manager.base_font_size())
+        painter.setFont(font)
+        fm = QFontMetricsF(font)
+        line_height = fm.height()
+
+        painter.fillRect(self.rect(), bg_color)
+
+        # Calculate the tick labels first because they define the margins of the plot area
+        width, height = self.width(), self.height()
+        xlim = self.ax1.get_xlim()
+        x_ticks, x_labels = self._ticks(*xlim, int(width / 90))
+        y_ticks = [self._ticks(*ax.get_ylim(), int(height / 50)) for ax in self.axes_list]
+
+        def label_width(labels: list[str]) -> float:
+            return max((fm.horizontalAdvance(label) for label in labels), default=0)
+
+        left = label_width(y_ticks[0][1]) + line_height * 2 + 8
+        right = (label_width(y_ticks[1][1]) + line_height * 2 + 8) if self.ax2 is not None else 16
+        top = line_height * 1.5 + 8 if self.ax1.get_title() else 12
+        bottom = line_height * 2.5 + 8
+        self._plot_rect = rect = QRectF(left, top, max(width - left - right, 1), max(height - top - bottom, 1))
+
+        # Grid and ticks of the primary axes
+        grid_pen = QPen(fg_color, 0.5, Qt.PenStyle.DashLine)
+        painter.setPen(grid_pen)
+        px_ticks = self._map_x(x_ticks, xlim) if xlim[0] != xlim[1] else []
+        for px in px_ticks:
+            painter.drawLine(QPointF(px, rect.top()), QPointF(px, rect.bottom()))
+        ylim = self.ax1.get_ylim()
+        py_ticks = self._map_y(y_ticks[0][0], ylim) if ylim[0] != ylim[1] else []
+        for py in py_ticks:
+            painter.drawLine(QPointF(rect.left(), py), QPointF(rect.right(), py))
+
+        painter.setPen(text_color)
+        for px, label in zip(px_ticks, x_labels):
+            w = fm.horizontalAdvance(label)
+            painter.drawText(QPointF(px - w / 2, rect.bottom() + line_height + 2), label)
+        for py, label in zip(py_ticks, y_ticks[0][1]):
+            w = fm.horizontalAdvance(label)
+            painter.drawText(QPointF(rect.left() - w - 6, py + fm.ascent() / 2 - 1), label)
+
+        # Tick labels of the secondary axes on the right side
+        if self.ax2 is not None:
+            ylim2 = self.ax2.get_ylim()
+            if ylim2[0] != ylim2[1]:
+                for py, label in zip(self._map_y(y_ticks[1][0], ylim2), y_ticks[1][1]):
+                    painter.drawText(QPointF(rect.right() + 6, py + fm.ascent() / 2 - 1), label)
+
+        # Axes labels and title
+        xlabel = self.ax1.get_xlabel()
+        painter.drawText(QPointF(rect.center().x() - fm.horizontalAdvance(xlabel) / 2, height - 8), xlabel)
+        title = self.ax1.get_title()
+        if title:
+            painter.drawText(QPointF(rect.center().x() - fm.horizontalAdvance(title) / 2, line_height + 4), title)
+        self._draw_vertical_text(painter, fm, self.ax1.get_ylabel(), line_height, rect.center().y(), -90)
+        if self.ax2 is not None:
+            self._draw_vertical_text(painter, fm, self.ax2.get_ylabel(), width - line_height, rect.center().y(), 90)
+
+        # Frame
+        painter.setPen(QPen(fg_color, 1))
+        painter.drawRect(rect)
+
+        # History traces and lines - clipped to the plot area
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        for ax in self.axes_list:
+            for band in ax._bands:
+                polygon = self._band_polygon(ax, band)
+                if polygon is not None:
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    painter.setBrush(QColor.fromRgbF(*band.rgba))
+                    painter.drawPolygon(polygon)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+
+        for ax, history in self._history.items():
+            for x, y, rgba in history.faded_traces():
+                polygon = self._line_polygon(ax, x, y, len(x) < 2 or bool(np.all(np.diff(x) >= 0)))
+                if polygon is not None:
+                    painter.setPen(self._line_pen(QColor.fromRgbF(*rgba)))
+                    painter.drawPolyline(polygon)
+
+        for ax in self.axes_list:
+            for line in ax.get_lines():
+                if not line.get_visible():
+                    continue
+                x, y = line.get_data()
+                polygon = self._line_polygon(ax, x, y, line.is_sorted())
+                if polygon is None:
+                    continue
+                pen = self._line_pen(QColor.fromRgbF(*line.get_color()))
+                pen.setStyle(self.LINESTYLES.get(line.get_linestyle(), Qt.PenStyle.SolidLine))
+                painter.setPen(pen)
+                painter.drawPolyline(polygon)
+        painter.restore()
+
+        self._draw_legend(painter, fm, rect)
+
+
+    @staticmethod
+    def _line_pen(color: QColor) -> QPen:
+        """
+        Returns the pen for drawing lines. A cosmetic pen with a width of one pixel is used,
+        because wider pens are stroked into outlines, which is very slow for the zigzag shape
+        of decimated min/max data.
+        """
+        pen = QPen(color, 1)
+        pen.setCosmetic(True)
+        return pen
+
+
+    @staticmethod
+    def _draw_vertical_text(painter: QPainter, fm: QFontMetricsF, text: str, x: float, y: float, angle: float):
+        """
+        Draws a text centered at the given position and rotated by the given angle - used for the y axis labels.
+        """
+        if not text:
+            return
+        painter.save()
+        painter.translate(x, y)
+        painter.rotate(angle)
+        painter.drawText(QPointF(-fm.horizontalAdvance(text) / 2, fm.ascent() / 2), text)
+        painter.restore()
+
+
+    def _draw_legend(self, painter: QPainter, fm: QFontMetricsF, rect: QRectF):
+        """
+        Draws a single legend for all lines of all axes and one entry per history.
+        """
+        entries = [(line.get_label(), QColor.fromRgbF(*line.get_color()))
+                   for ax in self.axes_list for line in ax.get_lines() if not line.get_label().startswith("_")]
+        for history in self._history.values():
+            if len(history):
+                rgba = history._traces[0][3]
+                entries.append((f"{history.label} ({len(history)})", QColor.fromRgbF(*rgba)))
+        if not entries:
+            return
+
+        line_height = fm.height()
+        sample_width = 24
+        box_width = max(fm.horizontalAdvance(label) for label, _ in entries) + sample_width + 18
+        box = QRectF(rect.right() - box_width - 8, rect.top() + 8, box_width, line_height * len(entries) + 8)
+        painter.setPen(QColor('darkgray'))
+        painter.setBrush(QColor('darkgray'))
+        painter.drawRect(box)
+        for i, (label, color) in enumerate(entries):
+            y = box.top() + 4 + line_height * (i + 0.5)
+            painter.setPen(QPen(color, 2))
+            painter.drawLine(QPointF(box.left() + 6, y), QPointF(box.left() + 6 + sample_width, y))
+            painter.setPen(QColor('black'))
+            painter.drawText(QPointF(box.left() + sample_width + 12, y + fm.ascent() / 2 - 1), label)
+
+
+    # --- Mouse interaction ----------------------------------------------------------------------
+
+    def zoom(self, factor: float, center: QPointF | None = None, zoom_x: bool = True, zoom_y: bool = True):
+        """
+        Zooms all axes around the given position.
+
+        Args:
+            factor (float): The factor for the visible data range - values below 1 zoom in.
+            center (QPointF | None): The zoom center in widget coordinates - None zooms around
+                the center of the plot area.
+            zoom_x (bool): If True, the x axis is zoomed.
+            zoom_y (bool): If True, the y axes are zoomed.
+        """
+        rect = self._plot_rect
+        if rect.isEmpty():
+            return
+        if center is None:
+            center = rect.center()
+
+        if zoom_x:
+            x0, x1 = self.ax1.get_xlim()
+            x = x0 + (center.x() - rect.left()) / rect.width() * (x1 - x0)
+            self.ax1.set_xlim(x - (x - x0) * factor, x + (x1 - x) * factor)
+        if zoom_y:
+            for ax in self.axes_list:
+                y0, y1 = ax.get_ylim()
+                y = y0 + (rect.bottom() - center.y()) / rect.height() * (y1 - y0)
+                ax.set_ylim(y - (y - y0) * factor, y + (y1 - y) * factor)
+
+
+    def wheelEvent(self, event):
+        """
+        Zooms around the mouse position - Shift zooms the y axes only, Ctrl zooms the x axis only.
+        """
+        modifiers = event.modifiers()
+        self.zoom(0.8 if event.angleDelta().y() > 0 else 1.25, event.position(),
+                  zoom_x=not modifiers & Qt.KeyboardModifier.ShiftModifier,
+                  zoom_y=not modifiers & Qt.KeyboardModifier.ControlModifier)
+        event.accept()
+
+
+    def mousePressEvent(self, event):
+        """
+        Starts panning with the left mouse button.
+        """
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._pan_start = event.position()
+            self._pan_limits = (self.ax1.get_xlim(), [ax.get_ylim() for ax in self.axes_list])
+        super().mousePressEvent(event)
+
+
+    def mouseMoveEvent(self, event):
+        """
+        Pans all axes by the distance the mouse has moved since the button was pressed.
+        """
+        if self._pan_start is None or self._plot_rect.isEmpty():
+            return super().mouseMoveEvent(event)
+        rect = self._plot_rect
+        delta = event.position() - self._pan_start
+        (x0, x1), ylims = self._pan_limits
+        dx = delta.x() / rect.width() * (x1 - x0)
+        self.ax1.set_xlim(x0 - dx, x1 - dx)
+        for ax, (y0, y1) in zip(self.axes_list, ylims):
+            dy = delta.y() / rect.height() * (y1 - y0)
+            ax.set_ylim(y0 + dy, y1 + dy)
+
+
+    def mouseReleaseEvent(self, event):
+        """
+        Stops panning.
+        """
+        self._pan_start = None
+        super().mouseReleaseEvent(event)
+
+
+    def mouseDoubleClickEvent(self, event):
+        """
+        Autoscales all axes.
+        """
+        for i in range(len(self.axes_list)):
+            self.autoscale(i)
+
+
+class PainterToolbar(QToolBar):
+    """
+    Toolbar of the PainterCanvas - provides the same API for custom actions as LightIconToolbar.
+    Panning is always active (drag with the left mouse button), the toolbar provides the
+    remaining navigation tools and saving the plot as image.
+    """
+    ZOOM_FACTOR = 0.8
+
+    def __init__(self, canvas: PainterCanvas, parent=None):
+        """
+        Creates the navigation actions for the given canvas.
+        """
+        super().__init__(parent)
+        self.canvas = canvas
+        self._icons : dict[QAction, str] = {}
+        self.home_action = self._add_action("Reset View", "home",
+            "Reset View - autoscale the plot (or double click into the plot)", self._on_home)
+        self.zoom_in_action = self._add_action("Zoom In", "zoom_in",
+            "Zoom In - or use the mouse wheel (Shift: y axis only, Ctrl: x axis only)",
+            lambda: self.canvas.zoom(self.ZOOM_FACTOR))
+        self.zoom_out_action = self._add_action("Zoom Out", "zoom_out",
+            "Zoom Out - or use the mouse wheel (Shift: y axis only, Ctrl: x axis only)",
+            lambda: self.canvas.zoom(1 / self.ZOOM_FACTOR))
+        self.save_action = self._add_action("Save Image", "file_save",
+            "Save the plot as image - drag with the left mouse button to pan the plot", self._on_save)
+        self.set_dark_mode(style_manager.style.is_current_theme_dark())
+
+
+    def _add_action(self, text: str, icon_name: str, tooltip: str, slot) -> QAction:
+        """
+        Creates a navigation action and adds it to the toolbar.
+        """
+        action = QAction(text, self)
+        action.setToolTip(tooltip)
+        action.triggered.connect(slot)
+        self.addAction(action)
+        self._icons[action] = icon_name
+        return action
+
+
+    def _on_home(self):
+        """
+        Autoscales all axes.
+        """
+        for i in range(len(self.canvas.axes_list)):
+            self.canvas.autoscale(i)
+
+
+    def _on_save(self):
+        """
+        Saves the plot into an image file selected by the user.
+        """
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Plot Image", "plot.png",
+                                                   "PNG Image (*.png);;JPEG Image (*.jpg *.jpeg);;BMP Image (*.bmp)")
+        if not file_path:
+            return
+        if not self.canvas.grab().save(file_path):
+            QMessageBox.warning(self, "Save Plot Image", f"The image could not be saved to {file_path}.")
+
+
+    def add_custom_action(self, action: QAction, index : int = -1):
+        """
+        Adds a custom action to the toolbar.
+        """
+        self.addAction(action)
+
+
+    def set_dark_mode(self, dark_mode: bool):
+        """
+        Updates the icons of the navigation actions for the current theme.
+        """
+        for action, icon_name in self._icons.items():
+            action.setIcon(get_icon(icon_name, size=24, fill=False, color=QPalette.ColorRole.WindowText))
@@ -0,0 +1,108 @@
+"""
+Browser dialog for the captures in the on-disk recording store.
+"""
+from PySide6.QtCore import Qt, Signal, QUrl
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import (QDialog, QDialogButtonBox, QHeaderView, QPushButton, QTreeWidget,
+    QTreeWidgetItem, QVBoxLayout, QWidget)
+
+from pisoworks.recording_store import RecordingInfo, RecordingStore, recording_store
+
+
+class RecordingBrowserDialog(QDialog):
+    """
+    Lists the stored captures of all sessions grouped by session and requests the replay
+    of the selected capture. The dialog is not modal, so several captures can be replayed
+    one after the other.
+    """
+    replay_requested = Signal(object)  # RecordingInfo
+
+    COLUMNS = ["Capture", "Time", "Type", "Sources", "Duration", "Samples", "Serial", "Parameters"]
+
+    def __init__(self, parent: QWidget | None = None, store: RecordingStore = recording_store):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle("Recordings")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+        tree = self.tree = QTreeWidget(self)
+        tree.setColumnCount(len(self.COLUMNS))
+        tree.setHeaderLabels(self.COLUMNS)
+        tree.setAlternatingRowColors(True)
+        tree.header().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        tree.itemDoubleClicked.connect(self.replay_selected)
+        tree.itemSelectionChanged.connect(self.update_buttons)
+        layout.addWidget(tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close, self)
+        self.replay_button = QPushButton("Replay", self)
+        self.replay_button.clicked.connect(self.replay_selected)
+        buttons.addButton(self.replay_button, QDialogButtonBox.ButtonRole.ActionRole)
+        refresh_button = QPushButton("Refresh", self)
+        refresh_button.clicked.connect(self.refresh)
+        buttons.addButton(refresh_button, QDialogButtonBox.ButtonRole.ActionRole)
+        folder_button = QPushButton("Open Folder", self)
+        folder_button.clicked.connect(self.open_folder)
+        buttons.addButton(folder_button, QDialogButtonBox.ButtonRole.ActionRole)
+        buttons.rejected.connect(self.close)
+        layout.addWidget(buttons)
+
+        self.refresh()
+
+
+    def refresh(self):
+        """
+        Reloads the session indices and fills the capture list. The current session is expanded.
+        """
+        tree = self.tree
+        tree.clear()
+        for session in self.store.sessions():
+            session_item = QTreeWidgetItem(tree, [session])
+            session_item.setFirstColumnSpanned(True)
+            for info in self.store.captures(session):
+                item = QTreeWidgetItem(session_item, [
+                    str(info.capture_id),
+                    info.timestamp.replace("T", " "),
+                    info.kind,
+                    ", ".join(info.sources),
+                    f"{info.duration_ms:.1f} ms",
+                    str(info.sample_count),
+                    info.device_serial,
+                    ", ".join(f"{key}={value}" for key, value in info.parameters.items()),
+                ])
+                item.setData(0, Qt.ItemDataRole.UserRole, info)
+            session_item.setExpanded(session == self.store.session)
+        self.update_buttons()
+
+
+    def selected_recording(self) -> RecordingInfo | None:
+        """
+        Returns the metadata of the selected capture or None if no capture is selected.
+        """
+        item = self.tree.currentItem()
+        if item is None:
+            return None
+        return item.data(0, Qt.ItemDataRole.UserRole)
+
+
+    def update_buttons(self):
+        self.replay_button.setEnabled(self.selected_recording() is not None)
+
+
+    def replay_selected(self):
+        """
+        Emits replay_requested for the selected capture.
+        """
+        info = self.selected_recording()
+        if info is not None:
+            self.replay_requested.emit(info)
+
+
+    def open_folder(self):
+        """
+        Opens the directory of the selected session in the file manager.
+        """
+        info = self.selected_recording()
+        path = self.store.session_path(info.session) if info is not None else self.store.root_path()
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(path)))
@@ -0,0 +1,309 @@
+"""
+Session store for the captures of the data recorder.
+
+Each capture is appended to the store of the current session. The store is a directory per
+session with one binary file per capture and a small metadata index:
+
+    <AppDataLocation>/recordings/<session>/
+        index.jsonl          - one JSON object per capture (timestamp, sources, duration, ...)
+        capture_00001.npy    - float64 array of shape (3, n): time (ms), channel 0, channel 1
+
+The capture files are written in the NumPy .npy format with the columns stored as rows, so
+each column is a contiguous block in the file. Loading a capture maps the file into memory
+(numpy.load with mmap_mode='r') - the columns are passed to the plot as zero-copy views
+without reading or parsing the whole file.
+
+The capture files are written by a background thread, so a capture never blocks the event
+loop with disk I/O. The size of the store is limited - if a capture exceeds the limit, the
+oldest capture files are deleted (and with them whole sessions that have no captures left).
+The captures of the continuous acquisition mode are only stored if this has been enabled,
+because a long running acquisition would fill the store within minutes.
+"""
+import json
+import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PySide6.QtCore import QStandardPaths
+
+from nv200.data_recorder import DataRecorder
+
+from pisoworks.settings_manager import SettingsContext
+
+
+INDEX_FILE_NAME = "index.jsonl"
+
+
+@dataclass
+class RecordingInfo:
+    """
+    The metadata of a stored capture - one entry of the session index.
+
+    Attributes:
+        capture_id (int): The number of the capture within its session.
+        session (str): The name of the session directory.
+        file_name (str): The name of the capture file within the session directory.
+        timestamp (str): The capture time in ISO format.
+        kind (str): The type of the capture, e.g. "move", "waveform" or "continuous".
+        sources (list[str]): The data recorder sources of channel 0 and channel 1.
+        sample_period_ms (float): The sample period in milliseconds.
+        sample_count (int): The number of samples per channel.
+        duration_ms (float): The recording duration in milliseconds.
+        device_serial (str): The serial number of the actuator.
+        parameters (dict[str, Any]): Additional capture parameters, e.g. the waveform parameters.
+    """
+    capture_id: int
+    session: str
+    file_name: str
+    timestamp: str
+    kind: str
+    sources: list[str]
+    sample_period_ms: float
+    sample_count: int
+    duration_ms: float
+    device_serial: str = ""
+    parameters: dict[str, Any] = field(default_factory=dict)
+
+
+class RecordingStore:
+    """
+    Appends the captures of the data recorder to the on-disk store of the current session
+    and provides access to the captures of all sessions.
+    """
+    MAX_SIZE_KEY = "RecordingStore/max_size_mb"
+    STORE_CONTINUOUS_KEY = "RecordingStore/store_continuous"
+    DEFAULT_MAX_SIZE_MB = 2048
+
+    def __init__(self, root_path: Path | None = None):
+        self._root_path = root_path
+        self._session = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self._capture_count = 0
+        self.enabled = True
+        # A single writer thread keeps the captures and the index lines in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RecordingStore")
+        self._files : deque[tuple[Path, int]] | None = None   # capture files, oldest first
+        self._size_bytes = 0
+        self._max_size_mb : int | None = None
+        self._store_continuous : bool | None = None
+
+
+    def root_path(self) -> Path:
+        """
+        Returns the root directory of the store - the directory that contains the session directories.
+        """
+        if self._root_path is None:
+            app_data = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+            self._root_path = Path(app_data) / "recordings"
+        return self._root_path
+
+
+    @property
+    def session(self) -> str:
+        """
+        Returns the name of the current session.
+        """
+        return self._session
+
+
+    def session_path(self, session: str | None = None) -> Path:
+        """
+        Returns the directory of the given session or of the current session.
+        """
+        return self.root_path() / (session or self._session)
+
+
+    def max_size_mb(self) -> int:
+        """
+        Returns the maximum size of the store in MB - the oldest captures are deleted if a
+        new capture exceeds this size.
+        """
+        if self._max_size_mb is None:
+            with SettingsContext() as settings:
+                self._max_size_mb = settings.value(self.MAX_SIZE_KEY, self.DEFAULT_MAX_SIZE_MB, type=int)
+        return self._max_size_mb
+
+
+    def set_max_size_mb(self, max_size_mb: int):
+        """
+        Sets the maximum size of the store in MB and stores it in the application settings.
+        The limit is applied with the next capture.
+        """
+        self._max_size_mb = max(int(max_size_mb), 1)
+        with SettingsContext() as settings:
+            settings.setValue(self.MAX_SIZE_KEY, self._max_size_mb)
+
+
+    @property
+    def store_continuous(self) -> bool:
+        """
+        Returns True if the captures of the continuous acquisition mode are stored. This is
+        disabled by default.
+        """
+        if self._store_continuous is None:
+            with SettingsContext() as settings:
+                self._store_continuous = settings.value(self.STORE_CONTINUOUS_KEY, False, type=bool)
+        return self._store_continuous
+
+
+    @store_continuous.setter
+    def store_continuous(self, enabled: bool):
+        self._store_continuous = bool(enabled)
+        with SettingsContext() as settings:
+            settings.setValue(self.STORE_CONTINUOUS_KEY, self._store_continuous)
+
+
+    def append(self, rec_data0: DataRecorder.ChannelRecordingData, rec_data1: DataRecorder.ChannelRecordingData,
+               kind: str, device_serial: str = "", parameters: dict[str, Any] | None = None) -> Future | None:
+        """
+        Appends a capture of both recorder channels to the store of the current session.
+        The data is copied immediately and written to disk by the writer thread.
+
+        Args:
+            rec_data0 (DataRecorder.ChannelRecordingData): The data of recorder channel 0.
+            rec_data1 (DataRecorder.ChannelRecordingData): The data of recorder channel 1.
+            kind (str): The type of the capture, e.g. "move" or "waveform".
+            device_serial (str): The serial number of the actuator.
+            parameters (dict[str, Any] | None): Additional parameters to store in the index.
+
+        Returns:
+            Future | None: A future with the RecordingInfo of the capture, which is done when the
+            capture has been written, or None if the store is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        values0 = np.asarray(rec_data0.values, dtype=float)
+        values1 = np.asarray(rec_data1.values, dtype=float)
+        sample_count = max(len(values0), len(values1))
+        data = np.full((3, sample_count), np.nan)
+        data[0] = np.arange(sample_count) * rec_data0.sample_time_ms
+        data[1, :len(values0)] = values0
+        data[2, :len(values1)] = values1
+
+        self._capture_count += 1
+        info = RecordingInfo(
+            capture_id=self._capture_count,
+            session=self._session,
+            file_name=f"capture_{self._capture_count:05d}.npy",
+            timestamp=datetime.now().isoformat(timespec="milliseconds"),
+            kind=kind,
+            sources=[str(rec_data0.source), str(rec_data1.source)],
+            sample_period_ms=float(rec_data0.sample_time_ms),
+            sample_count=sample_count,
+            duration_ms=float(sample_count * rec_data0.sample_time_ms),
+            device_serial=device_serial,
+            parameters=dict(parameters or {}),
+        )
+        return self._executor.submit(self._write, info, data, self.max_size_mb() * 1024 * 1024)
+
+
+    def _write(self, info: RecordingInfo, data: np.ndarray, max_size_bytes: int) -> RecordingInfo:
+        """
+        Writes a capture and its index entry and deletes the oldest captures if the store
+        exceeds the maximum size. Runs in the writer thread.
+        """
+        session_path = self.session_path(info.session)
+        session_path.mkdir(parents=True, exist_ok=True)
+        path = session_path / info.file_name
+        np.save(path, data)
+
+        # The index is appended line by line, so a capture never requires rewriting the index
+        with open(session_path / INDEX_FILE_NAME, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(info)) + "\n")
+
+        files = self._capture_files()
+        files.append((path, path.stat().st_size))
+        self._size_bytes += files[-1][1]
+        self._evict(max_size_bytes)
+        return info
+
+
+    def _capture_files(self) -> deque[tuple[Path, int]]:
+        """
+        Returns the capture files of all sessions, oldest first. The store is scanned once,
+        later captures are tracked by the writer thread.
+        """
+        if self._files is None:
+            self._files = deque()
+            for session in reversed(self.sessions()):
+                for path in sorted(self.session_path(session).glob("capture_*.npy")):
+                    size = path.stat().st_size
+                    self._files.append((path, size))
+                    self._size_bytes += size
+        return self._files
+
+
+    def _evict(self, max_size_bytes: int):
+        """
+        Deletes the oldest capture files until the store does not exceed the given size. The
+        newest capture is always kept. A previous session is deleted with its last capture.
+        """
+        files = self._files
+        while self._size_bytes > max_size_bytes and len(files) > 1:
+            path, size = files.popleft()
+            self._size_bytes -= size
+            path.unlink(missing_ok=True)
+            session_path = path.parent
+            if session_path.name != self._session and files[0][0].parent != session_path:
+                shutil.rmtree(session_path, ignore_errors=True)
+
+
+    def sessions(self) -> list[str]:
+        """
+        Returns the names of all sessions in the store - the newest session first.
+        """
+        root = self.root_path()
+        if not root.is_dir():
+            return []
+        return sorted((p.name for p in root.iterdir() if (p / INDEX_FILE_NAME).is_file()), reverse=True)
+
+
+    def captures(self, session: str | None = None) -> list[RecordingInfo]:
+        """
+        Returns the metadata of all captures of the given session or of the current session.
+        Index lines that cannot be parsed (e.g. an incomplete last line) and captures that have
+        been deleted to limit the size of the store are skipped.
+        """
+        session_path = self.session_path(session)
+        index_path = session_path / INDEX_FILE_NAME
+        if not index_path.is_file():
+            return []
+
+        captures = []
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    info = RecordingInfo(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    print(f"Skipping invalid recording index entry in {index_path}: {e}")
+                    continue
+                if (session_path / info.file_name).is_file():
+                    captures.append(info)
+        return captures
+
+
+    def file_path(self, info: RecordingInfo) -> Path:
+        """
+        Returns the path of the capture file of the given capture.
+        """
+        return self.session_path(info.session) / info.file_name
+
+
+    def load(self, info: RecordingInfo) -> np.ndarray:
+        """
+        Maps the capture file of the given capture into memory.
+
+        Returns:
+            np.ndarray: A read-only memory mapped array of shape (3, n) with the rows
+            time (ms), channel 0 and channel 1.
+        """
+        return np.load(self.file_path(info), mmap_mode="r")
+
+
+# Global store for the captures of the current application session
+recording_store = RecordingStore()
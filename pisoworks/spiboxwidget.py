@@ -21,6 +21,9 @@ from nv200.connection_utils import connect_to_detected_device
 from pisoworks.style_manager import style_manager
 from pisoworks.ui_helpers import get_icon, get_icon_for_menu, set_combobox_index_by_value, safe_asyncslot
 from nv200.waveform_generator import WaveformGenerator, WaveformType, WaveformUnit
+from pisoworks.waveform_upload_cache import waveform_upload_cache, waveform_hash, device_cache_key
+from pisoworks.waveform_memo import waveform_memo
+from pisoworks.progress_bus import ProgressBus
 
 # Important:
 # You need to run the following command to generate the ui_form.py file
@@ -52,6 +55,7 @@ class SpiBoxWidget(QWidget):
 
         ui = self.ui
         ui.setupUi(self)
+        self.progress_bus = ProgressBus(ui.moveProgressBar, self.status_message.emit, parent=self)
         self.init_device_search_ui()
         self.reset_ui(False)
 
@@ -88,6 +92,7 @@ class SpiBoxWidget(QWidget):
 
         # Initialize waveform plot
         self.ui.waveformPlot.show_export_action()
+        self.ui.waveformPlot.show_backend_action("spibox_waveform")
 
         # Do not show dirty tracking for the waveform option widgets
         self.ui.waveformOptions1.set_show_dirty_indicators(False)
@@ -253,25 +258,6 @@ class SpiBoxWidget(QWidget):
         ui.deviceSearchWidget.set_on_disconnect_callback(self.handle_disconnect_device)
 
     
-    async def disconnect_from_device(self, update_ui = True):
-        """
-        Asynchronously disconnects from the currently connected device.
-        """
-        if self._device is None:
-            print("No device connected.")
-            return
-
-        await self._device.close()
-        self._device = None     
-          
-        if update_ui:
-            self.reset_ui(False)
-
-        # Cancel any ongoing waveform task
-        if self._waveform_task is not None:
-            self._waveform_task.cancel()
-    
-
     def reset_ui(self, connected):
         """
         Resets the UI elements to their initial state.
@@ -529,31 +515,51 @@ class SpiBoxWidget(QWidget):
 
             # Configure waveform
             actual_cycles = self.ui.cyclesSpinBox.value() if not self.ui.infiniteCyclesCheckBox.isChecked() else 0
-            await self._device.set_waveform_cycles(actual_cycles, actual_cycles, actual_cycles)
-            
-            await self._device.set_waveform_sample_factors(
-                waveforms[0].sample_factor if waveforms[0] is not None else 1,
-                waveforms[1].sample_factor if waveforms[1] is not None else 1,
-                waveforms[2].sample_factor if waveforms[2] is not None else 1
-            )
 
-            if self.any_waveform_changed():
-                await self._device.upload_waveform_samples(
-                    ch1 = waveforms[0].values if waveforms[0] is not None else None,
-                    ch2 = waveforms[1].values if waveforms[1] is not None else None,
-                    ch3 = waveforms[2].values if waveforms[2] is not None else None,
-                    on_progress = lambda current, total: self.on_waveform_progress(current, total, True)
-                )
+            # The device is shared with other views - configuring, uploading and starting the
+            # waveforms runs as one session operation without their commands in between
+            async def configure_and_start(dev: SpiBoxDevice):
+                await dev.set_waveform_cycles(actual_cycles, actual_cycles, actual_cycles)
 
-                self.ui.waveformOptions1.clear_dirty()
-                self.ui.waveformOptions2.clear_dirty()
-                self.ui.waveformOptions3.clear_dirty()
+                await dev.set_waveform_sample_factors(
+                    waveforms[0].sample_factor if waveforms[0] is not None else 1,
+                    waveforms[1].sample_factor if waveforms[1] is not None else 1,
+                    waveforms[2].sample_factor if waveforms[2] is not None else 1
+                )
 
+                # The upload writes all three channels, so it is skipped only if the device
+                # already holds the waveforms of all channels
+                cache_key = device_cache_key(dev)
+                digests = [waveform_hash(w.values if w is not None else None) for w in waveforms]
+                if all(waveform_upload_cache.is_uploaded(cache_key, channel, digest) for channel, digest in enumerate(digests)):
+                    print("Waveforms are already uploaded to the device - upload skipped.")
+                else:
+                    # An interrupted upload leaves the device buffers in an unknown state
+                    waveform_upload_cache.invalidate(cache_key)
+                    await dev.upload_waveform_samples(
+                        ch1 = waveforms[0].values if waveforms[0] is not None else None,
+                        ch2 = waveforms[1].values if waveforms[1] is not None else None,
+                        ch3 = waveforms[2].values if waveforms[2] is not None else None,
+                        on_progress = lambda current, total: self.on_waveform_progress(current, total, True)
+                    )
+                    for channel, digest in enumerate(digests):
+                        waveform_upload_cache.store(cache_key, channel, digest)
+
+                # Start waveform
+                await dev.start_waveforms()
+
+            session = self.ui.deviceSearchWidget.session
+            if session is None:
+                raise RuntimeError("Device not connected.")
+            await session.execute(configure_and_start)
+
+            self.ui.waveformOptions1.clear_dirty()
+            self.ui.waveformOptions2.clear_dirty()
+            self.ui.waveformOptions3.clear_dirty()
+
+            self.progress_bus.finish()
             self.ui.moveProgressBar.reset()
 
-            # Start waveform
-            await self._device.start_waveforms()
-
             # Handle single vs infinite cycles
             if not infinite:
                 self.status_message.emit(f" Waiting for waveform completion...", 0)
@@ -567,6 +573,7 @@ class SpiBoxWidget(QWidget):
             self.set_waveform_ui_state(SpiBoxDevice.WaveformState.STOPPED)
         
         finally:
+            self.progress_bus.cancel()
             self.setCursor(Qt.CursorShape.ArrowCursor)
 
 
@@ -601,16 +608,19 @@ class SpiBoxWidget(QWidget):
                 max_samples = 1000,
                 on_progress = lambda current, total: self.on_waveform_progress(current, total, False)
             )
+            self.progress_bus.finish()
             self.waveform_response = rxdata
 
             self.plot_all_waveforms()
             self.status_message.emit(f" Done", 2000)
 
         except Exception as e:
+            self.progress_bus.cancel()
             self.status_message.emit(f" Error fetching waveform response: {e}", 4000)
             return
 
         # Update UI state
+        self.progress_bus.cancel()
         self.ui.moveProgressBar.reset()
         self.ui.startWaveformButton.setEnabled(True)
         self.ui.getResponseButton.setEnabled(True)
@@ -619,17 +629,10 @@ class SpiBoxWidget(QWidget):
     def on_waveform_progress(self, current_sample, total_samples, is_upload):
         """
         Handles progress updates during waveform upload or response fetching.
-        Updates the status message and progress bar based on the current sample being processed.
+        The progress is passed to the progress bus, which updates the status message and
+        the progress bar at a limited rate.
         """
-        percentage = (current_sample / total_samples) * 100
-
-        if current_sample % 10 != 0 and current_sample != total_samples:
-            return  # Update only on every 10 increment for performance
-
-        operation = "Uploading" if is_upload else "Fetching"
-        self.ui.moveProgressBar.setMaximum(total_samples)
-        self.ui.moveProgressBar.setValue(current_sample)
-        self.status_message.emit(f" {operation} waveform - sample {current_sample} of {total_samples} [{percentage:.1f}%]", 0)
+        self.progress_bus.report(current_sample, total_samples, "Uploading waveform" if is_upload else "Fetching waveform")
 
 
     def clear_waveform_plot(self):
@@ -743,7 +746,7 @@ class SpiBoxWidget(QWidget):
             )
             return self._custom_waveform
         
-        waveform = WaveformGenerator.generate_waveform(
+        waveform = waveform_memo.generate(
             waveform_type       = option.get_waveform_type(),
             low_level           = option.get_low_level(),
             high_level          = option.get_high_level(),
@@ -0,0 +1,149 @@
+"""
+Delta upload of NV200 waveform buffers.
+
+The NV200 waveform buffer is written sample by sample (gbarb,<index>,<percent>), so a full
+upload of 1024 samples takes several seconds. Editing a waveform often changes only a part
+of the buffer - e.g. a different phase or duty cycle changes only some regions of the
+buffer. The delta upload compares the new buffer with a mirror of the device buffer (see
+WaveformBufferMirror) and writes only the samples that differ. The output sampling time and
+the loop indices are written only if they have changed.
+"""
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from nv200.nv200_device import NV200Device
+from nv200.waveform_generator import WaveformGenerator, WaveformUnit
+from pisoworks.waveform_upload_cache import WaveformBufferMirror, waveform_upload_cache
+
+
+def changed_ranges(indices: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Groups sorted sample indices into contiguous ranges.
+
+    Returns:
+        list[tuple[int, int]]: The first and the last index (inclusive) of each range.
+    """
+    if len(indices) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) > 1)
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+async def waveform_to_percent(device: NV200Device, values, unit: WaveformUnit) -> np.ndarray:
+    """
+    Scales the waveform values to percent of the position or voltage range of the device -
+    the same scaling that WaveformGenerator.set_waveform_buffer applies.
+
+    Raises:
+        ValueError: If a value is outside the range of the device.
+    """
+    values = np.asarray(values, dtype=float)
+    value_range = None
+    if unit == WaveformUnit.POSITION:
+        value_range = await device.get_position_range()
+    elif unit == WaveformUnit.VOLTAGE:
+        value_range = await device.get_voltage_range()
+
+    if value_range is not None:
+        values = 100 * (values - value_range[0]) / (value_range[1] - value_range[0])
+    if np.any((values < 0) | (values > 100)):
+        raise ValueError("Waveform values must be within the range of the device")
+    return values
+
+
+async def upload_waveform_delta(
+    device: NV200Device,
+    waveform: WaveformGenerator.WaveformData,
+    mirror: WaveformBufferMirror,
+    unit: WaveformUnit = WaveformUnit.PERCENT,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> int:
+    """
+    Uploads the given waveform to the device and writes only the samples that differ from
+    the mirror of the device buffer. The mirror is updated sample by sample, so it stays
+    valid if the upload is interrupted. The loop is configured like WaveformGenerator.set_waveform
+    with adjust_loop=True does (start index 0, loop from 0 to the last sample).
+
+    Args:
+        device (NV200Device): The device to upload the waveform to.
+        waveform (WaveformGenerator.WaveformData): The waveform to upload.
+        mirror (WaveformBufferMirror): The mirror of the device buffer - see WaveformUploadCache.mirror.
+        unit (WaveformUnit): The unit of the waveform values.
+        on_progress (Optional[Callable[[int, int], Awaitable[None]]]): Called after each written
+            sample with the number of written samples and the number of samples to write.
+
+    Returns:
+        int: The number of samples that have been written.
+
+    Raises:
+        ValueError: If the waveform does not fit into the buffer or a value is out of range.
+    """
+    if len(waveform.values) > len(mirror.values):
+        raise ValueError(f"Buffer too large: max size is {len(mirror.values)}, got {len(waveform.values)}")
+
+    wg = WaveformGenerator(device)
+    percent = await waveform_to_percent(device, waveform.values, unit)
+    # NaN marks unknown mirror values, which never compare equal
+    changed = np.flatnonzero(mirror.values[:len(percent)] != percent)
+    ranges = changed_ranges(changed)
+    print(f"Waveform delta upload: {len(changed)} of {len(percent)} samples in {len(ranges)} ranges")
+
+    total = len(changed)
+    for count, index in enumerate(changed.tolist(), start=1):
+        # Mark the sample as unknown while it is written - a failed write leaves it unknown
+        mirror.values[index] = np.nan
+        await wg.set_waveform_value_percent(index, float(percent[index]))
+        mirror.values[index] = percent[index]
+        if on_progress:
+            await on_progress(count, total)
+
+    sample_time_us = int(waveform.sample_time_ms * 1000)
+    if mirror.sample_time_us != sample_time_us:
+        mirror.sample_time_us = None
+        await wg.set_output_sampling_time(sample_time_us)
+        mirror.sample_time_us = sample_time_us
+
+    loop_end_index = len(percent) - 1
+    if mirror.loop_end_index != loop_end_index:
+        mirror.loop_end_index = None
+        await wg.configure_waveform_loop(start_index=0, loop_start_index=0, loop_end_index=loop_end_index)
+        mirror.loop_end_index = loop_end_index
+    return total
+
+
+async def upload_waveform_cached(
+    device: NV200Device,
+    waveform: WaveformGenerator.WaveformData,
+    cache_key: str,
+    digest: str,
+    unit: WaveformUnit = WaveformUnit.PERCENT,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> int | None:
+    """
+    Uploads the given waveform with upload_waveform_delta, unless the waveform upload cache
+    shows that the device already holds the waveform with the given hash.
+
+    Args:
+        device (NV200Device): The device to upload the waveform to.
+        waveform (WaveformGenerator.WaveformData): The waveform to upload.
+        cache_key (str): The key of the device in the waveform upload cache.
+        digest (str): The hash of the waveform and its upload parameters.
+        unit (WaveformUnit): The unit of the waveform values.
+        on_progress (Optional[Callable[[int, int], Awaitable[None]]]): See upload_waveform_delta.
+
+    Returns:
+        int | None: The number of samples that have been written or None if the upload has been skipped.
+    """
+    if waveform_upload_cache.is_uploaded(cache_key, 0, digest):
+        return None
+
+    # An interrupted upload leaves the device buffer in an unknown state - the
+    # buffer mirror is kept, because the delta upload updates it per sample
+    waveform_upload_cache.invalidate(cache_key, 0, keep_mirror=True)
+    mirror = waveform_upload_cache.mirror(cache_key, 0, WaveformGenerator.NV200_WAVEFORM_BUFFER_SIZE)
+    sent = await upload_waveform_delta(device, waveform, mirror, unit=unit, on_progress=on_progress)
+    waveform_upload_cache.store(cache_key, 0, digest)
+    return sent
@@ -0,0 +1,264 @@
+"""
+Import of custom waveform files.
+
+Custom waveforms are given as a single column of percentage values (0 - 100). The importer
+is shared by the NV200 and the SpiBox views and supports the following formats:
+
+    .csv, .txt          - one value per line with an optional header line, read line by line
+    .xls, .xlsx         - a single column Excel sheet (read with pandas)
+    .npy                - a one dimensional NumPy array
+    .wav                - the first channel of a PCM or float WAV file - the full scale range
+                          of the samples (-1 to 1) is mapped to 0 - 100 %
+    .bin, .raw, .f64    - raw little endian float64 values
+    .f32                - raw little endian float32 values
+
+Data with more values than the waveform buffer can hold can be truncated or resampled to
+exactly the buffer length. Resampling uses polyphase filtering (scipy.signal.resample_poly),
+so the data is low pass filtered before it is decimated and does not alias.
+
+Parsed files are cached by path, modification time and size, so importing the same file
+again does not read it again.
+"""
+import struct
+import zipfile
+from collections import OrderedDict
+from math import gcd
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+from PySide6.QtWidgets import QMessageBox, QWidget
+
+
+FILE_DIALOG_FILTER = ("Waveform Files (*.csv *.txt *.xlsx *.xls *.npy *.wav *.bin *.raw *.f32 *.f64);;"
+                      "CSV Files (*.csv *.txt);;Excel Files (*.xlsx *.xls);;NumPy Files (*.npy);;"
+                      "WAV Files (*.wav);;Raw Binary Files (*.bin *.raw *.f32 *.f64)")
+FILE_DIALOG_DEFAULT_FILTER = "Waveform Files (*.csv *.txt *.xlsx *.xls *.npy *.wav *.bin *.raw *.f32 *.f64)"
+
+RAW_DTYPES = {
+    ".bin": "<f8",
+    ".raw": "<f8",
+    ".f64": "<f8",
+    ".f32": "<f4",
+}
+
+
+def resample_to_length(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Resamples the given values to exactly length values with anti-aliased polyphase filtering.
+    The data is treated as one period of a repeating waveform, so the filter wraps around
+    at the start and the end. Filter ringing (e.g. at the edges of a square wave) is clipped
+    to the percentage range.
+
+    Large inputs are first decimated by an integer factor, because the filter of a
+    rational resampling ratio with a large denominator (e.g. a prime number of samples)
+    gets very long.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == length or n == 0:
+        return values.copy()
+
+    factor = n // (4 * length)
+    if factor > 1:
+        values = resample_poly(values, 1, factor, padtype="wrap")
+        n = len(values)
+    divisor = gcd(length, n)
+    values = resample_poly(values, length // divisor, n // divisor, padtype="wrap")
+    return np.clip(values, 0.0, 100.0)
+
+
+class WaveformImporter:
+    """
+    Reads custom waveform files and caches the parsed values.
+    """
+    def __init__(self, max_cache_size: int = 8):
+        self.max_cache_size = max_cache_size
+        self._cache : OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+
+    def load(self, file_path: str | Path) -> np.ndarray:
+        """
+        Reads the percentage values from the given file. The returned array is read-only,
+        because it is shared with the cache.
+
+        Raises:
+            ValueError: For invalid data, unsupported file types or truncated and unreadable files.
+        """
+        path = Path(file_path)
+        try:
+            stat = path.stat()
+        except OSError as e:
+            raise ValueError(f"Cannot read waveform file: {e}") from e
+        key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        values = self._cache.get(key)
+        if values is not None:
+            self._cache.move_to_end(key)
+            return values
+
+        try:
+            values = self._read(path)
+        except (OSError, EOFError, struct.error, zipfile.BadZipFile) as e:
+            # Truncated or unreadable files - e.g. a truncated WAV file raises struct.error
+            raise ValueError(f"Cannot read waveform file: {e}") from e
+        # Applies to all formats - e.g. an empty .npy array or a zero length raw file
+        if len(values) == 0:
+            raise ValueError("The file does not contain any values.")
+        if np.isnan(values).any():
+            raise ValueError("Column contains non-numeric or invalid values.")
+        if not ((values >= 0) & (values <= 100)).all():
+            raise ValueError("Waveform values are given in percent and must be in the range 0 to 100 inclusive.")
+
+        values.flags.writeable = False
+        self._cache[key] = values
+        if len(self._cache) > self.max_cache_size:
+            self._cache.popitem(last=False)
+        return values
+
+
+    def _read(self, path: Path) -> np.ndarray:
+        """
+        Reads the values of the given file according to its file extension.
+        """
+        suffix = path.suffix.lower()
+        if suffix in (".csv", ".txt"):
+            return self._read_csv(path)
+        elif suffix in (".xls", ".xlsx"):
+            return self._read_excel(path)
+        elif suffix == ".npy":
+            values = np.load(path, allow_pickle=False)
+            if values.ndim != 1:
+                raise ValueError(f"Expected a one dimensional array, found shape {values.shape}.")
+            return np.asarray(values, dtype=float)
+        elif suffix == ".wav":
+            return self._read_wav(path)
+        elif suffix in RAW_DTYPES:
+            return np.fromfile(path, dtype=RAW_DTYPES[suffix]).astype(float)
+        else:
+            raise ValueError("Unsupported file type. Provide a .csv, Excel, .npy, .wav or raw binary file.")
+
+
+    @staticmethod
+    def _read_csv(path: Path, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Reads a single column CSV file line by line in chunks - the file is never loaded
+        as a whole. A first line that is not a number is treated as a header.
+        """
+        chunks = []
+        lines = []
+        first_line = True
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                if first_line:
+                    first_line = False
+                    columns = max(len(line.split(separator)) for separator in ",;\t")
+                    if columns != 1:
+                        raise ValueError(f"Expected exactly one column, found {columns} columns.")
+                    try:
+                        float(line)
+                    except ValueError:
+                        continue  # header line
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    chunks.append(WaveformImporter._parse_lines(lines))
+                    lines = []
+        if lines:
+            chunks.append(WaveformImporter._parse_lines(lines))
+        if not chunks:
+            raise ValueError("The file does not contain any values.")
+        return np.concatenate(chunks)
+
+
+    @staticmethod
+    def _parse_lines(lines: list[str]) -> np.ndarray:
+        try:
+            return np.array(lines, dtype=float)
+        except ValueError:
+            raise ValueError("Column contains non-numeric or invalid values.")
+
+
+    @staticmethod
+    def _read_excel(path: Path) -> np.ndarray:
+        """
+        Reads a single column Excel sheet. pandas is only imported if an Excel file is read.
+        """
+        import pandas as pd
+        df = pd.read_excel(path)
+        if df.shape[1] != 1:
+            raise ValueError(f"Expected exactly one column, found {df.shape[1]} columns.")
+        return pd.to_numeric(df.iloc[:, 0], errors='coerce').to_numpy(dtype=float)
+
+
+    @staticmethod
+    def _read_wav(path: Path) -> np.ndarray:
+        """
+        Reads the first channel of a WAV file and maps the full scale range to 0 - 100 %.
+        """
+        _, data = wavfile.read(path, mmap=True)
+        if data.ndim > 1:
+            data = data[:, 0]
+        if np.issubdtype(data.dtype, np.floating):
+            normalized = np.asarray(data, dtype=float)
+        elif data.dtype == np.uint8:
+            normalized = (data.astype(float) - 128.0) / 128.0
+        else:
+            normalized = data.astype(float) / -float(np.iinfo(data.dtype).min)
+        return (np.clip(normalized, -1.0, 1.0) + 1.0) * 50.0
+
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+def read_waveform_file(parent: QWidget, file_path: str, max_values: int = 1024) -> list[float]:
+    """
+    Reads the percentage values of a custom waveform file.
+
+    If the number of values exceeds max_values, asks the user whether to truncate
+    the data or to resample it to exactly max_values values.
+
+    Args:
+        parent (QWidget): Parent widget for dialogs.
+        file_path (str): Path of the waveform file.
+        max_values (int): Maximum allowed number of values (default 1024).
+
+    Returns:
+        List[float]: List of percentage values as floats.
+
+    Raises:
+        ValueError: For invalid data, unsupported file types or if the user cancels the import.
+    """
+    values = waveform_importer.load(file_path)
+
+    # Check length limit
+    if len(values) > max_values:
+        # Ask user what to do
+        msg = QMessageBox(parent)
+        msg.setWindowTitle("Too many values")
+        msg.setText(f"The data has {len(values)} values, which exceeds the limit of {max_values}.")
+        msg.setInformativeText("Do you want to truncate the data or resample it?")
+        truncate_button = msg.addButton("Truncate", QMessageBox.ButtonRole.AcceptRole)
+        resample_button = msg.addButton("Resample", QMessageBox.ButtonRole.AcceptRole)
+        cancel_button = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
+        msg.setDefaultButton(truncate_button)
+        msg.exec()
+
+        clicked = msg.clickedButton()
+
+        if clicked == cancel_button:
+            raise ValueError("User cancelled operation due to too many values.")
+        elif clicked == truncate_button:
+            values = values[:max_values]
+        elif clicked == resample_button:
+            values = resample_to_length(values, max_values)
+
+    return values.tolist()
+
+
+# Global importer shared by the NV200 and the SpiBox views
+waveform_importer = WaveformImporter()
@@ -0,0 +1,75 @@
+"""
+Memo of generated waveforms.
+
+The waveform preview is regenerated whenever one of the waveform parameters changes - e.g.
+on every wheel tick of a spin box. The memo keeps the most recently generated waveforms, so
+going back to a previous parameter set (or plotting the same waveform on several SpiBox
+channels) does not generate the waveform again.
+"""
+from collections import OrderedDict
+
+from nv200.waveform_generator import WaveformGenerator, WaveformType
+
+
+class WaveformMemo:
+    """
+    LRU memo of the waveforms generated by WaveformGenerator.generate_waveform, keyed by
+    (type, low level, high level, frequency, phase shift, duty cycle).
+
+    The memoized WaveformData objects are shared by all callers and must not be modified.
+    """
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._waveforms : OrderedDict[tuple, WaveformGenerator.WaveformData] = OrderedDict()
+
+
+    def generate(
+        self,
+        waveform_type: WaveformType,
+        low_level: float,
+        high_level: float,
+        freq_hz: float,
+        phase_shift_rad: float = 0.0,
+        duty_cycle: float = 0.5,
+    ) -> WaveformGenerator.WaveformData:
+        """
+        Returns the waveform for the given parameters - from the memo if it has been generated before,
+        otherwise it is generated with WaveformGenerator.generate_waveform and added to the memo.
+        """
+        key = (waveform_type, low_level, high_level, freq_hz, phase_shift_rad, duty_cycle)
+        waveform = self._waveforms.get(key)
+        if waveform is not None:
+            self.hits += 1
+            self._waveforms.move_to_end(key)
+            return waveform
+
+        self.misses += 1
+        waveform = WaveformGenerator.generate_waveform(
+            waveform_type=waveform_type,
+            low_level=low_level,
+            high_level=high_level,
+            freq_hz=freq_hz,
+            phase_shift_rad=phase_shift_rad,
+            duty_cycle=duty_cycle
+        )
+        self._waveforms[key] = waveform
+        if len(self._waveforms) > self.max_size:
+            self._waveforms.popitem(last=False)
+        return waveform
+
+
+    def clear(self):
+        """
+        Removes all waveforms from the memo.
+        """
+        self._waveforms.clear()
+
+
+    def __len__(self) -> int:
+        return len(self._waveforms)
+
+
+# Global memo shared by the NV200 and the SpiBox views
+waveform_memo = WaveformMemo()
@@ -1,5 +1,3 @@
-import pandas as pd
-
 from PySide6.QtWidgets import QWidget, QComboBox, QCheckBox, QDoubleSpinBox, QFileDialog, QMessageBox
 from PySide6.QtGui import QAction, QPalette
 from PySide6.QtCore import Signal, QStandardPaths
@@ -11,6 +9,7 @@ from pisoworks.ui_waveform_options_widget import Ui_WaveformOptionsWidget
 from pisoworks.ui_helpers import get_icon, set_combobox_index_by_value, repolish
 from pisoworks.style_manager import style_manager
 from pisoworks.input_widget_change_tracker import InputWidgetChangeTracker
+from pisoworks.waveform_importer import read_waveform_file, FILE_DIALOG_FILTER, FILE_DIALOG_DEFAULT_FILTER
 
 
 class WaveformOptionsWidget(QWidget):
@@ -151,95 +150,21 @@ class WaveformOptionsWidget(QWidget):
             self,
             "Import Waveform File",
             home_dir,
-            "CSV and Excel Files (*.csv *.xlsx);;CSV Files (*.csv);;Excel Files (*.xlsx)",
-            "CSV and Excel Files (*.csv *.xlsx)"  # default filter
+            FILE_DIALOG_FILTER,
+            FILE_DIALOG_DEFAULT_FILTER
         )
         
         if file_path is None or file_path == "":
             return  # User cancelled the dialog
         
         try:
-            values = self._parse_custom_waveform(file_path)
+            values = read_waveform_file(self, file_path)
             return values
         except ValueError as e:
             QMessageBox.critical(self, "Import Error", str(e))
             return None
 
 
-    def _parse_custom_waveform(self, file_path: str, max_values: int = 1024) -> list[float]:
-        """
-        Reads a single-column CSV or Excel file containing percentage values (0-100).
-
-        If the number of values exceeds max_values, asks the user whether to truncate
-        or resample the data to fit the max_values limit.
-
-        Args:
-            parent (QWidget): Parent widget for dialogs.
-            file_path (str): Path to CSV or Excel file.
-            max_values (int): Maximum allowed number of values (default 1024).
-
-        Returns:
-            List[float]: List of percentage values as floats.
-
-        Raises:
-            ValueError: For invalid data or unsupported file types.
-        """
-        # Load data
-        if file_path.lower().endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.lower().endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
-        else:
-            raise ValueError("Unsupported file type. Provide a .csv or Excel (.xls/.xlsx) file.")
-
-        if df.shape[1] != 1:
-            raise ValueError(f"Expected exactly one column, found {df.shape[1]} columns.")
-
-        # Validate and extract values
-        col = df.iloc[:, 0]
-        col_numeric = pd.to_numeric(col, errors='coerce')
-
-        if col_numeric.isnull().any():
-            raise ValueError("Column contains non-numeric or invalid values.")
-
-        if not ((col_numeric >= 0) & (col_numeric <= 100)).all():
-            raise ValueError("Waveform values are given in percent and must be in the range 0 to 100 inclusive.")
-
-        values = col_numeric.tolist()
-
-        # Check length limit
-        if len(values) > max_values:
-            # Ask user what to do
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Too many values")
-            msg.setText(f"The data has {len(values)} values, which exceeds the limit of {max_values}.")
-            msg.setInformativeText("Do you want to truncate the data or resample it?")
-            truncate_button = msg.addButton("Truncate", QMessageBox.ButtonRole.AcceptRole)
-            resample_button = msg.addButton("Resample", QMessageBox.ButtonRole.AcceptRole)
-            cancel_button = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
-            msg.setDefaultButton(truncate_button)
-            msg.exec()
-
-            clicked = msg.clickedButton()
-
-            if clicked == cancel_button:
-                raise ValueError("User cancelled operation due to too many values.")
-
-            elif clicked == truncate_button:
-                # Truncate list
-                values = values[:max_values]
-
-            elif clicked == resample_button:
-                # Resample by skipping values to reduce to max_values
-                factor = (len(values) + max_values - 1) // max_values  # ceiling division
-                values = values[::factor]
-
-                # Ensure result not longer than max_values (edge case)
-                values = values[:max_values]
-
-        return values
-
-    
     def get_waveform_type(self):
         """
         Returns the currently selected waveform type.
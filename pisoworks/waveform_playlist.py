@@ -0,0 +1,236 @@
+"""
+Playlist of NV200 waveform runs.
+
+A playlist is a sequence of generated waveforms with different parameters (type, levels,
+frequency, phase, duty cycle and number of cycles) that are run one after another, each
+with its own recording. The runner keeps the idle time between the items short:
+
+- The waveform of the next item is generated and hashed while the current item runs, so
+  only the (delta) upload is left between two runs.
+- Uploads of waveforms that the device already holds are skipped (waveform upload cache),
+  and the delta upload writes only the samples that differ from the device buffer.
+- The end of a run is detected by short polls after the known run duration instead of
+  the 100 ms polls of the waveform generator and the data recorder.
+
+The runner measures the total sequence time and the active run time, i.e. the time the
+waveform generator is running.
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from nv200.nv200_device import NV200Device
+from nv200.data_recorder import DataRecorder
+from nv200.waveform_generator import WaveformGenerator, WaveformType, WaveformUnit
+from pisoworks.waveform_memo import waveform_memo
+from pisoworks.waveform_upload_cache import waveform_hash
+from pisoworks.waveform_delta_upload import upload_waveform_cached
+
+
+@dataclass
+class PlaylistItem:
+    """
+    The parameters of a single waveform run of a playlist.
+    """
+    waveform_type: WaveformType
+    low_level: float
+    high_level: float
+    freq_hz: float
+    phase_deg: float = 0.0
+    duty_percent: float = 50.0
+    cycles: int = 1
+
+    def generate(self) -> WaveformGenerator.WaveformData:
+        """
+        Returns the waveform of this item from the shared waveform memo.
+        """
+        return waveform_memo.generate(
+            waveform_type=self.waveform_type,
+            low_level=self.low_level,
+            high_level=self.high_level,
+            freq_hz=self.freq_hz,
+            phase_shift_rad=math.radians(self.phase_deg),
+            duty_cycle=self.duty_percent / 100.0
+        )
+
+    @property
+    def duration_ms(self) -> float:
+        """
+        Returns the run duration of the waveform generator in milliseconds.
+        """
+        return 1000 * self.cycles / self.freq_hz if self.freq_hz > 0 else 0.0
+
+    def parameters(self) -> Dict[str, Any]:
+        """
+        Returns the parameters of this item for the metadata of stored recordings.
+        """
+        return {
+            "waveform": self.waveform_type.name,
+            "low": self.low_level,
+            "high": self.high_level,
+            "freq_hz": self.freq_hz,
+            "phase_deg": self.phase_deg,
+            "duty_percent": self.duty_percent,
+            "cycles": self.cycles,
+        }
+
+    def __str__(self) -> str:
+        return (f"{self.waveform_type.name.title()} {self.freq_hz:g} Hz, {self.low_level:g} - {self.high_level:g}, "
+                f"{self.phase_deg:g}°, {self.cycles} cycles")
+
+
+@dataclass
+class PlaylistTiming:
+    """
+    The timing statistics of a playlist run.
+
+    Attributes:
+        items (int): The number of items that have been run.
+        total_s (float): The time from the start of the first upload to the end of the last item.
+        active_s (float): The sum of the run durations of the waveform generator.
+        upload_s (float): The time spent uploading waveforms.
+        uploads_skipped (int): The number of items whose waveform was already on the device.
+    """
+    items: int = 0
+    total_s: float = 0.0
+    active_s: float = 0.0
+    upload_s: float = 0.0
+    uploads_skipped: int = 0
+
+    @property
+    def idle_s(self) -> float:
+        """
+        Returns the time in which the waveform generator was not running.
+        """
+        return max(0.0, self.total_s - self.active_s)
+
+    @property
+    def duty_cycle(self) -> float:
+        """
+        Returns the fraction of the total time in which the waveform generator was running.
+        """
+        return self.active_s / self.total_s if self.total_s > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.items} items in {self.total_s:.2f} s - active {self.active_s:.2f} s ({self.duty_cycle:.0%}), "
+                f"idle {self.idle_s:.2f} s, upload {self.upload_s:.2f} s, {self.uploads_skipped} uploads skipped")
+
+
+@dataclass
+class PreparedItem:
+    """
+    A playlist item with its generated waveform and the hash used by the waveform upload cache.
+    """
+    item: PlaylistItem
+    waveform: WaveformGenerator.WaveformData
+    digest: str
+
+
+class WaveformPlaylistRunner:
+    """
+    Runs the items of a playlist back to back on an NV200 device.
+
+    Arming the data recorder and starting the waveform generator is delegated to the
+    start_run callback, so the runner uses the recorder configuration of the UI.
+    """
+    POLL_INTERVAL_S = 0.005
+
+    def __init__(
+        self,
+        device: NV200Device,
+        cache_key: str,
+        unit: WaveformUnit,
+        start_run: Callable[[PlaylistItem], Awaitable[Tuple[DataRecorder, float]]],
+    ):
+        """
+        Args:
+            device (NV200Device): The device to run the playlist on.
+            cache_key (str): The key of the device in the waveform upload cache.
+            unit (WaveformUnit): The unit of the waveform values.
+            start_run (Callable[[PlaylistItem], Awaitable[Tuple[DataRecorder, float]]]): Arms the data
+                recorder and starts the waveform generator for the given item - returns the armed
+                recorder and the recording duration in milliseconds.
+        """
+        self._dev = device
+        self._wg = WaveformGenerator(device)
+        self.cache_key = cache_key
+        self.unit = unit
+        self.start_run = start_run
+
+
+    def prepare(self, item: PlaylistItem) -> PreparedItem:
+        """
+        Generates the waveform of the given item and calculates its upload hash.
+        """
+        waveform = item.generate()
+        return PreparedItem(item, waveform, waveform_hash(waveform.values, waveform.sample_time_ms, self.unit.name))
+
+
+    async def _wait_until(self, is_active: Callable[[], Awaitable[bool]], start_time: float, duration_ms: float):
+        """
+        Sleeps until the known end of a run and then polls is_active in short intervals.
+        """
+        remaining = start_time + duration_ms / 1000 - time.perf_counter()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+        async def poll():
+            while await is_active():
+                await asyncio.sleep(self.POLL_INTERVAL_S)
+        await asyncio.wait_for(poll(), 10.0)
+
+
+    async def run(
+        self,
+        items: list[PlaylistItem],
+        on_recorded: Callable[[int, PlaylistItem, DataRecorder.ChannelRecordingData, DataRecorder.ChannelRecordingData], None],
+        should_stop: Callable[[], bool] = lambda: False,
+        on_item_started: Callable[[int, PlaylistItem], None] = lambda index, item: None,
+    ) -> PlaylistTiming:
+        """
+        Runs the given items one after another.
+
+        Args:
+            items (list[PlaylistItem]): The items to run.
+            on_recorded (Callable): Called with the item index, the item and the recorded data of both
+                channels after each item.
+            should_stop (Callable[[], bool]): Polled before each item - the playlist stops if it returns True.
+            on_item_started (Callable[[int, PlaylistItem], None]): Called when an item is uploaded and started.
+
+        Returns:
+            PlaylistTiming: The timing statistics of the run.
+        """
+        timing = PlaylistTiming()
+        sequence_start = time.perf_counter()
+        prepared = self.prepare(items[0]) if items else None
+        for index, item in enumerate(items):
+            if should_stop():
+                break
+            current = prepared
+            on_item_started(index, item)
+
+            upload_start = time.perf_counter()
+            sent = await upload_waveform_cached(self._dev, current.waveform, self.cache_key, current.digest, unit=self.unit)
+            timing.upload_s += time.perf_counter() - upload_start
+            if sent is None:
+                timing.uploads_skipped += 1
+
+            recorder, recording_duration_ms = await self.start_run(item)
+            run_start = time.perf_counter()
+
+            # Prepare the next item while the waveform generator runs
+            prepared = self.prepare(items[index + 1]) if index + 1 < len(items) else None
+
+            await self._wait_until(recorder.is_recording, run_start, recording_duration_ms)
+            rec_data0, rec_data1 = await asyncio.gather(
+                recorder.read_recorded_data_of_channel(0),
+                recorder.read_recorded_data_of_channel(1))
+            await self._wait_until(self._wg.is_running, run_start, item.duration_ms)
+            timing.active_s += item.duration_ms / 1000
+            timing.items += 1
+            on_recorded(index, item, rec_data0, rec_data1)
+
+        timing.total_s = time.perf_counter() - sequence_start
+        return timing
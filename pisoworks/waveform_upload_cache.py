@@ -0,0 +1,199 @@
+"""
+Cache of the waveform buffers that have been uploaded to the devices.
+
+Uploading a waveform writes the buffer sample by sample, which takes several seconds. The
+cache records a content hash of the buffer that was last uploaded to each channel of a
+device, so that an upload can be skipped if the device already holds the same waveform -
+e.g. after switching from waveform A to B and back to A, or after reconnecting to the
+same device. The cache lives for the application session and can optionally be
+persisted in the application settings.
+
+In addition to the hashes, the cache keeps a mirror of the device side waveform buffers
+for the current session. The mirror is used by the delta upload to send only the samples
+that differ from the device buffer.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+import numpy as np
+
+from pisoworks.settings_manager import SettingsContext
+
+
+def waveform_hash(values: Sequence[float] | np.ndarray | None, *extra: Any) -> str:
+    """
+    Returns a content hash of the given waveform samples and additional upload parameters
+    (e.g. the sample time or the unit). A missing waveform (None) has its own hash.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if values is None:
+        h.update(b"none")
+    else:
+        h.update(np.ascontiguousarray(values, dtype="<f8").tobytes())
+    h.update(repr(extra).encode())
+    return h.hexdigest()
+
+
+def device_cache_key(device: Any, serial: str = "") -> str:
+    """
+    Returns the key that identifies a device in the cache. The key is made of the device type,
+    the MAC address or the transport identifier (serial port or IP address) and the given serial number.
+    """
+    try:
+        info = device.device_info
+        transport = info.transport_info
+        location = transport.mac or transport.identifier
+        device_id = info.device_id or type(device).__name__
+    except Exception:
+        location = ""
+        device_id = type(device).__name__
+    return f"{device_id}|{location}|{serial}"
+
+
+@dataclass
+class WaveformBufferMirror:
+    """
+    Mirror of a device side waveform buffer. Unknown values are NaN - e.g. before the first
+    upload or for a sample whose write has failed.
+
+    Attributes:
+        values (np.ndarray): The buffer values in percent as they have been written to the device.
+        sample_time_us (int | None): The output sampling time written to the device.
+        loop_end_index (int | None): The loop end index written to the device.
+    """
+    values: np.ndarray
+    sample_time_us: int | None = None
+    loop_end_index: int | None = None
+
+    @classmethod
+    def unknown(cls, size: int) -> "WaveformBufferMirror":
+        return cls(np.full(size, np.nan))
+
+
+class WaveformUploadCache:
+    """
+    Records the hash of the waveform buffer last uploaded per device and channel.
+    """
+    SETTINGS_KEY = "WaveformUploadCache/entries"
+    PERSISTENT_KEY = "WaveformUploadCache/persistent"
+
+    def __init__(self):
+        self._entries : dict[str, str] | None = None
+        self._persistent : bool | None = None
+        self._mirrors : dict[str, WaveformBufferMirror] = {}
+
+
+    @staticmethod
+    def _key(device_key: str, channel: int) -> str:
+        return f"{device_key}#{channel}"
+
+
+    def _load(self) -> dict[str, str]:
+        """
+        Lazily loads the persisted entries, if persistence is enabled.
+        """
+        if self._entries is None:
+            self._entries = {}
+            if self.is_persistent():
+                with SettingsContext() as settings:
+                    try:
+                        self._entries = dict(json.loads(settings.value(self.SETTINGS_KEY, "{}", type=str)))
+                    except (ValueError, TypeError) as e:
+                        print(f"Ignoring invalid waveform upload cache: {e}")
+        return self._entries
+
+
+    def _save(self):
+        if self.is_persistent():
+            with SettingsContext() as settings:
+                settings.setValue(self.SETTINGS_KEY, json.dumps(self._load()))
+
+
+    def is_persistent(self) -> bool:
+        """
+        Returns True, if the cache is persisted in the application settings.
+        """
+        if self._persistent is None:
+            with SettingsContext() as settings:
+                self._persistent = settings.value(self.PERSISTENT_KEY, False, type=bool)
+        return self._persistent
+
+
+    def set_persistent(self, persistent: bool):
+        """
+        Enables or disables the persistence of the cache in the application settings.
+        If persistence is disabled, the persisted entries are removed.
+        """
+        entries = self._load()
+        self._persistent = persistent
+        with SettingsContext() as settings:
+            settings.setValue(self.PERSISTENT_KEY, persistent)
+            if persistent:
+                settings.setValue(self.SETTINGS_KEY, json.dumps(entries))
+            else:
+                settings.remove(self.SETTINGS_KEY)
+
+
+    def get(self, device_key: str, channel: int = 0) -> str | None:
+        """
+        Returns the hash of the waveform last uploaded to the given channel or None if it is unknown.
+        """
+        return self._load().get(self._key(device_key, channel))
+
+
+    def is_uploaded(self, device_key: str, channel: int, digest: str) -> bool:
+        """
+        Returns True, if the waveform with the given hash is the last waveform uploaded to the given channel.
+        """
+        return self.get(device_key, channel) == digest
+
+
+    def store(self, device_key: str, channel: int, digest: str):
+        """
+        Records the hash of a waveform that has been uploaded completely.
+        """
+        self._load()[self._key(device_key, channel)] = digest
+        self._save()
+
+
+    def invalidate(self, device_key: str, channel: int | None = None, keep_mirror: bool = False):
+        """
+        Forgets the uploaded waveform of the given channel or of all channels of the device.
+        This has to be called before an upload starts, because an interrupted upload leaves
+        the device buffer in an unknown state.
+
+        Args:
+            device_key (str): The key of the device.
+            channel (int | None): The channel or None for all channels of the device.
+            keep_mirror (bool): If True, only the hash is removed and the buffer mirror is kept.
+                This is used by the delta upload, which keeps the mirror up to date per sample.
+        """
+        prefix = f"{device_key}#"
+        def matches(key: str) -> bool:
+            return key == self._key(device_key, channel) or (channel is None and key.startswith(prefix))
+
+        entries = self._load()
+        for key in [key for key in entries if matches(key)]:
+            del entries[key]
+        if not keep_mirror:
+            for key in [key for key in self._mirrors if matches(key)]:
+                del self._mirrors[key]
+        self._save()
+
+
+    def mirror(self, device_key: str, channel: int, size: int) -> WaveformBufferMirror:
+        """
+        Returns the mirror of the device buffer of the given channel. If there is no mirror yet,
+        a mirror with unknown values of the given buffer size is created.
+        """
+        key = self._key(device_key, channel)
+        mirror = self._mirrors.get(key)
+        if mirror is None or len(mirror.values) != size:
+            mirror = self._mirrors[key] = WaveformBufferMirror.unknown(size)
+        return mirror
+
+
+# Global cache shared by all device views
+waveform_upload_cache = WaveformUploadCache()
@@ -0,0 +1,48 @@
+"""
+Regression tests for the streaming ensemble statistics (Welford's algorithm).
+"""
+import numpy as np
+import pytest
+
+from pisoworks.ensemble_average import EnsembleAverage
+
+
+def test_ensemble_average_matches_numpy():
+    rng = np.random.default_rng(7)
+    runs = rng.normal(1e3, 0.5, size=(25, 200))
+    ensemble = EnsembleAverage()
+    for run in runs:
+        ensemble.add(run)
+
+    assert ensemble.count == 25
+    np.testing.assert_allclose(ensemble.mean, runs.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(ensemble.variance, runs.var(axis=0, ddof=1), rtol=1e-9)
+    np.testing.assert_allclose(ensemble.std, runs.std(axis=0, ddof=1), rtol=1e-9)
+
+
+def test_ensemble_average_single_run_has_zero_variance():
+    ensemble = EnsembleAverage()
+    assert ensemble.mean.size == 0 and ensemble.variance.size == 0
+    ensemble.add([1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(ensemble.mean, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(ensemble.variance, [0.0, 0.0, 0.0])
+
+
+def test_ensemble_average_does_not_modify_runs():
+    run = np.array([1.0, 2.0])
+    ensemble = EnsembleAverage()
+    ensemble.add(run)
+    ensemble.add(run * 3)
+    ensemble.mean[0] = 100.0
+    np.testing.assert_array_equal(run, [1.0, 2.0])
+    np.testing.assert_array_equal(ensemble.mean, [2.0, 4.0])
+
+
+def test_ensemble_average_rejects_different_length_and_resets():
+    ensemble = EnsembleAverage()
+    ensemble.add([1.0, 2.0])
+    with pytest.raises(ValueError):
+        ensemble.add([1.0, 2.0, 3.0])
+    ensemble.reset()
+    ensemble.add([1.0, 2.0, 3.0])
+    assert ensemble.count == 1
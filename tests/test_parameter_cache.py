@@ -0,0 +1,100 @@
+"""
+Regression tests for the device parameter cache - shared reads and invalidation generations.
+The tests pass an explicit time to live, so the application settings are not read.
+"""
+import asyncio
+
+import pytest
+
+from pisoworks.parameter_cache import DeviceParameterCache
+
+TTL_S = 60.0
+
+
+def test_fetch_serves_cached_value():
+    cache = DeviceParameterCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return 42
+
+    async def run():
+        assert await cache.fetch("dev", "kp", loader, ttl_s=TTL_S) == 42
+        assert await cache.fetch("dev", "kp", loader, ttl_s=TTL_S) == 42
+        assert await cache.fetch("dev", "kp", loader, refresh=True, ttl_s=TTL_S) == 42
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_concurrent_fetches_share_one_read():
+    cache = DeviceParameterCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(cache.fetch("dev", "sr", loader, ttl_s=TTL_S) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_invalidation_during_fetch_discards_value():
+    cache = DeviceParameterCache()
+    values = iter([1, 2])
+
+    async def loader():
+        await asyncio.sleep(0)
+        # A write of another parameter invalidates the whole generation of the device
+        cache.invalidate("dev", ["other"])
+        return next(values)
+
+    async def run():
+        first = await cache.fetch("dev", "kp", loader, ttl_s=TTL_S)
+        assert cache.get("dev", "kp", ttl_s=TTL_S) is None
+        return first
+
+    assert asyncio.run(run()) == 1
+
+
+def test_invalidation_is_per_device():
+    cache = DeviceParameterCache()
+
+    async def loader():
+        cache.invalidate("other device")
+        return 5
+
+    asyncio.run(cache.fetch("dev", "kp", loader, ttl_s=TTL_S))
+    assert cache.get("dev", "kp", ttl_s=TTL_S) == 5
+
+    cache.invalidate("dev", ["kp"])
+    assert cache.get("dev", "kp", "missing", ttl_s=TTL_S) == "missing"
+
+
+def test_failed_fetch_is_raised_to_all_waiters():
+    cache = DeviceParameterCache()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("timeout")
+
+    async def run():
+        return await asyncio.gather(*(cache.fetch("dev", "kp", loader, ttl_s=TTL_S) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("dev", "kp", ttl_s=TTL_S) is None
+
+
+def test_expired_entry_is_not_served():
+    cache = DeviceParameterCache()
+    cache.store("dev", "kp", 1)
+    assert cache.get("dev", "kp", ttl_s=TTL_S) == 1
+    assert cache.get("dev", "kp", "expired", ttl_s=-1.0) == "expired"
@@ -0,0 +1,29 @@
+"""
+Regression tests for the verification of written controller parameters.
+"""
+from pisoworks.parameter_transaction import dependency_rank, values_match
+
+
+def test_values_match_uses_readback_precision():
+    assert values_match("12.34567", "12.346")
+    assert values_match("480.4", "480")
+    assert not values_match("12.34567", "12.345")
+    assert not values_match("481", "480")
+
+
+def test_values_match_multiple_values():
+    assert values_match("0.1,0.2,3", "0.100,0.200,3.000")
+    assert not values_match("0.1,0.2,3", "0.100,0.200")
+    assert not values_match("0.1,0.2,3", "0.100,0.300,3.000")
+
+
+def test_values_match_non_numeric_values():
+    assert values_match("abc", " abc ")
+    assert not values_match("abc", "abd")
+    assert not values_match("1", "abc")
+
+
+def test_dependency_rank_writes_mode_last():
+    assert dependency_rank("setlpf") < dependency_rank("setlpon")
+    assert dependency_rank("unknown") < dependency_rank("cl")
+    assert max(dependency_rank(cmd) for cmd in ("sr", "kp", "pcf", "monsrc")) < dependency_rank("cl")
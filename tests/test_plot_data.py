@@ -0,0 +1,84 @@
+"""
+Regression tests for the plot data helpers - the min/max decimation of the plot lines and the
+merge of lines with different X data for the export.
+"""
+import numpy as np
+
+from pisoworks.mplcanvas import decimate_minmax
+from pisoworks.plot_export import build_export_columns, forward_fill, merge_line_data
+
+
+def test_decimate_minmax_keeps_short_data():
+    x = np.arange(100.0)
+    y = np.sin(x)
+    x_dec, y_dec = decimate_minmax(x, y, 0.0, 99.0, 100)
+    np.testing.assert_array_equal(x_dec, x)
+    np.testing.assert_array_equal(y_dec, y)
+
+
+def test_decimate_minmax_keeps_extrema_and_end_points():
+    rng = np.random.default_rng(1)
+    x = np.arange(100_000.0)
+    y = rng.normal(size=len(x))
+    y[12_345] = 100.0
+    y[54_321] = -100.0
+    x_dec, y_dec = decimate_minmax(x, y, x[0], x[-1], 500)
+
+    assert len(x_dec) <= 2 * 500 + 4
+    assert np.all(np.diff(x_dec) > 0)
+    assert (x_dec[0], x_dec[-1]) == (x[0], x[-1])
+    assert y_dec.max() == 100.0 and y_dec.min() == -100.0
+    # Each bucket keeps its minimum and maximum sample
+    buckets = y[:100_000].reshape(500, -1)
+    assert set(buckets.max(axis=1)) <= set(y_dec)
+    assert set(buckets.min(axis=1)) <= set(y_dec)
+
+
+def test_decimate_minmax_includes_one_neighbour_outside_the_view():
+    x = np.arange(10_000.0)
+    y = x.copy()
+    x_dec, _ = decimate_minmax(x, y, 1000.0, 2000.0, 100)
+    assert x_dec[0] == 999.0
+    assert x_dec[-1] == 2001.0
+
+
+def test_forward_fill_keeps_leading_nan():
+    filled = forward_fill(np.array([np.nan, 1.0, np.nan, np.nan, 4.0, np.nan]))
+    np.testing.assert_array_equal(filled, [np.nan, 1.0, 1.0, 1.0, 4.0, 4.0])
+
+
+def test_merge_line_data_offset_grids():
+    line_a = (np.array([0.0, 1.0, 2.0, 3.0]), np.array([0.0, 1.0, 2.0, 3.0]))
+    line_b = (np.array([0.5, 1.5, 2.5]), np.array([10.0, 11.0, 12.0]))
+    full_x, (y_a, y_b) = merge_line_data([line_a, line_b])
+
+    np.testing.assert_array_equal(full_x, [0.0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0])
+    np.testing.assert_array_equal(y_a, [0.0, 0.0, 1.0, 1.0, 2.0, 2.0, 3.0])
+    np.testing.assert_array_equal(y_b, [np.nan, 10.0, 10.0, 11.0, 11.0, 12.0, 12.0])
+
+
+def test_merge_line_data_forward_fills_nan_values():
+    line_a = (np.array([0.0, 1.0, 2.0]), np.array([5.0, np.nan, 7.0]))
+    line_b = (np.array([0.0, 3.0]), np.array([1.0, 2.0]))
+    full_x, (y_a, y_b) = merge_line_data([line_a, line_b])
+
+    np.testing.assert_array_equal(full_x, [0.0, 1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(y_a, [5.0, 5.0, 7.0, 7.0])
+    np.testing.assert_array_equal(y_b, [1.0, 1.0, 1.0, 2.0])
+
+
+def test_build_export_columns_shared_x():
+    x = np.arange(5.0)
+    names, columns = build_export_columns("Time (ms)", ["a", "_child1"], [(x, x * 2), (x, x * 3)])
+    assert names == ["Time (ms)", "a", "y2"]
+    np.testing.assert_array_equal(columns[0], x)
+    np.testing.assert_array_equal(columns[2], x * 3)
+
+
+def test_build_export_columns_merges_different_x():
+    names, columns = build_export_columns("x", ["a", "b"], [(np.array([0.0, 2.0]), np.array([1.0, 2.0])),
+                                                            (np.array([1.0]), np.array([9.0]))])
+    assert names == ["x", "a", "b"]
+    np.testing.assert_array_equal(columns[0], [0.0, 1.0, 2.0])
+    np.testing.assert_array_equal(columns[1], [1.0, 1.0, 2.0])
+    np.testing.assert_array_equal(columns[2], [np.nan, 9.0, 9.0])
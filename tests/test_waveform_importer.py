@@ -0,0 +1,33 @@
+"""
+Regression tests for the resampling of custom waveforms to the waveform buffer length.
+"""
+import numpy as np
+import pytest
+
+from pisoworks.waveform_importer import resample_to_length
+
+
+@pytest.mark.parametrize("count", [100, 1000, 1025, 1031, 4096, 100_003])
+def test_resample_to_length_returns_exact_length(count):
+    values = 50.0 + 40.0 * np.sin(np.linspace(0.0, 2.0 * np.pi, count, endpoint=False))
+    resampled = resample_to_length(values, 1024)
+    assert len(resampled) == 1024
+    assert resampled.min() >= 0.0 and resampled.max() <= 100.0
+
+
+def test_resample_to_length_keeps_matching_length():
+    values = np.linspace(0.0, 100.0, 1024)
+    resampled = resample_to_length(values, 1024)
+    np.testing.assert_array_equal(resampled, values)
+    assert resampled is not values
+
+
+def test_resample_to_length_keeps_constant_level():
+    resampled = resample_to_length(np.full(3000, 42.0), 1024)
+    np.testing.assert_allclose(resampled, 42.0, atol=1e-2)
+
+
+def test_resample_to_length_clips_filter_ringing():
+    square = np.where(np.arange(5000) % 1000 < 500, 0.0, 100.0)
+    resampled = resample_to_length(square, 1024)
+    assert resampled.min() >= 0.0 and resampled.max() <= 100.0